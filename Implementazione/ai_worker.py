@@ -0,0 +1,78 @@
+"""
+Calcolo asincrono della mossa dell'IA.
+
+La ricerca gira in un processo separato (non condivide il GIL con la GUI), così
+il ciclo principale di pygame continua a gestire gli eventi e a disegnare a
+60 FPS mentre l'IA pensa. submit restituisce un Future da interrogare con
+done() ad ogni frame; cancel interrompe la ricerca in corso.
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from algorithms.minimax_ab_all_improvements import find_best_move
+
+# Contatore condiviso delle richieste annullate (impostato nel processo worker)
+_generation = None
+
+
+def _init_worker(generation):
+    global _generation
+    _generation = generation
+
+
+def _warm_up():
+    """
+    Task vuoto: fa partire il processo (e gli import) prima della prima mossa.
+    """
+    return None
+
+
+def _search(board, difficulty_params, generation):
+    """
+    Esegue find_best_move nel processo worker. La ricerca si interrompe non
+    appena il contatore condiviso non corrisponde più a quello della richiesta.
+    """
+    return find_best_move(board, difficulty_params['max_depth'], difficulty_params['beam_width'],
+                          difficulty_params['heuristic_weights'], difficulty_params['time_limit'],
+                          difficulty_params['center_score_map'],
+                          should_stop=lambda: _generation.value != generation,
+                          workers=difficulty_params.get('workers', 1),
+                          use_book=difficulty_params.get('use_book', False),
+                          endgame_threshold=difficulty_params.get('endgame_threshold', 0),
+                          search_mode=difficulty_params.get('search_mode', 'alphabeta'),
+                          move_ordering=difficulty_params.get('move_ordering', 'heuristic'),
+                          use_cache=difficulty_params.get('use_cache', False),
+                          lazy_smp=difficulty_params.get('lazy_smp', False))
+
+
+class AIWorker:
+
+    def __init__(self):
+        # 'spawn' evita di duplicare nel figlio lo stato di SDL/pygame del processo principale
+        context = multiprocessing.get_context('spawn')
+        self.generation = context.Value('i', 0)
+        self.executor = ProcessPoolExecutor(max_workers=1, mp_context=context,
+                                            initializer=_init_worker, initargs=(self.generation,))
+        self.executor.submit(_warm_up)
+
+    def submit(self, board, difficulty_params):
+        """
+        Avvia la ricerca della mossa per la board indicata e restituisce un Future
+        il cui risultato è la colonna scelta.
+        """
+        return self.executor.submit(_search, board.copy(), dict(difficulty_params), self.generation.value)
+
+    def cancel(self):
+        """
+        Interrompe la ricerca in corso: il suo risultato va ignorato.
+        """
+        with self.generation.get_lock():
+            self.generation.value += 1
+
+    def shutdown(self, wait=False):
+        """
+        Chiude il processo worker; con wait=True attende che sia terminato (da
+        usare dopo un BrokenProcessPool, per non lasciare risorse del pool aperte).
+        """
+        self.cancel()
+        self.executor.shutdown(wait=wait, cancel_futures=True)
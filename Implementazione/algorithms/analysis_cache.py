@@ -0,0 +1,288 @@
+"""
+Cache persistente delle analisi, condivisa tra partite e sessioni.
+
+Ogni ricerca completata da find_best_move (con use_cache=True) viene salvata
+in un database SQLite indicizzato da:
+  - hash di Zobrist canonico della posizione (IA al tratto, come nel libro
+    delle aperture): una posizione e la sua riflessa condividono il record,
+    con la mossa riferita alla forma canonica,
+  - identificativo a 64 bit dei parametri della ricerca (profondità, beam,
+    pesi, mappa delle colonne, geometria, modalità di ricerca...),
+con mossa, valore e profondità. Alla mossa successiva nella stessa posizione e
+con gli stessi parametri la mossa viene restituita senza cercare.
+
+Il numero di posizioni è limitato da max_entries: superato il limite vengono
+eliminate quelle usate meno di recente (LRU) fino a EVICTION_RATIO * max_entries.
+Il database usa il journal WAL, così più processi (tornei, server) possono
+leggerlo e aggiornarlo contemporaneamente. Un lookup è solo una lettura:
+l'ultimo uso delle posizioni trovate viene scritto in blocco insieme al
+salvataggio successivo (o ogni TOUCH_BATCH lookup riusciti), e se il database
+è bloccato da un altro processo per più di BUSY_TIMEOUT la cache si comporta
+come un miss invece di far attendere la ricerca.
+
+Statistiche e svuotamento, dalla cartella Implementazione:
+
+    python -m algorithms.analysis_cache --stats
+    python -m algorithms.analysis_cache --clear
+"""
+import argparse
+import atexit
+import hashlib
+import os
+import sqlite3
+import time
+
+from algorithms.transposition_table import canonical_hash
+from board import is_valid_location, mirror_move
+
+CACHE_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "analysis_cache.sqlite")
+
+# Versione del formato: un database di una versione diversa viene ricreato
+CACHE_VERSION = 3
+
+DEFAULT_MAX_ENTRIES = 100_000
+EVICTION_RATIO = 0.9
+
+# Attesa massima (s) quando il database è bloccato da un altro processo: la
+# cache è consultata dentro il time_limit della mossa
+BUSY_TIMEOUT = 0.05
+
+# Numero massimo di aggiornamenti dell'ultimo uso tenuti in memoria
+TOUCH_BATCH = 64
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS analysis (
+    position INTEGER NOT NULL,
+    params INTEGER NOT NULL,
+    move INTEGER NOT NULL,
+    value INTEGER,
+    depth INTEGER NOT NULL,
+    last_used INTEGER NOT NULL,
+    PRIMARY KEY (position, params)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS analysis_last_used ON analysis (last_used);
+"""
+
+# Cache già aperte, indicizzate per percorso
+_caches = {}
+
+
+def to_signed(value):
+    """
+    Converte un intero senza segno a 64 bit nell'intero con segno memorizzabile da SQLite.
+    """
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+
+def params_id(params_key):
+    """
+    Identificativo a 64 bit di una tupla di parametri della ricerca.
+    """
+    digest = hashlib.blake2b(repr(params_key).encode(), digest_size=8).digest()
+    return to_signed(int.from_bytes(digest, 'little'))
+
+
+class AnalysisCache:
+    """
+    Cache su SQLite. lookup restituisce la tupla (mossa, valore, profondità)
+    oppure None; store salva il risultato di una ricerca. 'touched' contiene
+    l'ultimo uso delle posizioni trovate, non ancora scritto nel database.
+    """
+
+    def __init__(self, path, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.counters = {'lookups': 0, 'hits': 0, 'stores': 0, 'evictions': 0, 'errors': 0}
+        self.connection = None
+        self.pid = None
+        self.entries = 0
+        self.touched = {}
+
+    def connect(self):
+        """
+        Apre il database alla prima richiesta (e di nuovo in un processo figlio:
+        una connessione SQLite non va usata dopo un fork).
+        """
+        if self.connection is not None and self.pid == os.getpid():
+            return self.connection
+        # check_same_thread=False: engine.py esegue ogni ricerca in un thread diverso
+        # (una alla volta), e close viene chiamata all'uscita dal thread principale
+        connection = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        if connection.execute("PRAGMA user_version").fetchone()[0] != CACHE_VERSION:
+            connection.execute("DROP TABLE IF EXISTS analysis")
+            connection.execute(f"PRAGMA user_version={CACHE_VERSION}")
+        connection.executescript(SCHEMA)
+        self.connection, self.pid = connection, os.getpid()
+        self.entries = connection.execute("SELECT COUNT(*) FROM analysis").fetchone()[0]
+        return connection
+
+    def lookup(self, position, params):
+        self.counters['lookups'] += 1
+        try:
+            connection = self.connect()
+            row = connection.execute("SELECT move, value, depth FROM analysis WHERE position = ? AND params = ?",
+                                     (to_signed(position), params)).fetchone()
+        except sqlite3.Error:
+            self.counters['errors'] += 1
+            return None
+        if row is None:
+            return None
+        self.counters['hits'] += 1
+        self.touched[(to_signed(position), params)] = time.time_ns()
+        if len(self.touched) >= TOUCH_BATCH:
+            try:
+                self.flush()
+            except sqlite3.Error:
+                self.counters['errors'] += 1
+        return row
+
+    def store(self, position, params, move, value, depth):
+        try:
+            self.flush()
+            connection = self.connect()
+            connection.execute("INSERT OR REPLACE INTO analysis VALUES (?, ?, ?, ?, ?, ?)",
+                               (to_signed(position), params, move, None if value is None else int(value),
+                                depth, time.time_ns()))
+            self.counters['stores'] += 1
+            self.entries += 1
+            if self.entries > self.max_entries:
+                self.evict()
+        except sqlite3.Error:
+            self.counters['errors'] += 1
+
+    def flush(self):
+        """
+        Scrive in un'unica transazione l'ultimo uso delle posizioni trovate. È
+        solo un'indicazione per l'LRU: se la scrittura fallisce viene scartato.
+        """
+        if not self.touched:
+            return
+        touched, self.touched = self.touched, {}
+        connection = self.connect()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            connection.executemany("UPDATE analysis SET last_used = ? WHERE position = ? AND params = ?",
+                                   [(last_used, position, params)
+                                    for (position, params), last_used in touched.items()])
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def evict(self):
+        """
+        Elimina le posizioni usate meno di recente fino a EVICTION_RATIO * max_entries.
+        """
+        connection = self.connect()
+        self.entries = connection.execute("SELECT COUNT(*) FROM analysis").fetchone()[0]
+        excess = self.entries - int(self.max_entries * EVICTION_RATIO)
+        if excess <= 0:
+            return
+        deleted = connection.execute("DELETE FROM analysis WHERE last_used <= "
+                                     "(SELECT last_used FROM analysis ORDER BY last_used LIMIT 1 OFFSET ?)",
+                                     (excess - 1,)).rowcount
+        self.counters['evictions'] += deleted
+        self.entries -= deleted
+
+    def clear(self):
+        self.connect().execute("DELETE FROM analysis")
+        self.entries = 0
+        self.touched = {}
+
+    def stats(self):
+        """
+        Contatori di questo processo, frazione di lookup riusciti e posizioni memorizzate.
+        """
+        lookups = self.counters['lookups']
+        return dict(self.counters, hit_rate=self.counters['hits'] / lookups if lookups else 0.0,
+                    entries=self.entries, max_entries=self.max_entries)
+
+    def close(self):
+        if self.connection is not None and self.pid == os.getpid():
+            try:
+                self.flush()
+            except sqlite3.Error:
+                self.counters['errors'] += 1
+            self.connection.close()
+        self.connection = None
+
+
+def get_analysis_cache(path=CACHE_PATH):
+    """
+    Restituisce la cache al percorso indicato (il database viene aperto al primo uso).
+    """
+    if path not in _caches:
+        _caches[path] = AnalysisCache(path)
+    return _caches[path]
+
+
+def close_analysis_caches():
+    """
+    Scrive gli ultimi usi ancora in memoria e chiude le cache aperte.
+    """
+    for cache in _caches.values():
+        cache.close()
+
+
+atexit.register(close_analysis_caches)
+
+
+def configure_analysis_cache(path=CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES):
+    """
+    Imposta il numero massimo di posizioni della cache al percorso indicato.
+    """
+    cache = get_analysis_cache(path)
+    cache.max_entries = max_entries
+    return cache
+
+
+def cached_move(board, params, path=CACHE_PATH):
+    """
+    Restituisce (mossa, valore, profondità) per la posizione, con l'IA al tratto,
+    se è nella cache per i parametri 'params' (vedi params_id) e la mossa è
+    legale; altrimenti None.
+    """
+    key, mirrored = canonical_hash(board, True)
+    entry = get_analysis_cache(path).lookup(key, params)
+    if entry is None:
+        return None
+    move, value, depth = entry
+    if mirrored:
+        move = mirror_move(move, board.shape[1])
+    if not is_valid_location(board, move):
+        return None
+    return move, value, depth
+
+
+def store_move(board, params, move, value, depth, path=CACHE_PATH):
+    key, mirrored = canonical_hash(board, True)
+    if mirrored:
+        move = mirror_move(move, board.shape[1])
+    get_analysis_cache(path).store(key, params, move, value, depth)
+
+
+def get_cache_stats(path=CACHE_PATH):
+    return get_analysis_cache(path).stats()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Cache persistente delle analisi.")
+    parser.add_argument("--path", default=CACHE_PATH, help="file della cache")
+    parser.add_argument("--stats", action="store_true", help="stampa il numero di posizioni memorizzate")
+    parser.add_argument("--clear", action="store_true", help="svuota la cache")
+    args = parser.parse_args(argv)
+
+    cache = get_analysis_cache(args.path)
+    if args.clear:
+        cache.clear()
+        print(f"Cache {args.path} svuotata")
+    if args.stats or not args.clear:
+        cache.connect()
+        size = os.path.getsize(args.path) if os.path.exists(args.path) else 0
+        print(f"{cache.entries} posizioni in {args.path} ({size / 1024:.0f} KB)")
+
+
+if __name__ == "__main__":
+    main()
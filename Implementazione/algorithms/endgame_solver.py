@@ -0,0 +1,236 @@
+"""
+Risolutore esatto di fine partita.
+
+Quando restano poche celle libere la posizione viene risolta con un negamax
+alpha-beta sulla bitboard (vedi bitboard.py), senza euristiche né beam search.
+Il valore esatto si ottiene con una sequenza di ricerche a finestra nulla che
+restringono l'intervallo [min, max] per bisezione (stile MTD(f)), condividendo
+una tabella delle trasposizioni.
+
+Il punteggio è dal punto di vista del giocatore al tratto:
+  - 0 pareggio,
+  - positivo se vince: (CELLS + 1 - n) // 2, dove n è il numero di pedine
+    presenti prima della mossa vincente (vincere prima vale di più),
+  - negativo se perde, con lo stesso valore dal punto di vista dell'avversario.
+"""
+from algorithms.search_clock import SearchClock
+from bitboard import BOTTOM_MASK, BOARD_MASK, BitBoard, column_mask
+from board import ROWS, COLS, AI_PIECE, STANDARD_GEOMETRY
+
+CELLS = ROWS * COLS
+
+# Numero di celle libere sotto il quale find_best_move passa al risolutore
+ENDGAME_EMPTY_CELLS = 16
+
+# Frazione di time_limit concessa al risolutore: se non basta, il resto del
+# tempo viene usato dalla ricerca euristica
+ENDGAME_TIME_RATIO = 0.5
+
+# Oltre questo numero di entry la tabella del risolutore viene svuotata
+ENDGAME_TABLE_ENTRIES = 1 << 20
+
+# Colonne esplorate dal centro verso i bordi
+COLUMN_ORDER = sorted(range(COLS), key=lambda col: abs(COLS // 2 - col))
+
+_COLUMN_MASKS = [column_mask(col) for col in range(COLS)]
+
+# Limiti inferiori/superiori esatti già dimostrati, indicizzati per chiave della posizione
+_lower_bounds = {}
+_upper_bounds = {}
+
+# Esito dell'ultima risoluzione di find_best_move
+_last_result = None
+
+
+# Celle libere che completerebbero un '4 in fila' per le pedine 'current':
+# winning_positions(current, mask), vedi geometry.threat_cells
+winning_positions = STANDARD_GEOMETRY.threat_cells
+
+
+def _popcount(bits):
+    return bin(bits).count('1')
+
+
+class EndgameSolver:
+    """
+    Negamax alpha-beta esatto. 'clock' (opzionale) è un SearchClock: se la
+    scadenza hard viene superata la risoluzione si interrompe con SearchTimeout.
+    """
+
+    def __init__(self, clock=None):
+        self.clock = clock
+        self.nodes = 0
+
+    def negamax(self, current, mask, moves, alpha, beta):
+        """
+        Valore della posizione per il giocatore al tratto (pedine 'current'),
+        con 'moves' pedine sulla griglia, nella finestra (alpha, beta).
+        """
+        self.nodes += 1
+        if self.clock is not None:
+            self.clock.tick()
+
+        possible = (mask + BOTTOM_MASK) & BOARD_MASK
+        if winning_positions(current, mask) & possible:
+            return (CELLS + 1 - moves) // 2
+        if moves >= CELLS - 1:
+            # L'ultima cella non può dare la vittoria a chi la occupa
+            return 0
+
+        opponent_wins = winning_positions(current ^ mask, mask)
+        forced = possible & opponent_wins
+        if forced:
+            if forced & (forced - 1):
+                # Due minacce dell'avversario: non si possono bloccare entrambe
+                return -((CELLS - moves) // 2)
+            possible = forced
+        # Non si gioca sotto una cella vincente dell'avversario
+        possible &= ~(opponent_wins >> 1)
+        if not possible:
+            return -((CELLS - moves) // 2)
+
+        # La vittoria più veloce ancora possibile è alla prossima mossa propria
+        # (la prossima non vince, già controllato)
+        upper = (CELLS - 1 - moves) // 2
+        lower = -((CELLS - 2 - moves) // 2)
+        key = current + mask
+        upper = min(upper, _upper_bounds.get(key, upper))
+        lower = max(lower, _lower_bounds.get(key, lower))
+        if lower >= upper:
+            return lower
+        if beta > upper:
+            beta = upper
+            if alpha >= beta:
+                return beta
+        if alpha < lower:
+            alpha = lower
+            if alpha >= beta:
+                return alpha
+
+        # Ordinamento: prima le mosse che creano più minacce, poi dal centro
+        candidates = []
+        for col in COLUMN_ORDER:
+            move = possible & _COLUMN_MASKS[col]
+            if move:
+                threats = _popcount(winning_positions(current | move, mask))
+                candidates.append((-threats, len(candidates), move))
+        candidates.sort()
+
+        for _, _, move in candidates:
+            value = -self.negamax(current ^ mask, mask | move, moves + 1, -beta, -alpha)
+            if value >= beta:
+                _store(_lower_bounds, key, value)
+                return value
+            if value > alpha:
+                alpha = value
+        _store(_upper_bounds, key, alpha)
+        return alpha
+
+    def solve(self, current, mask, moves):
+        """
+        Valore esatto della posizione, con ricerche a finestra nulla che
+        dimezzano l'intervallo [min, max] ad ogni passo.
+        """
+        if winning_positions(current, mask) & (mask + BOTTOM_MASK) & BOARD_MASK:
+            return (CELLS + 1 - moves) // 2
+        low = -((CELLS - moves) // 2)
+        high = (CELLS + 1 - moves) // 2
+        while low < high:
+            # Finestre spostate verso lo 0: i valori vicini al pareggio sono i più frequenti
+            middle = low + (high - low) // 2
+            if middle <= 0 and int(low / 2) < middle:
+                middle = int(low / 2)
+            elif middle >= 0 and int(high / 2) > middle:
+                middle = int(high / 2)
+            value = self.negamax(current, mask, moves, middle, middle + 1)
+            if value <= middle:
+                high = value
+            else:
+                low = value
+        return low
+
+    def best_move(self, current, mask, moves):
+        """
+        Restituisce (colonna, punteggio) della mossa migliore per il giocatore al
+        tratto. A parità di punteggio si preferiscono le colonne centrali.
+        """
+        score = self.solve(current, mask, moves)
+        possible = (mask + BOTTOM_MASK) & BOARD_MASK
+        wins = winning_positions(current, mask) & possible
+        fallback = None
+        for col in COLUMN_ORDER:
+            move = possible & _COLUMN_MASKS[col]
+            if not move:
+                continue
+            if fallback is None:
+                fallback = col
+            if move & wins:
+                return col, score
+            # La mossa raggiunge 'score' se il valore del figlio è <= -score
+            value = -self.negamax(current ^ mask, mask | move, moves + 1, -score, -score + 1)
+            if value >= score:
+                return col, score
+        return fallback, score
+
+
+def _store(bounds, key, value):
+    if len(_lower_bounds) + len(_upper_bounds) >= ENDGAME_TABLE_ENTRIES:
+        _lower_bounds.clear()
+        _upper_bounds.clear()
+    bounds[key] = value
+
+
+def describe_score(score, moves):
+    """
+    Converte il punteggio in (esito, distanza) per il giocatore al tratto, con
+    esito 'win', 'draw' o 'loss' e distanza in semimosse fino alla pedina
+    vincente (0 per il pareggio).
+    """
+    if score == 0:
+        return 'draw', 0
+    # n (pedine prima della mossa vincente) vale CELLS + 1 - 2 * |score| oppure
+    # uno in meno: ha la stessa parità di 'moves' se vince il giocatore al
+    # tratto, quella opposta se vince l'avversario
+    winner_parity = moves % 2 if score > 0 else (moves + 1) % 2
+    pieces_before = CELLS + 1 - 2 * abs(score)
+    if pieces_before % 2 != winner_parity:
+        pieces_before -= 1
+    return ('win' if score > 0 else 'loss'), pieces_before - moves + 1
+
+
+def empty_cells(board):
+    """
+    Restituisce il numero di celle libere della board.
+    """
+    return int((board == 0).sum())
+
+
+def solve_board(board, time_limit=None, should_stop=None, piece=AI_PIECE):
+    """
+    Risolve la posizione con 'piece' (di default l'IA) al tratto e restituisce il
+    dizionario con mossa, punteggio, esito, distanza e nodi visitati. Con
+    time_limit, oltre la scadenza (o se should_stop restituisce True) viene
+    sollevata SearchTimeout.
+    """
+    global _last_result
+    position = BitBoard.from_board(board)
+    moves = position.move_count()
+    clock = SearchClock(time_limit, soft_ratio=1.0, should_stop=should_stop) if time_limit is not None else None
+    solver = EndgameSolver(clock)
+    move, score = solver.best_move(position.pieces[piece], position.mask, moves)
+    result, distance = describe_score(score, moves)
+    _last_result = {'move': move, 'score': score, 'result': result, 'distance': distance, 'nodes': solver.nodes}
+    return dict(_last_result)
+
+
+def get_last_endgame_result():
+    """
+    Restituisce l'esito dell'ultima posizione risolta da find_best_move (mossa,
+    punteggio, 'win'/'draw'/'loss', distanza in semimosse, nodi), o None.
+    """
+    return dict(_last_result) if _last_result is not None else None
+
+
+def clear_endgame_table():
+    _lower_bounds.clear()
+    _upper_bounds.clear()
@@ -0,0 +1,397 @@
+"""
+Ricerca Lazy SMP con tabella delle trasposizioni in memoria condivisa.
+
+Più processi eseguono lo stesso approfondimento iterativo sulla stessa
+posizione, ciascuno con un ordinamento leggermente diverso delle mosse alla
+radice (e, per i worker dispari, saltando la profondità 1). Non si scambiano
+messaggi: collaborano solo attraverso la tabella delle trasposizioni, che vive
+in un blocco multiprocessing.shared_memory, così i risultati trovati da un
+worker velocizzano gli altri e la profondità effettiva cresce.
+
+Ogni entry occupa due parole a 64 bit, scritte senza lock:
+  - check = key XOR data
+  - data  = punteggio, profondità, tipo di valore, mossa e worker che l'ha scritta
+Una lettura è valida solo se check XOR data restituisce la chiave cercata: una
+entry scritta a metà da un altro processo viene così scartata come un miss.
+
+find_best_move ha la stessa firma di minimax_ab_all_improvements.find_best_move,
+che vi delega la ricerca con lazy_smp=True (parametro 'lazy_smp' dei livelli).
+"""
+import multiprocessing
+import multiprocessing.util
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+from multiprocessing import shared_memory
+
+import algorithms.minimax_ab_all_improvements as serial
+from algorithms.minimax_ab_all_improvements import (
+    SearchContext,
+    aspiration_search,
+    cache_lookup,
+    book_params,
+    cache_params,
+    cache_store,
+    known_move,
+    order_moves,
+    root_moves,
+    search_root,
+    search_params_key,
+    search_info,
+    latency_stats,
+)
+from algorithms.search_stats import SearchStats, emit, SEARCH_COMPLETE
+from algorithms.endgame_solver import ENDGAME_EMPTY_CELLS
+from algorithms.move_ordering import MoveOrdering
+from algorithms.search_clock import SearchClock, SearchTimeout
+from algorithms.transposition_table import compute_hash
+from board import AI_PIECE, board_geometry, unique_moves
+from evaluator import IncrementalEvaluator
+from geometry import get_geometry
+from position import Position
+
+# Dimensione della tabella condivisa
+SHARED_TABLE_MB = 16
+
+# Ogni quanto (in secondi) il processo principale controlla should_stop e la scadenza
+POLL_INTERVAL = 0.01
+
+# Anticipo (in secondi) della scadenza dei worker rispetto a quella della mossa:
+# il tempo per restituire il risultato al processo principale
+RESULT_MARGIN = 0.02
+
+# Layout del campo data di una entry
+_SCORE_OFFSET = 1 << 31
+_NO_MOVE = 15
+_VALID_BIT = 1 << 50
+
+
+def _pack(depth, score, flag, move, worker_id):
+    move = _NO_MOVE if move is None else move
+    return (_VALID_BIT | (worker_id & 15) << 46 | move << 42 | flag << 40 | depth << 32 |
+            (int(score) + _SCORE_OFFSET))
+
+
+def _unpack(key, data):
+    score = (data & 0xFFFFFFFF) - _SCORE_OFFSET
+    depth = (data >> 32) & 0xFF
+    flag = (data >> 40) & 3
+    move = (data >> 42) & 15
+    return key, depth, score, flag, None if move == _NO_MOVE else move
+
+
+class SharedTranspositionTable:
+    """
+    Tabella delle trasposizioni in memoria condivisa, con la stessa interfaccia
+    (probe/store/new_search/stats) di TranspositionTable e la stessa politica di
+    sostituzione: per ogni bucket uno slot depth-preferred e uno always-replace.
+
+    I punteggi memorizzati devono essere interi (come quelli prodotti dai pesi
+    di DIFFICULTY_LEVELS).
+    """
+
+    def __init__(self, name=None, size_mb=SHARED_TABLE_MB, worker_id=0):
+        if name is None:
+            # Una entry occupa 16 byte invece di ENTRY_BYTES: a parità di MB ne
+            # entrano di più che nella tabella locale
+            size = max(64, int(size_mb * 1024 * 1024) // 64 * 64)
+            self.memory = shared_memory.SharedMemory(create=True, size=size)
+            self.owner = True
+        else:
+            self.memory = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self.words = self.memory.buf.cast('Q')
+        self.buckets = len(self.words) // 4
+        self.worker_id = worker_id
+        self.search_params = None
+        if self.owner:
+            self.clear()
+        self.reset_stats()
+
+    @property
+    def name(self):
+        return self.memory.name
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+        self.stores = 0
+        # Hit su entry scritte da un altro worker e sovrascritture di entry altrui
+        self.shared_hits = 0
+        self.foreign_overwrites = 0
+
+    def clear(self):
+        self.memory.buf[:] = bytes(len(self.memory.buf))
+
+    def new_search(self, search_params):
+        """
+        Nei worker azzera solo i contatori: la tabella è svuotata dal processo
+        principale (vedi find_best_move) quando cambiano i parametri di ricerca.
+        """
+        self.reset_stats()
+
+    def probe(self, key):
+        words = self.words
+        base = (key % self.buckets) * 4
+        occupied = False
+        for offset in (base, base + 2):
+            check = words[offset]
+            data = words[offset + 1]
+            if data:
+                if check ^ data == key:
+                    self.hits += 1
+                    if (data >> 46) & 15 != self.worker_id & 15:
+                        self.shared_hits += 1
+                    return _unpack(key, data)
+                occupied = True
+        self.misses += 1
+        if occupied:
+            self.collisions += 1
+        return None
+
+    def store(self, key, depth, score, flag, move):
+        words = self.words
+        base = (key % self.buckets) * 4
+        data = _pack(depth, score, flag, move, self.worker_id)
+        self.stores += 1
+
+        current_check = words[base]
+        current_data = words[base + 1]
+        current_key = current_check ^ current_data
+        if (not current_data or current_key == key or
+                depth >= (current_data >> 32) & 0xFF):
+            if current_data and current_key != key:
+                words[base + 2] = current_check
+                words[base + 3] = current_data
+            target = base
+        else:
+            target = base + 2
+            current_data = words[target + 1]
+
+        if current_data and (current_data >> 46) & 15 != self.worker_id & 15:
+            self.foreign_overwrites += 1
+        words[target + 1] = data
+        words[target] = key ^ data
+
+    def stats(self):
+        probes = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'collisions': self.collisions,
+            'stores': self.stores,
+            'hit_rate': self.hits / probes if probes else 0.0,
+            'entries': 2 * self.buckets,
+            'shared_hits': self.shared_hits,
+            'foreign_overwrites': self.foreign_overwrites,
+        }
+
+    def close(self):
+        self.words.release()
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+
+# Pool già avviati: workers -> (executor, tabella condivisa, contatore delle ricerche)
+_pools = {}
+
+# Statistiche per worker dell'ultima find_best_move
+worker_stats = []
+
+# Contatore delle ricerche, impostato nei processi worker da _init_worker
+_search_id = None
+
+
+def _init_worker(table_name, search_id, worker_ids):
+    global _search_id
+    _search_id = search_id
+    with worker_ids.get_lock():
+        worker_id = worker_ids.value
+        worker_ids.value += 1
+    # La ricerca seriale usa la tabella globale del modulo: nei worker viene
+    # sostituita dalla vista sulla tabella condivisa
+    table = SharedTranspositionTable(table_name, worker_id=worker_id)
+    serial.transposition_table = table
+    # La vista va rilasciata prima che il processo chiuda la memoria condivisa
+    multiprocessing.util.Finalize(None, table.close, exitpriority=0)
+
+
+def _warm_up():
+    time.sleep(0.05)
+
+
+def get_pool(workers):
+    if workers not in _pools:
+        context = multiprocessing.get_context('spawn')
+        table = SharedTranspositionTable(size_mb=SHARED_TABLE_MB)
+        search_id = context.Value('i', 0)
+        worker_ids = context.Value('i', 0)
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_init_worker,
+                                       initargs=(table.name, search_id, worker_ids))
+        # Avvia subito tutti i processi: altrimenti la prima ricerca pagherebbe
+        # il loro avvio dentro il time_limit
+        wait([executor.submit(_warm_up) for _ in range(workers)])
+        _pools[workers] = (executor, table, search_id)
+    return _pools[workers]
+
+
+def shutdown_pools():
+    for executor, table, search_id in _pools.values():
+        search_id.value += 1
+        executor.shutdown(wait=True, cancel_futures=True)
+        table.close()
+    _pools.clear()
+
+
+# Come finalizzatore di multiprocessing e non con atexit: in un processo figlio
+# (es. il worker dell'interfaccia grafica) multiprocessing attende la fine dei
+# processi del pool prima di eseguire atexit, e senza shutdown non finirebbero.
+# La priorità è maggiore di quella (10) con cui si chiudono le code del pool
+multiprocessing.util.Finalize(None, shutdown_pools, exitpriority=100)
+
+
+def _lazy_worker(board, helper_index, max_depth, beam_width, heuristic_weights, center_score_map, deadline, token, search_mode, move_ordering, geometry_key, piece=AI_PIECE):
+    """
+    Approfondimento iterativo di un singolo worker, con 'piece' al tratto.
+    helper_index 0 è il worker principale; gli altri ruotano l'ordinamento della
+    radice di helper_index posizioni e, se dispari, iniziano dalla profondità 2.
+    'geometry_key' è la chiave (rows, cols, connect) della geometria della griglia.
+    """
+    geometry = get_geometry(*geometry_key)
+    table = serial.transposition_table
+    table.new_search(None)
+    clock = SearchClock(deadline - time.time(), should_stop=lambda: _search_id.value != token)
+    stats = SearchStats()
+    context = SearchContext(IncrementalEvaluator(board, heuristic_weights, center_score_map, geometry), clock, search_mode == 'pvs',
+                            MoveOrdering(geometry) if move_ordering == 'history' else None, stats, geometry, piece)
+    root_hash = compute_hash(board, piece == AI_PIECE, piece)
+    position = Position(board, geometry)
+
+    valid_moves = root_moves(board, piece, geometry)
+    ordered_moves = unique_moves(board, order_moves(board, valid_moves, piece, heuristic_weights, center_score_map, context.evaluator))
+    ordered_moves = ordered_moves[:beam_width] if beam_width < len(ordered_moves) else ordered_moves
+    if helper_index and ordered_moves:
+        shift = helper_index % len(ordered_moves)
+        ordered_moves = ordered_moves[shift:] + ordered_moves[:shift]
+
+    best_move = ordered_moves[0] if ordered_moves else None
+    best_value = None
+    values = []
+    completed_depth = 0
+    first_depth = 1 + helper_index % 2
+    for current_depth in range(first_depth, max_depth + 1):
+        if current_depth > first_depth and not clock.can_start_iteration():
+            break
+        clock.start_iteration()
+        nodes_before = clock.nodes
+        try:
+            if search_mode == 'pvs':
+                if best_move in ordered_moves:
+                    ordered_moves = [best_move] + [col for col in ordered_moves if col != best_move]
+                center = values[-2] if len(values) >= 2 else best_value
+                best_move, best_value = aspiration_search(position, ordered_moves, current_depth, beam_width, heuristic_weights, center_score_map, root_hash, context, center)
+                values.append(best_value)
+            else:
+                best_move, best_value = search_root(position, ordered_moves, current_depth, beam_width, heuristic_weights, center_score_map, root_hash, context)
+        except SearchTimeout:
+            stats.nodes_per_depth[current_depth] = clock.nodes - nodes_before
+            break
+        clock.end_iteration()
+        stats.nodes_per_depth[current_depth] = clock.nodes - nodes_before
+        stats.iteration_times.append(clock.iteration_times[-1])
+        completed_depth = current_depth
+    stats.depth_completed = completed_depth
+
+    result = {'worker': table.worker_id, 'helper': helper_index, 'move': best_move, 'value': best_value,
+              'depth': completed_depth, 'nodes': clock.nodes, 'stats': stats}
+    result.update(table.stats())
+    return result
+
+
+def find_best_move(board, max_depth, beam_width, heuristic_weights, time_limit, center_score_map, should_stop=None, workers=1, use_book=False, endgame_threshold=ENDGAME_EMPTY_CELLS, search_mode='alphabeta', move_ordering='heuristic', return_stats=False, geometry=None, use_cache=False, piece=AI_PIECE):
+    """
+    Alternativa Lazy SMP a minimax_ab_all_improvements.find_best_move, con gli
+    stessi parametri. 'workers' è il numero di processi di ricerca (di default
+    1, come nella ricerca seriale). Libro delle aperture (use_book), risolutore
+    di fine partita (endgame_threshold), search_mode, move_ordering, geometry, cache
+    delle analisi (use_cache) e il giocatore al tratto 'piece' sono gestiti
+    come nella ricerca seriale; nella cache le mosse della ricerca Lazy SMP
+    hanno una chiave diversa da quelle della ricerca seriale, perché con più
+    worker la mossa scelta può cambiare.
+
+    Viene restituita la mossa del worker che ha completato la profondità
+    maggiore (a parità, il worker principale). Le statistiche per worker
+    (profondità, nodi, hit rate, hit su entry altrui, sovrascritture) sono
+    disponibili al termine tramite get_worker_stats(); con return_stats viene
+    restituita anche la SearchStats del worker scelto. Il pool viene avviato
+    (alla prima chiamata) prima di far partire il time_limit.
+    """
+    executor, table, search_id = get_pool(workers)
+    start_time = time.perf_counter()
+    stats = SearchStats()
+    best_col = None
+    if use_cache:
+        params = cache_params(max_depth, beam_width, heuristic_weights, center_score_map, endgame_threshold,
+                              'lazy_' + search_mode, move_ordering, geometry)
+        best_col = cache_lookup(board, params, stats, piece)
+    if best_col is None:
+        best_col = known_move(board, time_limit, use_book, endgame_threshold, should_stop, stats, geometry, piece,
+                              book_params(beam_width, heuristic_weights, center_score_map))
+    if best_col is not None:
+        if use_cache:
+            cache_store(board, params, best_col, stats, max_depth, piece)
+        return _finish(best_col, stats, start_time, time_limit, return_stats)
+    geometry = board_geometry(board, geometry)
+    center_score_map = geometry.center_score_map(center_score_map)
+
+    params_key = search_params_key(beam_width, heuristic_weights, center_score_map, geometry)
+    if params_key != table.search_params:
+        table.clear()
+        table.search_params = params_key
+
+    with search_id.get_lock():
+        search_id.value += 1
+        token = search_id.value
+    deadline = time.time() + max(0.0, time_limit - (time.perf_counter() - start_time))
+
+    futures = [executor.submit(_lazy_worker, board, helper_index, max_depth, beam_width, heuristic_weights,
+                               center_score_map, deadline - RESULT_MARGIN, token, search_mode, move_ordering, geometry.key, piece)
+               for helper_index in range(workers)]
+    # Si attende il worker principale; poi gli altri vengono fermati
+    while not futures[0].done():
+        wait([futures[0]], timeout=POLL_INTERVAL)
+        if time.time() >= deadline or (should_stop is not None and should_stop()):
+            break
+    with search_id.get_lock():
+        search_id.value += 1
+    wait(futures)
+
+    results = [future.result() for future in futures]
+    best = max(results, key=lambda result: (result['depth'], -result['helper']))
+    worker_search_stats = [result.pop('stats') for result in results]
+
+    worker_stats[:] = results
+    search_info.update(depth=best['depth'], move=best['move'], value=best['value'], nodes=best['nodes'])
+    stats = worker_search_stats[results.index(best)]
+    if use_cache:
+        cache_store(board, params, best['move'], stats, max_depth, piece)
+    return _finish(best['move'], stats, start_time, time_limit, return_stats)
+
+
+def _finish(best_col, stats, start_time, time_limit, return_stats):
+    stats.total_time = time.perf_counter() - start_time
+    latency_stats.record(stats.total_time, time_limit)
+    emit(SEARCH_COMPLETE, move=best_col, stats=stats.as_dict())
+    if return_stats:
+        return best_col, stats
+    return best_col
+
+
+def get_worker_stats():
+    """
+    Restituisce, per ogni worker dell'ultima ricerca, profondità completata, nodi,
+    hit rate della tabella condivisa e indicatori di contesa (shared_hits,
+    foreign_overwrites, collisions).
+    """
+    return [dict(result) for result in worker_stats]
@@ -1,141 +1,705 @@
 """
-Implementazione di Minimax con potatura alpha-beta, approfondimento iterativo,
-ordinamento dinamico delle mosse e potatura in avanti (beam search).
+Implementazione di Minimax (in forma negamax) con potatura alpha-beta,
+approfondimento iterativo, ordinamento dinamico delle mosse e potatura in
+avanti (beam search). La ricerca è parametrizzata dal giocatore al tratto e
+può scegliere la mossa per entrambi i colori.
 """
+import time
+
+import numpy as np
+
 from board import (
     PLAYER_PIECE,
     AI_PIECE,
-    winning_move,
     get_valid_locations,
     get_next_open_row,
-    drop_piece,
     score_position,
+    score_positions,
+    board_geometry,
+    unique_moves,
+    swap_colors,
+    STANDARD_GEOMETRY,
+)
+from algorithms.transposition_table import (
+    TranspositionTable,
+    compute_hash,
+    mirror_hash,
+    update_hash,
+    EXACT,
+    LOWER_BOUND,
+    UPPER_BOUND,
+    TERMINAL_DEPTH,
 )
+from algorithms.search_clock import SearchClock, SearchTimeout, LatencyStats
+from algorithms.move_ordering import MoveOrdering
+from algorithms.search_stats import SearchStats, emit, ITERATION_COMPLETE, SEARCH_COMPLETE
+from algorithms.opening_book import book_move
+from algorithms.analysis_cache import cached_move, store_move, params_id
+from algorithms.endgame_solver import ENDGAME_EMPTY_CELLS, ENDGAME_TIME_RATIO, empty_cells, solve_board
+from evaluator import IncrementalEvaluator
+from position import Position
 
+# Tabella delle trasposizioni condivisa tra le iterazioni e tra mosse successive
+transposition_table = TranspositionTable()
+
+
+def configure_transposition_table(size_entries=None, size_mb=64):
+    """
+    Sostituisce la tabella delle trasposizioni con una nuova della dimensione indicata
+    (in numero di entry oppure in MB).
+    """
+    global transposition_table
+    transposition_table = TranspositionTable(size_entries, size_mb)
+
+
+def get_transposition_stats():
+    """
+    Restituisce i contatori (hit, miss, collisioni, store) dell'ultima find_best_move.
+    """
+    return transposition_table.stats()
+
+
+# Latenze di tutte le mosse calcolate da find_best_move
+latency_stats = LatencyStats()
+
+# Esito dell'ultima ricerca: profondità completata, mossa, valore e nodi visitati
+search_info = {'depth': 0, 'move': None, 'value': None, 'nodes': 0}
+
+# Modalità di ricerca accettate da find_best_move (vedi iterative_deepening_minimax)
+SEARCH_MODES = ('alphabeta', 'pvs')
+
+# Valore di una vittoria (stati terminali)
+WIN_SCORE = 10000
+
+# Semiampiezza iniziale della finestra di aspirazione e fattore di allargamento
+ASPIRATION_WINDOW = 100
+ASPIRATION_GROWTH = 4
+
+# Ricerche della radice e fallimenti della finestra di aspirazione nell'ultima ricerca PVS
+aspiration_stats = {'searches': 0, 'fail_low': 0, 'fail_high': 0}
+
+# Ordinamenti delle mosse accettati da find_best_move (vedi iterative_deepening_minimax)
+MOVE_ORDERINGS = ('heuristic', 'history')
+
+# Tagli dell'ultima ricerca seriale e quanti alla prima mossa esplorata
+ordering_stats = {'cutoffs': 0, 'first_move_cutoffs': 0}
+
+
+def get_latency_stats():
+    """
+    Restituisce p50, p95, massimo e sforamento massimo delle latenze per mossa.
+    """
+    return latency_stats.summary()
+
+
+def get_search_info():
+    """
+    Restituisce profondità completata, mossa, valore e nodi visitati dell'ultima
+    find_best_move.
+    """
+    return dict(search_info)
 
-# --- Funzioni di utilità ---
 
-def is_draw(board):
+def get_ordering_stats():
     """
-    Restituisce True se la board non ha mosse valide (pareggio).
+    Restituisce i tagli dell'ultima ricerca seriale e la frazione avvenuta alla
+    prima mossa esplorata (first_move_cutoff_rate).
     """
-    return len(get_valid_locations(board)) == 0
+    cutoffs = ordering_stats['cutoffs']
+    return {
+        'cutoffs': cutoffs,
+        'first_move_cutoffs': ordering_stats['first_move_cutoffs'],
+        'first_move_cutoff_rate': ordering_stats['first_move_cutoffs'] / cutoffs if cutoffs else 0.0,
+    }
 
 
-def clone_board(board):
+def search_params_key(beam_width, heuristic_weights, center_score_map, geometry=None):
     """
-    Crea e restituisce una copia della board.
+    Parametri da cui dipendono i valori memorizzati nella tabella delle trasposizioni.
     """
-    return board.copy()
+    geometry = geometry or STANDARD_GEOMETRY
+    return beam_width, tuple(sorted(heuristic_weights.items())), tuple(center_score_map), geometry.key
 
 
-def order_moves(board, moves, piece, heuristic_weights, center_score_map):
+# --- Funzioni di utilità ---
+
+def order_moves(board, moves, piece, heuristic_weights, center_score_map, evaluator=None, geometry=None, rows=None):
     """
-    Ordina le mosse in base all'euristica (score_position) per la board ottenuta
-    applicando ciascuna mossa. Le mosse sono ordinate in ordine decrescente se
-    'piece' è quello dell'IA, altrimenti in ordine crescente.
+    Ordina le mosse del giocatore 'piece' in base all'euristica (score_position)
+    dal suo punto di vista, per la board ottenuta applicando ciascuna mossa:
+    prima le mosse con il punteggio più alto.
+
+    Se viene passato un IncrementalEvaluator allineato alla board, il punteggio
+    di ogni figlio si ottiene aggiornando solo le finestre della cella giocata;
+    altrimenti tutti i figli vengono valutati con una sola chiamata a score_positions.
+    'rows' sono le righe in cui cadrebbe la pedina per ciascuna mossa (se None
+    vengono calcolate con get_next_open_row).
     """
-    scored_moves = []
-    for col in moves:
-        new_board = clone_board(board)
-        row = get_next_open_row(new_board, col)
-        drop_piece(new_board, row, col, piece)
-        score = score_position(new_board, piece, heuristic_weights, center_score_map)
-        scored_moves.append((score, col))
+    if rows is None:
+        rows = [get_next_open_row(board, col) for col in moves]
+    if evaluator is not None:
+        scored_moves = []
+        for col, row in zip(moves, rows):
+            evaluator.drop(row, col, piece)
+            scored_moves.append((evaluator.score(piece), col))
+            evaluator.remove(row, col, piece)
+    else:
+        children = np.repeat(board[np.newaxis], len(moves), axis=0)
+        for i, (col, row) in enumerate(zip(moves, rows)):
+            children[i, row, col] = piece
+        scores = score_positions(children, piece, heuristic_weights, center_score_map, geometry)
+        scored_moves = [(int(score), col) for score, col in zip(scores, moves)]
     scored_moves.sort(key=lambda x: x[0], reverse=True)
     # Restituisce solo la lista delle colonne ordinate
     ordered_moves = [col for (_, col) in scored_moves]
     return ordered_moves
 
 
+def root_moves(board, piece, geometry=None):
+    """
+    Mosse della radice per il giocatore al tratto 'piece' dopo l'analisi delle
+    minacce (Position.threat_moves): la mossa vincente, il blocco forzato
+    oppure le mosse che non giocano sotto una cella vincente dell'avversario.
+    Se ogni mossa perde restituisce tutte le mosse valide.
+    """
+    _, moves = Position(board, geometry).threat_moves(piece)
+    return moves or get_valid_locations(board)
+
+
 # --- Minimax con potatura alpha-beta, beam search e approfondimento iterativo ---
 
-def minimax_alpha_beta(board, maximizing_player, alpha, beta, depth, max_depth, beam_width, heuristic_weights, center_score_map):
+class SearchContext:
+    """
+    Stato condiviso da tutti i nodi di una ricerca:
+      - evaluator: IncrementalEvaluator allineato alla board corrente,
+      - clock: SearchClock che conta i nodi e interrompe la ricerca alla scadenza,
+      - pvs: se True, dopo la prima mossa di ogni nodo le altre sono cercate a
+        finestra nulla e ricercate solo se la superano (Principal Variation Search),
+      - ordering: MoveOrdering (killer move e history) che sostituisce
+        l'euristica nell'ordinare le mosse di ogni nodo; None per order_moves,
+      - stats: SearchStats in cui vengono contati nodi, foglie, tagli, ecc.,
+      - geometry: geometria della griglia (None per ricavarla dalla board),
+      - root_piece: giocatore al tratto alla radice, dal cui punto di vista
+        sono valutate le foglie (vedi negamax),
+      - exact_depth: se True la tabella delle trasposizioni restituisce solo
+        valori calcolati alla stessa profondità residua (o terminali), così il
+        risultato non dipende dal contenuto della tabella; lo usano i worker
+        della ricerca parallela, che devono dare la mossa della ricerca seriale.
+    """
+
+    def __init__(self, evaluator=None, clock=None, pvs=False, ordering=None, stats=None, geometry=None, root_piece=AI_PIECE, exact_depth=False):
+        self.evaluator = evaluator
+        self.clock = clock
+        self.pvs = pvs
+        self.ordering = ordering
+        self.stats = stats if stats is not None else SearchStats()
+        self.geometry = geometry
+        self.root_piece = root_piece
+        self.exact_depth = exact_depth
+
+
+def negamax(position, piece, alpha, beta, depth, max_depth, beam_width, heuristic_weights, center_score_map, board_hash=None, context=None, last_move=None, mirrored_hash=None):
+    """
+    Negamax con potatura alpha-beta: restituisce il valore della posizione
+    (position.Position) dal punto di vista di 'piece', il giocatore al tratto,
+    nella finestra (alpha, beta). Il valore di un figlio è l'opposto di quello
+    restituito per l'avversario, così ogni nodo ha un solo ramo per entrambi i
+    giocatori. Le mosse vengono giocate e annullate sulla stessa posizione
+    (make/unmake), senza copiare la board.
+
+    Le foglie sono valutate dal punto di vista del giocatore alla radice
+    (context.root_piece, di default AI_PIECE) e cambiate di segno nei nodi in
+    cui muove l'avversario: la ricerca dà lo stesso risultato per entrambi i
+    colori (cercare per PLAYER_PIECE equivale a cercare per AI_PIECE sulla
+    board con i colori scambiati).
+
+    'board_hash' è l'hash di Zobrist della board (vedi transposition_table):
+    se indicato, la ricerca consulta e aggiorna la tabella delle trasposizioni,
+    i cui valori sono dal punto di vista del giocatore al tratto.
+    'mirrored_hash' è l'hash della board riflessa: se indicato, la tabella usa
+    come chiave il minore dei due (una sola entry per una posizione e la sua
+    riflessa) e riflette le mosse memorizzate con la chiave della riflessa.
+    'context' è il SearchContext della ricerca: se contiene un evaluator, questo
+    sostituisce le chiamate a score_position; se contiene un clock, la ricerca
+    può essere interrotta con SearchTimeout.
+    'last_move' è la mossa (row, col, piece) che ha portato a questo stato: se
+    indicata, la vittoria viene cercata solo nelle finestre di quella cella.
+
+    Nei nodi interni le mosse passano prima dall'analisi delle minacce
+    (Position.threat_moves): con una vittoria immediata il nodo vale WIN_SCORE,
+    se ogni mossa perde alla mossa successiva dell'avversario vale -WIN_SCORE,
+    altrimenti vengono cercati solo il blocco forzato oppure le mosse che non
+    giocano sotto una cella vincente dell'avversario, prima della beam search.
+    """
+    evaluator = None
+    pvs = False
+    ordering = None
+    stats = None
+    geometry = None
+    root_piece = AI_PIECE
+    exact_depth = False
+    if context is not None:
+        evaluator = context.evaluator
+        pvs = context.pvs
+        geometry = context.geometry
+        ordering = context.ordering
+        stats = context.stats
+        root_piece = context.root_piece
+        exact_depth = context.exact_depth
+        if context.clock is not None:
+            context.clock.tick()
+    opponent = PLAYER_PIECE if piece == AI_PIECE else AI_PIECE
+
+    tt_move = None
+    tt_key = board_hash
+    last_col = position.geometry.cols - 1
+    mirrored = mirrored_hash is not None and mirrored_hash < board_hash
+    if mirrored:
+        tt_key = mirrored_hash
+    if tt_key is not None:
+        entry = transposition_table.probe(tt_key)
+        if entry is not None:
+            _, entry_depth, entry_score, entry_flag, tt_move = entry
+            if mirrored and tt_move is not None:
+                tt_move = last_col - tt_move
+            # Valori calcolati ad almeno la profondità residua; con exact_depth
+            # solo alla stessa profondità residua (o terminali), vedi SearchContext
+            remaining = max_depth - depth
+            if entry_depth == remaining or entry_depth == TERMINAL_DEPTH or (entry_depth > remaining and not exact_depth):
+                if (entry_flag == EXACT or (entry_flag == LOWER_BOUND and entry_score >= beta) or
+                        (entry_flag == UPPER_BOUND and entry_score <= alpha)):
+                    if stats is not None:
+                        stats.tt_hits += 1
+                    return entry_score
 
     # Casi terminali
-    if winning_move(board, PLAYER_PIECE):
-        return -10000
-    if winning_move(board, AI_PIECE):
-        return +10000
-    if is_draw(board):
-        return 0
+    if last_move is not None:
+        # Dopo una mossa può aver vinto solo chi l'ha giocata, cioè l'avversario
+        if stats is not None:
+            stats.winning_move_calls += 1
+        row, col, last_piece = last_move
+        if position.winning_move_at(row, col, last_piece):
+            return store_terminal(tt_key, -WIN_SCORE)
+    else:
+        if stats is not None:
+            stats.winning_move_calls += 1
+        if position.winning_move(opponent):
+            return store_terminal(tt_key, -WIN_SCORE)
+        if stats is not None:
+            stats.winning_move_calls += 1
+        if position.winning_move(piece):
+            return store_terminal(tt_key, +WIN_SCORE)
+    if position.is_full():
+        return store_terminal(tt_key, 0)
 
     if depth == max_depth:
-        return score_position(board, AI_PIECE, heuristic_weights, center_score_map)
+        if stats is not None:
+            stats.leaf_evaluations += 1
+        if evaluator is not None:
+            value = evaluator.score(root_piece)
+        else:
+            value = score_position(position.board, root_piece, heuristic_weights, center_score_map, position.geometry)
+        if piece != root_piece:
+            value = -value
+        if tt_key is not None:
+            transposition_table.store(tt_key, 0, value, EXACT, None)
+        return value
 
-    valid_moves = get_valid_locations(board)
+    winning_col, valid_moves = position.threat_moves(piece)
+    if winning_col is not None or not valid_moves:
+        value = WIN_SCORE if winning_col is not None else -WIN_SCORE
+        if stats is not None:
+            stats.threat_cutoffs += 1
+        if tt_key is not None:
+            if mirrored and winning_col is not None:
+                winning_col = last_col - winning_col
+            # Alla profondità residua e non come terminale: la stessa posizione
+            # come foglia va comunque valutata con l'euristica
+            transposition_table.store(tt_key, max_depth - depth, value, EXACT, winning_col)
+        return value
 
-    # Ordinamento dinamico delle mosse
-    # Se è il turno dell'IA, ordina in ordine decrescente, altrimenti in ordine crescente.
-    current_piece = AI_PIECE if maximizing_player else PLAYER_PIECE
-    ordered_moves = order_moves(board, valid_moves, current_piece, heuristic_weights, center_score_map)
-    # Applica la beam search: considera solo le prime "beam_width" mosse
-    ordered_moves = ordered_moves[:beam_width] if beam_width < len(ordered_moves) else ordered_moves
-    if maximizing_player:
-        best_value = float('-inf')
-        for col in ordered_moves:
-            new_board = clone_board(board)
-            row = get_next_open_row(new_board, col)
-            drop_piece(new_board, row, col, AI_PIECE)
-            value = minimax_alpha_beta(new_board, False, alpha, beta, depth + 1, max_depth, beam_width, heuristic_weights, center_score_map)
-            best_value = max(best_value, value)
-            alpha = max(alpha, best_value)
-            if alpha >= beta:
-                break  # beta cut-off
-        return best_value
+    # Ordinamento dinamico delle mosse, dal punto di vista del giocatore al tratto
+    ordered_moves = staged_moves(position, valid_moves, piece, depth, tt_move, beam_width, heuristic_weights, center_score_map, evaluator, ordering, stats)
+
+    alpha_orig = alpha
+    best_col = tt_move
+    best_value = float('-inf')
+    for index, col in enumerate(ordered_moves):
+        row = position.play(col, piece)
+        child_hash = update_hash(board_hash, row, col, piece) if board_hash is not None else None
+        child_mirrored = update_hash(mirrored_hash, row, last_col - col, piece) if mirrored_hash is not None else None
+        if evaluator is not None:
+            evaluator.drop(row, col, piece)
+        if pvs and index > 0 and alpha != float('-inf'):
+            # Finestra nulla: basta sapere se la mossa supera alpha
+            value = -negamax(position, opponent, -alpha - 1, -alpha, depth + 1, max_depth, beam_width, heuristic_weights, center_score_map, child_hash, context, (row, col, piece), child_mirrored)
+            if alpha < value < beta:
+                value = -negamax(position, opponent, -beta, -alpha, depth + 1, max_depth, beam_width, heuristic_weights, center_score_map, child_hash, context, (row, col, piece), child_mirrored)
+        else:
+            value = -negamax(position, opponent, -beta, -alpha, depth + 1, max_depth, beam_width, heuristic_weights, center_score_map, child_hash, context, (row, col, piece), child_mirrored)
+        if evaluator is not None:
+            evaluator.remove(row, col, piece)
+        position.undo_move()
+        if value > best_value:
+            best_value = value
+            best_col = col
+        alpha = max(alpha, best_value)
+        if alpha >= beta:
+            if context is not None:
+                record_cutoff(context, piece, row, col, index, depth, max_depth)
+            break  # taglio
+
+    if tt_key is not None:
+        if best_value <= alpha_orig:
+            flag = UPPER_BOUND
+        elif best_value >= beta:
+            flag = LOWER_BOUND
+        else:
+            flag = EXACT
+        if mirrored and best_col is not None:
+            best_col = last_col - best_col
+        transposition_table.store(tt_key, max_depth - depth, best_value, flag, best_col)
+    return best_value
+
+def staged_moves(position, valid_moves, piece, depth, tt_move, beam_width, heuristic_weights, center_score_map, evaluator, ordering=None, stats=None):
+    """
+    Genera le mosse di un nodo per fasi. Se la beam non taglia, la mossa della
+    tabella delle trasposizioni è restituita subito: se causa un taglio,
+    l'ordinamento delle altre non viene mai calcolato. Se la beam taglia, la
+    mossa della tabella è restituita per prima solo se è tra quelle della beam:
+    con le chiavi canoniche può venire dalla posizione riflessa, in cui a parità
+    di punteggio la beam può scegliere colonne diverse, e cercarla
+    renderebbe il risultato dipendente dal contenuto della tabella.
+
+    Le altre mosse sono ordinate con l'euristica (order_moves), ridotte alle
+    prime beam_width; con un MoveOrdering l'euristica serve solo a scegliere le
+    mosse della beam, e solo se la beam taglia davvero, mentre l'ordine è dato
+    da killer move e history. Le mosse scartate dalla beam sono contate in 'stats'.
+    """
+    truncated = beam_width < len(valid_moves)
+    if not truncated and tt_move in valid_moves:
+        yield tt_move
+    if stats is not None and truncated:
+        stats.beam_truncated += len(valid_moves) - beam_width
+    rows = [position.next_open_row(col) for col in valid_moves]
+    if ordering is None:
+        ordered_moves = order_moves(position.board, valid_moves, piece, heuristic_weights, center_score_map, evaluator, position.geometry, rows)
+        # Applica la beam search: considera solo le prime "beam_width" mosse
+        ordered_moves = ordered_moves[:beam_width] if truncated else ordered_moves
+        beam = ordered_moves
     else:
-        best_value = float('inf')
-        for col in ordered_moves:
-            new_board = clone_board(board)
-            row = get_next_open_row(new_board, col)
-            drop_piece(new_board, row, col, PLAYER_PIECE)
-            value = minimax_alpha_beta(new_board, True, alpha, beta, depth + 1, max_depth, beam_width, heuristic_weights, center_score_map)
-            best_value = min(best_value, value)
-            beta = min(beta, best_value)
-            if alpha >= beta:
-                break  # alpha cut-off
-        return best_value
+        if truncated:
+            valid_moves = order_moves(position.board, valid_moves, piece, heuristic_weights, center_score_map, evaluator, position.geometry, rows)[:beam_width]
+            rows = [position.next_open_row(col) for col in valid_moves]
+        beam = valid_moves
+        ordered_moves = ordering.order(valid_moves, rows, piece, depth)
+    if truncated and tt_move in beam:
+        yield tt_move
+    for col in ordered_moves:
+        if col != tt_move:
+            yield col
 
 
-import time
+def record_cutoff(context, piece, row, col, index, depth, max_depth):
+    """
+    Conta un taglio causato dalla mossa in posizione 'index' e, se la ricerca
+    usa MoveOrdering, aggiorna killer move e history.
+    """
+    context.stats.cutoffs += 1
+    if index == 0:
+        context.stats.first_move_cutoffs += 1
+    if context.ordering is not None:
+        context.ordering.record_cutoff(piece, row, col, depth, max_depth - depth)
+
+
+def store_terminal(board_hash, value):
+    """
+    Memorizza il valore di uno stato terminale (valido a qualsiasi profondità).
+    """
+    if board_hash is not None:
+        transposition_table.store(board_hash, TERMINAL_DEPTH, value, EXACT, None)
+    return value
+
+
+def search_root(position, ordered_moves, current_depth, beam_width, heuristic_weights, center_score_map, root_hash, context):
+    """
+    Esegue un'iterazione completa alla profondità current_depth e restituisce
+    la coppia (mossa migliore, valore) per il giocatore context.root_piece.
+    """
+    evaluator = context.evaluator
+    piece = context.root_piece
+    opponent = PLAYER_PIECE if piece == AI_PIECE else AI_PIECE
+    root_mirrored = mirror_hash(position.board, piece == AI_PIECE, piece)
+    last_col = position.geometry.cols - 1
+    best_value = float('-inf')
+    best_move = None
+    for col in ordered_moves:
+        row = position.play(col, piece)
+        evaluator.drop(row, col, piece)
+        # Le mosse successive devono solo dimostrare di superare best_value:
+        # la finestra (best_value, +inf) non cambia la mossa scelta
+        move_value = -negamax(position, opponent, float('-inf'), -best_value, 1, current_depth, beam_width, heuristic_weights, center_score_map, update_hash(root_hash, row, col, piece), context, (row, col, piece),
+                              update_hash(root_mirrored, row, last_col - col, piece))
+        evaluator.remove(row, col, piece)
+        position.undo_move()
+        if move_value > best_value:
+            best_value = move_value
+            best_move = col
+    return best_move, best_value
+
 
+def search_root_pvs(position, ordered_moves, current_depth, beam_width, heuristic_weights, center_score_map, root_hash, context, alpha, beta):
+    """
+    Come search_root, ma nella finestra (alpha, beta): la prima mossa è cercata
+    con la finestra intera, le altre a finestra nulla sopra il miglior valore e
+    ricercate solo se lo superano. Se il valore restituito è <= alpha o >= beta
+    è solo un limite e l'iterazione va ripetuta con una finestra più ampia.
+    """
+    evaluator = context.evaluator
+    piece = context.root_piece
+    opponent = PLAYER_PIECE if piece == AI_PIECE else AI_PIECE
+    root_mirrored = mirror_hash(position.board, piece == AI_PIECE, piece)
+    last_col = position.geometry.cols - 1
+    best_value = float('-inf')
+    best_move = None
+    for index, col in enumerate(ordered_moves):
+        row = position.play(col, piece)
+        evaluator.drop(row, col, piece)
+        child_hash = update_hash(root_hash, row, col, piece)
+        child_mirrored = update_hash(root_mirrored, row, last_col - col, piece)
+        bound = max(alpha, best_value)
+        if index > 0 and bound != float('-inf'):
+            move_value = -negamax(position, opponent, -bound - 1, -bound, 1, current_depth, beam_width, heuristic_weights, center_score_map, child_hash, context, (row, col, piece), child_mirrored)
+            if bound < move_value < beta:
+                move_value = -negamax(position, opponent, -beta, -bound, 1, current_depth, beam_width, heuristic_weights, center_score_map, child_hash, context, (row, col, piece), child_mirrored)
+        else:
+            move_value = -negamax(position, opponent, -beta, -bound, 1, current_depth, beam_width, heuristic_weights, center_score_map, child_hash, context, (row, col, piece), child_mirrored)
+        evaluator.remove(row, col, piece)
+        position.undo_move()
+        if move_value > best_value:
+            best_value = move_value
+            best_move = col
+            if best_value >= beta:
+                break
+    return best_move, best_value
+
+
+def aspiration_search(position, ordered_moves, current_depth, beam_width, heuristic_weights, center_score_map, root_hash, context, center):
+    """
+    Iterazione PVS con finestra di aspirazione centrata su un valore di un'iterazione
+    precedente ('center', None alla prima iterazione). Se il valore cade fuori
+    dalla finestra, il lato superato viene allargato di ASPIRATION_GROWTH volte e
+    la ricerca ripetuta. Restituisce (mossa migliore, valore).
+    """
+    if center is None or abs(center) >= WIN_SCORE:
+        return search_root_pvs(position, ordered_moves, current_depth, beam_width, heuristic_weights, center_score_map, root_hash, context, float('-inf'), float('inf'))
 
-def iterative_deepening_minimax(board, max_depth, beam_width, heuristic_weights, time_limit, center_score_map):
+    delta_low = delta_high = ASPIRATION_WINDOW
+    while True:
+        alpha = center - delta_low if delta_low < WIN_SCORE else float('-inf')
+        beta = center + delta_high if delta_high < WIN_SCORE else float('inf')
+        best_move, best_value = search_root_pvs(position, ordered_moves, current_depth, beam_width, heuristic_weights, center_score_map, root_hash, context, alpha, beta)
+        aspiration_stats['searches'] += 1
+        if best_value <= alpha:
+            aspiration_stats['fail_low'] += 1
+            delta_low *= ASPIRATION_GROWTH
+        elif best_value >= beta:
+            aspiration_stats['fail_high'] += 1
+            delta_high *= ASPIRATION_GROWTH
+        else:
+            return best_move, best_value
+
+
+def iterative_deepening_minimax(board, max_depth, beam_width, heuristic_weights, time_limit, center_score_map, should_stop=None, search_mode='alphabeta', move_ordering='heuristic', stats=None, geometry=None, piece=AI_PIECE):
     """
     Approfondimento iterativo con controllo di tempo: esegue la ricerca iterativamente
-    da profondità 1 fino a max_depth, fermandosi se supera il limite di tempo di un secondo.
+    da profondità 1 fino a max_depth, per il giocatore al tratto 'piece'.
+
+    Il tempo è controllato anche dentro l'albero (SearchClock): un'iterazione che
+    supera time_limit viene interrotta e scartata, e una nuova iterazione non
+    viene iniziata se è già passata la scadenza soft o se non farebbe in tempo a
+    terminare. Se should_stop restituisce True la ricerca viene interrotta allo
+    stesso modo.
+
+    search_mode sceglie come viene cercata ogni iterazione:
+      - 'alphabeta': ogni mossa della radice con finestra (miglior valore, +inf),
+      - 'pvs': Principal Variation Search con finestre di aspirazione centrate
+        sul valore di un'iterazione precedente; la mossa migliore
+        dell'iterazione precedente viene cercata per prima (vedi aspiration_search).
+
+    move_ordering sceglie l'ordinamento delle mosse nei nodi interni:
+      - 'heuristic': valutazione di ogni figlio (order_moves),
+      - 'history': killer move e history table (vedi algorithms.move_ordering);
+        l'euristica serve solo a scegliere le mosse della beam.
+
+    Se la posizione è simmetrica, alla radice viene cercata una sola mossa per
+    ogni coppia di mosse riflesse (board.unique_moves).
+
+    Se 'stats' è un SearchStats vi vengono accumulati i contatori della ricerca.
+    Al termine di ogni iterazione viene emesso l'evento ITERATION_COMPLETE
+    (vedi algorithms.search_stats).
+
+    'geometry' è la geometria della griglia (di default ricavata dalla forma
+    della board, con 4 in fila); center_score_map viene adattata al numero di
+    colonne (BoardGeometry.center_score_map).
 
     Restituisce la migliore mossa trovata in base all'ultima iterazione completata.
     """
-    best_move = None
-    start_time = time.time()  # Tempo iniziale
+    if search_mode not in SEARCH_MODES:
+        raise ValueError(f"search_mode non valido: {search_mode!r} (ammessi: {', '.join(SEARCH_MODES)})")
+    if move_ordering not in MOVE_ORDERINGS:
+        raise ValueError(f"move_ordering non valido: {move_ordering!r} (ammessi: {', '.join(MOVE_ORDERINGS)})")
+    clock = SearchClock(time_limit, should_stop=should_stop)
+    geometry = board_geometry(board, geometry)
+    center_score_map = geometry.center_score_map(center_score_map)
+
+    transposition_table.new_search(search_params_key(beam_width, heuristic_weights, center_score_map, geometry))
+    root_hash = compute_hash(board, piece == AI_PIECE, piece)
+    # Tutte le iterazioni giocano e annullano le mosse sulla stessa posizione
+    position = Position(board, geometry)
+    context = SearchContext(IncrementalEvaluator(board, heuristic_weights, center_score_map, geometry), clock, search_mode == 'pvs',
+                            MoveOrdering(geometry) if move_ordering == 'history' else None, stats, geometry, piece)
+    stats = context.stats
+    for key in aspiration_stats:
+        aspiration_stats[key] = 0
+
+    valid_moves = root_moves(board, piece, geometry)
+    ordered_moves = order_moves(board, valid_moves, piece, heuristic_weights, center_score_map, context.evaluator)
+    # In una posizione simmetrica una mossa e la sua riflessa hanno lo stesso valore
+    ordered_moves = unique_moves(board, ordered_moves)
+    ordered_moves = ordered_moves[:beam_width] if beam_width < len(ordered_moves) else ordered_moves
+
+    # Se nemmeno la prima iterazione termina si gioca la mossa migliore secondo l'euristica
+    best_move = ordered_moves[0] if ordered_moves else None
+    best_value = None
+    values = []
+    search_info.update(depth=0, move=best_move, value=None, nodes=0)
 
     for current_depth in range(1, max_depth + 1):
-        best_value = float('-inf')
-        valid_moves = get_valid_locations(board)
-        ordered_moves = order_moves(board, valid_moves, AI_PIECE, heuristic_weights, center_score_map)
-        ordered_moves = ordered_moves[:beam_width] if beam_width < len(ordered_moves) else ordered_moves
-
-        for col in ordered_moves:
-            # Controllo del tempo
-            if time.time() - start_time > time_limit:
-                # Superato il limite di tempo, restituisce la migliore mossa trovata
-                return best_move
-
-            new_board = clone_board(board)
-            row = get_next_open_row(new_board, col)
-            drop_piece(new_board, row, col, AI_PIECE)
-            move_value = minimax_alpha_beta(new_board, False, float('-inf'), float('inf'), 1, current_depth, beam_width, heuristic_weights, center_score_map)
-            if move_value > best_value:
-                best_value = move_value
-                best_move = col
+        if current_depth > 1 and not clock.can_start_iteration():
+            break
+        clock.start_iteration()
+        nodes_before = clock.nodes
+        try:
+            if search_mode == 'pvs':
+                if best_move in ordered_moves:
+                    ordered_moves = [best_move] + [col for col in ordered_moves if col != best_move]
+                # I valori dell'euristica oscillano tra profondità pari e dispari:
+                # la finestra è centrata sull'ultima iterazione della stessa parità
+                center = values[-2] if len(values) >= 2 else best_value
+                best_move, best_value = aspiration_search(position, ordered_moves, current_depth, beam_width, heuristic_weights, center_score_map, root_hash, context, center)
+                values.append(best_value)
+            else:
+                best_move, best_value = search_root(position, ordered_moves, current_depth, beam_width, heuristic_weights, center_score_map, root_hash, context)
+        except SearchTimeout:
+            # I nodi dell'iterazione interrotta vengono comunque contati
+            stats.nodes_per_depth[current_depth] = clock.nodes - nodes_before
+            break
+        clock.end_iteration()
+        stats.nodes_per_depth[current_depth] = clock.nodes - nodes_before
+        stats.depth_completed = current_depth
+        stats.iteration_times.append(clock.iteration_times[-1])
+        search_info.update(depth=current_depth, move=best_move, value=best_value)
+        emit(ITERATION_COMPLETE, depth=current_depth, move=best_move, value=best_value,
+             nodes=stats.nodes_per_depth[current_depth], time=clock.iteration_times[-1], elapsed=clock.elapsed())
 
+    search_info['nodes'] = clock.nodes
+    ordering_stats.update(cutoffs=stats.cutoffs, first_move_cutoffs=stats.first_move_cutoffs)
     return best_move
 
-def find_best_move(board, max_depth, beam_width, heuristic_weights, time_limit, center_score_map):
+def book_params(beam_width, heuristic_weights, center_score_map):
+    """
+    Identificativo dei parametri di valutazione con cui viene generato e
+    interrogato il libro delle aperture (la profondità è salvata in ogni record).
+    """
+    return params_id(search_params_key(beam_width, heuristic_weights, center_score_map))
+
+
+def cache_params(max_depth, beam_width, heuristic_weights, center_score_map, endgame_threshold, search_mode, move_ordering, geometry=None):
+    """
+    Identificativo dei parametri da cui dipende la mossa di find_best_move,
+    chiave della cache delle analisi insieme all'hash della posizione.
+    """
+    return params_id((max_depth, endgame_threshold, search_mode, move_ordering)
+                     + search_params_key(beam_width, heuristic_weights, center_score_map, geometry))
+
+
+def cache_lookup(board, params, stats=None, piece=AI_PIECE):
+    """
+    Mossa del giocatore al tratto 'piece' salvata nella cache delle analisi per
+    i parametri 'params' (vedi cache_params). La cache è indicizzata con l'IA
+    al tratto, come il libro delle aperture.
+
+    Restituisce la colonna, aggiornando search_info (e 'stats', se indicato),
+    oppure None.
+    """
+    entry = cached_move(board if piece == AI_PIECE else swap_colors(board), params)
+    if entry is None:
+        return None
+    best_col, value, depth = entry
+    search_info.update(depth=depth, move=best_col, value=value, nodes=0)
+    if stats is not None:
+        stats.source = 'cache'
+        stats.depth_completed = depth
+    return best_col
+
+
+def cache_store(board, params, best_col, stats, max_depth, piece=AI_PIECE):
+    """
+    Salva nella cache delle analisi la mossa scelta, con valore di search_info,
+    solo se non dipende dal tempo disponibile: ricerche arrivate a max_depth e
+    posizioni risolte.
+    """
+    if best_col is not None and (stats.source == 'endgame' or (stats.source == 'search' and stats.depth_completed >= max_depth)):
+        store_move(board if piece == AI_PIECE else swap_colors(board), params, best_col, search_info['value'],
+                   stats.depth_completed)
+
+
+def known_move(board, time_limit, use_book=False, endgame_threshold=0, should_stop=None, stats=None, geometry=None, piece=AI_PIECE, book=None):
+    """
+    Mossa del giocatore al tratto 'piece' che non richiede la ricerca euristica:
+    quella del libro delle aperture (se use_book e il libro è stato generato
+    con i parametri 'book', vedi book_params) oppure, con al più
+    endgame_threshold celle libere, quella del risolutore esatto di fine partita
+    (vedi algorithms.endgame_solver), che ha a disposizione
+    ENDGAME_TIME_RATIO * time_limit secondi. Libro e risolutore esistono solo
+    per la griglia standard; il libro è indicizzato con l'IA al tratto, quindi
+    per PLAYER_PIECE si consulta la board con i colori scambiati.
+
+    Restituisce la colonna, aggiornando search_info (e 'stats', se indicato),
+    oppure None.
+    """
+    if board_geometry(board, geometry) is not STANDARD_GEOMETRY:
+        return None
+    if use_book and book is not None:
+        entry = book_move(board if piece == AI_PIECE else swap_colors(board), book)
+        if entry is not None:
+            best_col, value, depth = entry
+            search_info.update(depth=depth, move=best_col, value=value, nodes=0)
+            if stats is not None:
+                stats.source = 'book'
+                stats.depth_completed = depth
+            return best_col
+    empty = empty_cells(board)
+    if 0 < empty <= endgame_threshold:
+        try:
+            result = solve_board(board, time_limit * ENDGAME_TIME_RATIO, should_stop, piece)
+        except SearchTimeout:
+            return None
+        search_info.update(depth=empty, move=result['move'], value=result['score'], nodes=result['nodes'])
+        if stats is not None:
+            stats.source = 'endgame'
+            stats.depth_completed = empty
+            stats.nodes_per_depth[empty] = result['nodes']
+        return result['move']
+    return None
+
+
+def find_best_move(board, max_depth, beam_width, heuristic_weights, time_limit, center_score_map, should_stop=None, workers=1, use_book=False, endgame_threshold=ENDGAME_EMPTY_CELLS, search_mode='alphabeta', move_ordering='heuristic', return_stats=False, geometry=None, use_cache=False, piece=AI_PIECE, lazy_smp=False):
     """
-    Determina la migliore mossa per l'IA (AI_PIECE) in base allo stato corrente della board,
-    utilizzando approfondimento iterativo, ordinamento dinamico e potatura in avanti (beam search).
+    Determina la migliore mossa per il giocatore al tratto 'piece' (di default
+    l'IA) in base allo stato corrente della board, utilizzando approfondimento
+    iterativo, ordinamento dinamico e potatura in avanti (beam search).
 
     Parametri:
       - board: lo stato corrente della board.
@@ -144,9 +708,81 @@ def find_best_move(board, max_depth, beam_width, heuristic_weights, time_limit,
       - heuristic_weights: pesi per la funzione di valutazione.
       - time_limit: limite di tempo per l'approfondimento iterativo
       - center_score_map: moltiplicatori per le pedine nelle colonne centrali
+      - should_stop: funzione opzionale senza argomenti; se restituisce True la
+        ricerca termina subito con la mossa dell'ultima iterazione completata
+      - workers: numero di processi tra cui dividere le mosse alla radice
+        (vedi algorithms.parallel_search); con 1 la ricerca è seriale
+      - use_book: se True e la posizione è nel libro delle aperture
+        (vedi algorithms.opening_book) la mossa del libro viene restituita
+        senza cercare; un libro generato con altri parametri di valutazione
+        viene ignorato
+      - endgame_threshold: con al più questo numero di celle libere la
+        posizione viene risolta in modo esatto (0 per disattivare); se il
+        risolutore non termina in tempo si usa la ricerca euristica
+      - search_mode: 'alphabeta' oppure 'pvs' (Principal Variation Search con
+        finestre di aspirazione), vedi iterative_deepening_minimax; la ricerca
+        parallela (workers > 1) usa sempre 'alphabeta'
+      - move_ordering: 'heuristic' oppure 'history' (killer move e history
+        table), vedi iterative_deepening_minimax; solo per la ricerca seriale
+      - return_stats: se True viene restituita la coppia (best_col, SearchStats)
+      - geometry: geometria della griglia (vedi geometry.py); di default è
+        ricavata dalla forma della board con 4 in fila. center_score_map viene
+        adattata al numero di colonne; libro e risolutore di fine partita sono
+        usati solo sulla griglia standard
+      - use_cache: se True la mossa viene cercata prima nella cache persistente
+        delle analisi (vedi algorithms.analysis_cache) e, se la ricerca arriva
+        a max_depth o la posizione viene risolta, il risultato vi viene salvato
+      - piece: giocatore al tratto (AI_PIECE o PLAYER_PIECE); la ricerca per
+        PLAYER_PIECE equivale a quella per l'IA sulla board con i colori
+        scambiati, con cui condivide libro e cache delle analisi
+      - lazy_smp: se True la ricerca viene delegata a
+        algorithms.lazy_smp.find_best_move, con 'workers' processi che
+        condividono la tabella delle trasposizioni
 
     Restituisce:
-      - best_col: indice della colonna che rappresenta la mossa ottimale per l'IA.
+      - best_col: indice della colonna che rappresenta la mossa ottimale per 'piece'
+        (con return_stats, la coppia (best_col, stats)).
 
+    I contatori della tabella delle trasposizioni relativi a questa chiamata sono
+    disponibili, al termine, tramite get_transposition_stats(); la latenza della
+    mossa viene aggiunta alle statistiche di get_latency_stats(). L'esito esatto
+    (vittoria/pareggio/sconfitta e distanza) dell'ultima posizione risolta è
+    disponibile tramite endgame_solver.get_last_endgame_result(); i tagli e la
+    loro frazione alla prima mossa tramite get_ordering_stats(); hit e miss
+    della cache tramite analysis_cache.get_cache_stats(). Al termine
+    viene emesso l'evento SEARCH_COMPLETE (vedi algorithms.search_stats).
+    Con workers > 1 il pool di processi viene avviato alla prima chiamata,
+    prima di far partire il time_limit.
     """
-    return iterative_deepening_minimax(board, max_depth, beam_width, heuristic_weights, time_limit, center_score_map)
\ No newline at end of file
+    if lazy_smp:
+        from algorithms.lazy_smp import find_best_move as lazy_smp_find_best_move
+        return lazy_smp_find_best_move(board, max_depth, beam_width, heuristic_weights, time_limit, center_score_map,
+                                       should_stop, workers, use_book, endgame_threshold, search_mode, move_ordering,
+                                       return_stats, geometry, use_cache, piece)
+    if workers > 1:
+        from algorithms.parallel_search import get_executor
+        get_executor(workers)
+    start_time = time.perf_counter()
+    stats = SearchStats()
+    best_col = None
+    if use_cache:
+        params = cache_params(max_depth, beam_width, heuristic_weights, center_score_map, endgame_threshold, search_mode, move_ordering, geometry)
+        best_col = cache_lookup(board, params, stats, piece)
+    if best_col is None:
+        best_col = known_move(board, time_limit, use_book, endgame_threshold, should_stop, stats, geometry, piece,
+                              book_params(beam_width, heuristic_weights, center_score_map))
+    if best_col is None:
+        remaining = max(0.0, time_limit - (time.perf_counter() - start_time))
+        if workers > 1:
+            from algorithms.parallel_search import iterative_deepening_parallel
+            best_col = iterative_deepening_parallel(board, max_depth, beam_width, heuristic_weights, remaining, center_score_map, workers, should_stop, stats, geometry, piece)
+        else:
+            best_col = iterative_deepening_minimax(board, max_depth, beam_width, heuristic_weights, remaining, center_score_map, should_stop, search_mode, move_ordering, stats, geometry, piece)
+    if use_cache:
+        cache_store(board, params, best_col, stats, max_depth, piece)
+    stats.total_time = time.perf_counter() - start_time
+    latency_stats.record(stats.total_time, time_limit)
+    emit(SEARCH_COMPLETE, move=best_col, stats=stats.as_dict())
+    if return_stats:
+        return best_col, stats
+    return best_col
@@ -9,51 +9,37 @@ L'algoritmo esplora l'intero game tree e restituisce:
 from board import (
     PLAYER_PIECE,
     AI_PIECE,
-    winning_move,
-    get_valid_locations,
-    get_next_open_row,
-    drop_piece,
-    is_terminal_node,
     score_position,
-    ROWS,
-    COLS
 )
+from position import Position
 
-def is_draw(board):
-    """
-    Restituisce True se la board non ha mosse valide (pareggio).
-    """
-    return len(get_valid_locations(board)) == 0
-
-
-def clone_board(board):
-    """
-    Crea e restituisce una copia della board.
-    """
-    return board.copy()
 
-
-def minimax_alpha_beta(board, maximizing_player, alpha, beta, depth, max_depth):
+def minimax_alpha_beta(position, maximizing_player, alpha, beta, depth, max_depth, heuristic_weights, center_score_map, last_move=None):
     # Controllo dei casi terminali
-    if winning_move(board, PLAYER_PIECE):
-        return -10000
-    if winning_move(board, AI_PIECE):
-        return +10000
-    if is_draw(board):
+    if last_move is not None:
+        # Dopo una mossa può aver vinto solo chi l'ha giocata
+        row, col, piece = last_move
+        if position.winning_move_at(row, col, piece):
+            return +10000 if piece == AI_PIECE else -10000
+    else:
+        if position.winning_move(PLAYER_PIECE):
+            return -10000
+        if position.winning_move(AI_PIECE):
+            return +10000
+    if position.is_full():
         return 0
 
     if depth == max_depth:
-        return score_position(board, AI_PIECE)  # Sempre dal punto di vista dell’IA
+        return score_position(position.board, AI_PIECE, heuristic_weights, center_score_map)  # Sempre dal punto di vista dell’IA
 
-    valid_locations = get_valid_locations(board)
+    valid_locations = position.get_valid_locations()
 
     if maximizing_player:
         best_value = float('-inf')
         for col in valid_locations:
-            new_board = clone_board(board)
-            row = get_next_open_row(new_board, col)
-            drop_piece(new_board, row, col, AI_PIECE)
-            value = minimax_alpha_beta(new_board, False, alpha, beta, depth + 1, max_depth)
+            row = position.play(col, AI_PIECE)
+            value = minimax_alpha_beta(position, False, alpha, beta, depth + 1, max_depth, heuristic_weights, center_score_map, (row, col, AI_PIECE))
+            position.undo_move()
             best_value = max(best_value, value)
             alpha = max(alpha, best_value)
             if alpha >= beta:
@@ -62,10 +48,9 @@ def minimax_alpha_beta(board, maximizing_player, alpha, beta, depth, max_depth):
     else:
         best_value = float('inf')
         for col in valid_locations:
-            new_board = clone_board(board)
-            row = get_next_open_row(new_board, col)
-            drop_piece(new_board, row, col, PLAYER_PIECE)
-            value = minimax_alpha_beta(new_board, True, alpha, beta, depth + 1, max_depth)
+            row = position.play(col, PLAYER_PIECE)
+            value = minimax_alpha_beta(position, True, alpha, beta, depth + 1, max_depth, heuristic_weights, center_score_map, (row, col, PLAYER_PIECE))
+            position.undo_move()
             best_value = min(best_value, value)
             beta = min(beta, best_value)
             if alpha >= beta:
@@ -74,21 +59,22 @@ def minimax_alpha_beta(board, maximizing_player, alpha, beta, depth, max_depth):
 
 
 
-def find_best_move(board, max_depth):
+def find_best_move(board, max_depth, heuristic_weights, center_score_map):
     """
     Determina la migliore mossa per l'IA (AI_PIECE) in base allo stato corrente della board,
     valutando le possibili mosse tramite l'algoritmo minimax con potatura alpha-beta
-    e un limite di profondità parametrizzato.
+    e un limite di profondità parametrizzato. heuristic_weights e center_score_map
+    sono quelli di DIFFICULTY_LEVELS, usati da score_position sulle foglie.
     """
 
     best_value = float('-inf')
     best_col = None
+    position = Position(board)
 
-    for col in get_valid_locations(board):
-        new_board = clone_board(board)
-        row = get_next_open_row(new_board, col)
-        drop_piece(new_board, row, col, AI_PIECE)
-        move_value = minimax_alpha_beta(new_board, False, float('-inf'), float('inf'), 1, max_depth)
+    for col in position.get_valid_locations():
+        row = position.play(col, AI_PIECE)
+        move_value = minimax_alpha_beta(position, False, float('-inf'), float('inf'), 1, max_depth, heuristic_weights, center_score_map, (row, col, AI_PIECE))
+        position.undo_move()
         if move_value > best_value:
             best_value = move_value
             best_col = col
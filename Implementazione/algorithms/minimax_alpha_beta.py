@@ -9,53 +9,46 @@ L'algoritmo esplora l'intero game tree e restituisce:
 from board import (
     PLAYER_PIECE,
     AI_PIECE,
-    winning_move,
-    get_valid_locations,
-    get_next_open_row,
-    drop_piece
 )
+from position import Position
 
 
-def is_draw(board):
-    """Restituisce True se la board non ha mosse valide."""
-    return len(get_valid_locations(board)) == 0
-
-
-def clone_board(board):
-    """
-    Crea e restituisce una copia della board.
-    """
-    return board.copy()
-
-
-def minimax_alpha_beta(board, maximizing_player, alpha, beta):
+def minimax_alpha_beta(position, maximizing_player, alpha, beta, last_move=None):
     """
     Parametri:
-      - board: lo stato corrente della board.
+      - position: lo stato corrente (position.Position); le mosse vengono
+        giocate e annullate sul posto.
       - maximizing_player: True se il turno è dell'IA, False se è del giocatore.
       - alpha: il miglior punteggio già garantito per il ramo maximizer.
       - beta: il miglior punteggio già garantito per il ramo minimizer.
+      - last_move: (row, col, piece) della mossa che ha portato a questo stato;
+        se indicata la vittoria viene cercata solo nelle finestre di quella cella.
 
     Restituisce:
       Il valore minimax per lo stato corrente.
     """
     # Controllo dei casi terminali
-    if winning_move(board, PLAYER_PIECE):
-        return -10000
-    if winning_move(board, AI_PIECE):
-        return +10000
-    if is_draw(board):
+    if last_move is not None:
+        # Dopo una mossa può aver vinto solo chi l'ha giocata
+        row, col, piece = last_move
+        if position.winning_move_at(row, col, piece):
+            return +10000 if piece == AI_PIECE else -10000
+    else:
+        if position.winning_move(PLAYER_PIECE):
+            return -10000
+        if position.winning_move(AI_PIECE):
+            return +10000
+    if position.is_full():
         return 0
 
-    valid_locations = get_valid_locations(board)
+    valid_locations = position.get_valid_locations()
 
     if maximizing_player:
         best_value = float('-inf')
         for col in valid_locations:
-            new_board = clone_board(board)
-            row = get_next_open_row(new_board, col)
-            drop_piece(new_board, row, col, AI_PIECE)
-            value = minimax_alpha_beta(new_board, False, alpha, beta)
+            row = position.play(col, AI_PIECE)
+            value = minimax_alpha_beta(position, False, alpha, beta, (row, col, AI_PIECE))
+            position.undo_move()
             best_value = max(best_value, value)
             alpha = max(alpha, best_value)
             if alpha >= beta:
@@ -64,10 +57,9 @@ def minimax_alpha_beta(board, maximizing_player, alpha, beta):
     else:
         best_value = float('inf')
         for col in valid_locations:
-            new_board = clone_board(board)
-            row = get_next_open_row(new_board, col)
-            drop_piece(new_board, row, col, PLAYER_PIECE)
-            value = minimax_alpha_beta(new_board, True, alpha, beta)
+            row = position.play(col, PLAYER_PIECE)
+            value = minimax_alpha_beta(position, True, alpha, beta, (row, col, PLAYER_PIECE))
+            position.undo_move()
             best_value = min(best_value, value)
             beta = min(beta, best_value)
             if alpha >= beta:
@@ -83,12 +75,12 @@ def find_best_move(board):
     """
     best_value = float('-inf')
     best_col = None
+    position = Position(board)
 
-    for col in get_valid_locations(board):
-        new_board = clone_board(board)
-        row = get_next_open_row(new_board, col)
-        drop_piece(new_board, row, col, AI_PIECE)
-        move_value = minimax_alpha_beta(new_board, False, float('-inf'), float('inf'))
+    for col in position.get_valid_locations():
+        row = position.play(col, AI_PIECE)
+        move_value = minimax_alpha_beta(position, False, float('-inf'), float('inf'), (row, col, AI_PIECE))
+        position.undo_move()
         if move_value > best_value:
             best_value = move_value
             best_col = col
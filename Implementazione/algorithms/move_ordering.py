@@ -0,0 +1,60 @@
+"""
+Ordinamento delle mosse con killer move e history heuristic.
+
+Al posto di valutare ogni figlio con l'euristica, le mosse di un nodo vengono
+ordinate con informazioni raccolte durante la ricerca stessa:
+  - la mossa della tabella delle trasposizioni,
+  - le killer move del ply (le ultime due mosse che hanno causato un taglio a
+    quella distanza dalla radice),
+  - la history table, indicizzata da (pedina, riga, colonna), che accumula
+    remaining_depth^2 per ogni taglio,
+  - a parità, l'ordine statico dal centro verso i bordi.
+"""
+from board import PLAYER_PIECE, AI_PIECE, STANDARD_GEOMETRY
+
+KILLERS_PER_PLY = 2
+
+
+class MoveOrdering:
+    """
+    Killer move e history table di una ricerca. Le tabelle restano valide tra
+    le iterazioni dell'approfondimento iterativo. 'geometry' è la geometria
+    della griglia (di default quella standard).
+    """
+
+    def __init__(self, geometry=None):
+        geometry = geometry or STANDARD_GEOMETRY
+        self.killers = {}
+        self.history = [[[0] * geometry.cols for _ in range(geometry.rows)]
+                        for _ in range(max(PLAYER_PIECE, AI_PIECE) + 1)]
+        self.center_rank = [geometry.center_order.index(col) for col in range(geometry.cols)]
+
+    def order(self, moves, rows, piece, ply, tt_move=None):
+        """
+        Ordina le colonne 'moves' (con 'rows' le righe in cui cadrebbe la
+        pedina) per il giocatore 'piece' al ply indicato.
+        """
+        killers = self.killers.get(ply, ())
+        history = self.history[piece]
+        center_rank = self.center_rank
+
+        def key(item):
+            col, row = item
+            if col == tt_move:
+                return 0, 0, 0
+            if col in killers:
+                return 1, killers.index(col), 0
+            return 2, -history[row][col], center_rank[col]
+
+        return [col for col, _ in sorted(zip(moves, rows), key=key)]
+
+    def record_cutoff(self, piece, row, col, ply, remaining_depth):
+        """
+        Aggiorna killer move e history table per una mossa che ha causato un taglio.
+        """
+        killers = self.killers.setdefault(ply, [])
+        if col in killers:
+            killers.remove(col)
+        killers.insert(0, col)
+        del killers[KILLERS_PER_PLY:]
+        self.history[piece][row][col] += remaining_depth * remaining_depth
@@ -0,0 +1,201 @@
+"""
+Libro delle aperture.
+
+Il libro viene generato offline cercando in profondità, con la ricerca di
+minimax_ab_all_improvements, le posizioni delle prime 'plies' mosse in cui
+muove l'IA: per l'IA si segue solo la mossa del libro, per l'avversario tutte
+le risposte possibili (sia con l'IA che inizia sia con l'avversario che inizia).
+
+Il file è binario e ordinato per chiave:
+  - intestazione di 24 byte: magic, numero di semimosse coperte, numero di
+    record e identificativo dei parametri di valutazione (beam, pesi,
+    punteggi delle colonne) con cui è stato generato, vedi
+    minimax_ab_all_improvements.book_params
+  - record di 16 byte: hash di Zobrist canonico della posizione (IA al
+    tratto), valore, mossa e profondità della ricerca che li ha prodotti
+Una posizione e la sua riflessa hanno un solo record (la chiave è il minore
+dei due hash, vedi transposition_table.canonical_hash); la mossa si riferisce
+alla forma canonica e viene riflessa se la posizione cercata è l'altra.
+Il libro risponde solo a una ricerca con gli stessi parametri di valutazione:
+con parametri diversi (un altro livello) book_move restituisce None.
+A runtime il file viene mappato in memoria (mmap) e interrogato con una ricerca
+binaria, senza caricarlo per intero.
+
+Generazione, dalla cartella Implementazione:
+
+    python -m algorithms.opening_book --plies 6 --depth 10 --level 3
+"""
+import argparse
+import mmap
+import os
+import struct
+import time
+
+from algorithms.transposition_table import canonical_hash
+from board import (
+    PLAYER_PIECE,
+    AI_PIECE,
+    create_board,
+    drop_piece,
+    get_next_open_row,
+    get_valid_locations,
+    is_valid_location,
+    winning_move,
+    mirror_move,
+)
+
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "opening_book.bin")
+
+BOOK_MAGIC = b"C4BOOK03"
+HEADER = struct.Struct("<8sIIq")
+RECORD = struct.Struct("<QiBB2x")
+KEY = struct.Struct("<Q")
+
+# Libri già aperti, indicizzati per percorso
+_books = {}
+
+
+class OpeningBook:
+    """
+    Libro delle aperture mappato in memoria. lookup restituisce la tupla
+    (mossa, valore, profondità) oppure None se la posizione non è nel libro;
+    'params' è l'identificativo dei parametri con cui è stato generato.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as book_file:
+            self.data = mmap.mmap(book_file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.plies, self.size, self.params = HEADER.unpack_from(self.data, 0)
+        if magic != BOOK_MAGIC or len(self.data) != HEADER.size + self.size * RECORD.size:
+            self.data.close()
+            raise ValueError(f"File del libro delle aperture non valido: {path}")
+
+    def lookup(self, key):
+        data = self.data
+        low, high = 0, self.size
+        while low < high:
+            middle = (low + high) // 2
+            (middle_key,) = KEY.unpack_from(data, HEADER.size + middle * RECORD.size)
+            if middle_key < key:
+                low = middle + 1
+            else:
+                high = middle
+        if low == self.size:
+            return None
+        record_key, value, move, depth = RECORD.unpack_from(data, HEADER.size + low * RECORD.size)
+        if record_key != key:
+            return None
+        return move, value, depth
+
+    def close(self):
+        self.data.close()
+
+
+def get_opening_book(path=BOOK_PATH):
+    """
+    Restituisce il libro al percorso indicato, aprendolo alla prima chiamata, o
+    None se il file non esiste.
+    """
+    if path not in _books:
+        _books[path] = OpeningBook(path) if os.path.exists(path) else None
+    return _books[path]
+
+
+def book_move(board, params, path=BOOK_PATH):
+    """
+    Restituisce (mossa, valore, profondità) per la posizione, con l'IA al tratto,
+    se è nel libro, il libro è stato generato con i parametri 'params' e la
+    mossa è legale; altrimenti None.
+    """
+    book = get_opening_book(path)
+    if book is None or book.params != params:
+        return None
+    key, mirrored = canonical_hash(board, True)
+    entry = book.lookup(key)
+    if entry is None:
+        return None
+    move, value, depth = entry
+    if mirrored:
+        move = mirror_move(move, board.shape[1])
+    if not is_valid_location(board, move):
+        return None
+    return move, value, depth
+
+
+def write_book(path, entries, plies, params):
+    """
+    Scrive il libro: 'entries' è un dizionario chiave -> (mossa, valore, profondità),
+    'params' l'identificativo dei parametri con cui è stato generato.
+    """
+    with open(path, "wb") as book_file:
+        book_file.write(HEADER.pack(BOOK_MAGIC, plies, len(entries), params))
+        for key in sorted(entries):
+            move, value, depth = entries[key]
+            book_file.write(RECORD.pack(key, int(value), move, depth))
+
+
+def generate_book(plies, depth, params, verbose=False):
+    """
+    Cerca a profondità 'depth' (senza limite di tempo) tutte le posizioni con
+    meno di 'plies' pedine raggiungibili seguendo le mosse del libro per l'IA.
+    Restituisce il dizionario chiave -> (mossa, valore, profondità); le
+    posizioni riflesse di posizioni già cercate non vengono cercate di nuovo.
+    """
+    from algorithms.minimax_ab_all_improvements import iterative_deepening_minimax, get_search_info
+
+    entries = {}
+
+    def expand(board, ply, ai_to_move):
+        if ply >= plies:
+            return
+        if ai_to_move:
+            key, mirrored = canonical_hash(board, True)
+            if key not in entries:
+                start_time = time.perf_counter()
+                iterative_deepening_minimax(board.copy(), depth, params['beam_width'], params['heuristic_weights'],
+                                            float('inf'), params['center_score_map'])
+                info = get_search_info()
+                move = mirror_move(info['move']) if mirrored else info['move']
+                entries[key] = (move, info['value'], info['depth'])
+                if verbose:
+                    print(f"{len(entries)} posizioni, semimossa {ply}: colonna {info['move']} "
+                          f"(valore {info['value']}, {time.perf_counter() - start_time:.2f} s)")
+            moves = [mirror_move(entries[key][0]) if mirrored else entries[key][0]]
+        else:
+            moves = get_valid_locations(board)
+
+        piece = AI_PIECE if ai_to_move else PLAYER_PIECE
+        for col in moves:
+            new_board = board.copy()
+            drop_piece(new_board, get_next_open_row(new_board, col), col, piece)
+            if not winning_move(new_board, piece):
+                expand(new_board, ply + 1, not ai_to_move)
+
+    # Partite in cui inizia l'IA e partite in cui inizia l'avversario
+    expand(create_board(), 0, True)
+    expand(create_board(), 0, False)
+    return entries
+
+
+def main(argv=None):
+    from algorithms.minimax_ab_all_improvements import book_params
+    from difficulty import DIFFICULTY_LEVELS
+
+    parser = argparse.ArgumentParser(description="Genera il libro delle aperture.")
+    parser.add_argument("--plies", type=int, default=6, help="semimosse coperte dal libro")
+    parser.add_argument("--depth", type=int, default=10, help="profondità della ricerca per ogni posizione")
+    parser.add_argument("--level", type=int, choices=[1, 2, 3], default=3, help="livello da cui prendere i pesi")
+    parser.add_argument("--output", default=BOOK_PATH, help="file del libro")
+    args = parser.parse_args(argv)
+
+    start_time = time.perf_counter()
+    params = DIFFICULTY_LEVELS[args.level]
+    entries = generate_book(args.plies, args.depth, params, verbose=True)
+    write_book(args.output, entries, args.plies,
+               book_params(params['beam_width'], params['heuristic_weights'], params['center_score_map']))
+    print(f"{len(entries)} posizioni scritte in {args.output} ({time.perf_counter() - start_time:.1f} s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,192 @@
+"""
+Ricerca parallela alla radice (root splitting).
+
+Ad ogni iterazione dell'approfondimento iterativo le mosse della radice vengono
+distribuite su un pool di processi. I worker condividono il miglior valore
+trovato finora e l'indice (nell'ordinamento della radice) della mossa che lo ha
+ottenuto: ogni mossa viene cercata con alpha pari a quel valore, così può essere
+potata come nella ricerca seriale.
+
+La mossa scelta coincide con quella della ricerca seriale alla stessa
+profondità, dove a parità di valore vince la mossa che viene prima
+nell'ordinamento. Per questo le mosse che precedono la migliore corrente sono
+cercate con alpha appena inferiore al suo valore (basta eguagliarlo), quelle che
+la seguono con alpha pari al valore (devono superarlo). Nei worker la tabella
+delle trasposizioni restituisce solo valori calcolati alla stessa profondità
+residua (SearchContext.exact_depth): la tabella di ogni processo contiene le
+ricerche precedenti di quel processo, che non devono cambiare il risultato.
+"""
+import math
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+
+import algorithms.minimax_ab_all_improvements as serial
+from algorithms.minimax_ab_all_improvements import (
+    SearchContext,
+    order_moves,
+    negamax,
+    root_moves,
+    search_params_key,
+    search_info,
+)
+from algorithms.search_clock import SearchClock, SearchTimeout
+from algorithms.search_stats import SearchStats, emit, ITERATION_COMPLETE
+from algorithms.transposition_table import compute_hash, mirror_hash, update_hash
+from board import PLAYER_PIECE, AI_PIECE, board_geometry, unique_moves
+from geometry import get_geometry
+from evaluator import IncrementalEvaluator
+from position import Position
+
+# Ogni quanto (in secondi) il processo principale controlla should_stop e la scadenza
+POLL_INTERVAL = 0.01
+
+# Pool di processi già avviati, indicizzati per numero di worker
+_executors = {}
+
+# Stato condiviso, impostato nei processi worker da _init_worker
+_best_value = None
+_best_index = None
+_iteration = None
+
+
+def _init_worker(best_value, best_index, iteration):
+    global _best_value, _best_index, _iteration
+    _best_value = best_value
+    _best_index = best_index
+    _iteration = iteration
+
+
+def _warm_up():
+    time.sleep(0.05)
+
+
+def get_executor(workers):
+    """
+    Restituisce (executor, best_value, best_index, iteration) per il numero di
+    worker richiesto, avviando il pool alla prima chiamata.
+    """
+    if workers not in _executors:
+        context = multiprocessing.get_context('spawn')
+        best_value = context.Value('d', float('-inf'))
+        best_index = context.Value('i', 0)
+        # Identifica l'iterazione in corso: i task di iterazioni precedenti si fermano
+        # e non possono più aggiornare il miglior valore condiviso
+        iteration = context.Value('i', 0, lock=False)
+        executor = ProcessPoolExecutor(max_workers=workers, mp_context=context,
+                                       initializer=_init_worker,
+                                       initargs=(best_value, best_index, iteration))
+        # Avvia subito tutti i processi, come lazy_smp.get_pool: altrimenti la
+        # prima iterazione pagherebbe il loro avvio dentro il time_limit
+        wait([executor.submit(_warm_up) for _ in range(workers)])
+        _executors[workers] = (executor, best_value, best_index, iteration)
+    return _executors[workers]
+
+
+def shutdown_executors():
+    for executor, _, _, iteration in _executors.values():
+        iteration.value += 1
+        executor.shutdown(wait=False, cancel_futures=True)
+    _executors.clear()
+
+
+def _search_root_move(board, index, col, depth, beam_width, heuristic_weights, center_score_map, deadline, token, geometry_key, piece=AI_PIECE):
+    """
+    Cerca la mossa 'col' della radice (in posizione 'index' nell'ordinamento) alla
+    profondità indicata, con 'piece' al tratto. Restituisce (index, valore, nodi),
+    con valore None se la ricerca è stata interrotta. 'geometry_key' è la chiave
+    (rows, cols, connect) della geometria della griglia.
+    """
+    with _best_value.get_lock():
+        if _iteration.value != token:
+            return index, None, 0
+        shared_value, shared_index = _best_value.value, _best_index.value
+    alpha = shared_value if index > shared_index else math.nextafter(shared_value, float('-inf'))
+
+    geometry = get_geometry(*geometry_key)
+    serial.transposition_table.new_search(search_params_key(beam_width, heuristic_weights, center_score_map, geometry))
+    position = Position(board, geometry)
+    row = position.play(col, piece)
+    child_hash = update_hash(compute_hash(board, piece == AI_PIECE, piece), row, col, piece)
+    child_mirrored = update_hash(mirror_hash(board, piece == AI_PIECE, piece), row, board.shape[1] - 1 - col, piece)
+    clock = SearchClock(deadline - time.time(), soft_ratio=1.0, should_stop=lambda: _iteration.value != token)
+    context = SearchContext(IncrementalEvaluator(position.board, heuristic_weights, center_score_map, geometry), clock,
+                            geometry=geometry, root_piece=piece, exact_depth=True)
+    opponent = PLAYER_PIECE if piece == AI_PIECE else AI_PIECE
+    try:
+        value = -negamax(position, opponent, float('-inf'), -alpha, 1, depth, beam_width, heuristic_weights, center_score_map, child_hash, context, (row, col, piece), child_mirrored)
+    except SearchTimeout:
+        return index, None, clock.nodes
+
+    with _best_value.get_lock():
+        if _iteration.value == token and (value > _best_value.value or
+                                          (value == _best_value.value and index < _best_index.value)):
+            _best_value.value = value
+            _best_index.value = index
+    return index, value, clock.nodes
+
+
+def iterative_deepening_parallel(board, max_depth, beam_width, heuristic_weights, time_limit, center_score_map, workers, should_stop=None, stats=None, geometry=None, piece=AI_PIECE):
+    """
+    Approfondimento iterativo con le mosse della radice distribuite su 'workers'
+    processi. Gestione del tempo, valore restituito ed evento ITERATION_COMPLETE
+    sono gli stessi di iterative_deepening_minimax. In 'stats' vengono riportati
+    solo nodi, profondità e tempi delle iterazioni: gli altri contatori restano
+    nei processi worker. 'geometry' e il giocatore al tratto 'piece' sono
+    gestiti come in iterative_deepening_minimax. Il pool viene avviato (alla
+    prima chiamata) prima di far partire il time_limit.
+    """
+    stats = stats if stats is not None else SearchStats()
+    geometry = board_geometry(board, geometry)
+    center_score_map = geometry.center_score_map(center_score_map)
+    executor, best_value, best_index, iteration = get_executor(workers)
+    clock = SearchClock(time_limit, should_stop=should_stop)
+    deadline = time.time() + time_limit
+
+    valid_moves = root_moves(board, piece, geometry)
+    ordered_moves = unique_moves(board, order_moves(board, valid_moves, piece, heuristic_weights, center_score_map, geometry=geometry))
+    ordered_moves = ordered_moves[:beam_width] if beam_width < len(ordered_moves) else ordered_moves
+
+    best_move = ordered_moves[0] if ordered_moves else None
+    search_info.update(depth=0, move=best_move, value=None, nodes=0)
+
+    for current_depth in range(1, max_depth + 1):
+        if current_depth > 1 and not clock.can_start_iteration():
+            break
+        clock.start_iteration()
+        with best_value.get_lock():
+            iteration.value += 1
+            best_value.value = float('-inf')
+            best_index.value = len(ordered_moves)
+        token = iteration.value
+
+        futures = [executor.submit(_search_root_move, board, index, col, current_depth, beam_width,
+                                   heuristic_weights, center_score_map, deadline, token, geometry.key, piece)
+                   for index, col in enumerate(ordered_moves)]
+        pending = futures
+        while pending:
+            _, pending = wait(pending, timeout=POLL_INTERVAL)
+            # Oltre la scadenza non si attendono i worker (che la controllano
+            # solo ogni CHECK_INTERVAL nodi): l'iterazione resta incompleta
+            if pending and (time.time() >= deadline or (should_stop is not None and should_stop())):
+                break
+
+        results = [future.result() for future in futures if future.done()]
+        stats.nodes_per_depth[current_depth] = sum(nodes for _, _, nodes in results)
+        if len(results) < len(futures) or any(value is None for _, value, _ in results):
+            # Iterazione incompleta: i task ancora in corso vengono fermati
+            with best_value.get_lock():
+                iteration.value += 1
+            break
+
+        index, value, _ = max(results, key=lambda result: (result[1], -result[0]))
+        best_move = ordered_moves[index]
+        clock.end_iteration()
+        stats.depth_completed = current_depth
+        stats.iteration_times.append(clock.iteration_times[-1])
+        search_info.update(depth=current_depth, move=best_move, value=value)
+        emit(ITERATION_COMPLETE, depth=current_depth, move=best_move, value=value,
+             nodes=stats.nodes_per_depth[current_depth], time=clock.iteration_times[-1], elapsed=clock.elapsed())
+
+    search_info['nodes'] = stats.nodes
+    return best_move
@@ -0,0 +1,119 @@
+"""
+Gestione del tempo della ricerca.
+
+SearchClock viene interrogato dalla ricerca ogni 'check_interval' nodi: oltre la
+scadenza hard solleva SearchTimeout, che risale la ricorsione fino al driver di
+approfondimento iterativo. La scadenza soft serve invece a non iniziare una
+nuova iterazione che non farebbe in tempo a terminare. La ricerca può essere
+interrotta anche dall'esterno (ad esempio quando la partita viene annullata)
+tramite la funzione should_stop.
+
+LatencyStats raccoglie il tempo effettivo di ogni mossa per verificare che il
+limite di tempo venga rispettato.
+"""
+import time
+
+# Frazione di time_limit oltre la quale non si inizia una nuova iterazione
+SOFT_LIMIT_RATIO = 0.5
+
+# Ogni quanti nodi viene letto l'orologio
+CHECK_INTERVAL = 64
+
+
+class SearchTimeout(Exception):
+    """
+    Sollevata quando la ricerca supera la scadenza hard o viene interrotta.
+    """
+
+
+class SearchClock:
+
+    def __init__(self, time_limit, soft_ratio=SOFT_LIMIT_RATIO, check_interval=CHECK_INTERVAL, should_stop=None):
+        self.should_stop = should_stop
+        self.start_time = time.perf_counter()
+        self.time_limit = time_limit
+        self.soft_deadline = self.start_time + time_limit * soft_ratio
+        self.hard_deadline = self.start_time + time_limit
+        self.check_interval = check_interval
+        self.nodes = 0
+        self.next_check = check_interval
+        self.iteration_times = []
+        self.iteration_start = self.start_time
+
+    def tick(self):
+        """
+        Conta un nodo e, ogni check_interval nodi, controlla la scadenza hard e
+        l'eventuale richiesta di interruzione dall'esterno (should_stop).
+        """
+        self.nodes += 1
+        if self.nodes >= self.next_check:
+            self.next_check += self.check_interval
+            if time.perf_counter() > self.hard_deadline:
+                raise SearchTimeout()
+            if self.should_stop is not None and self.should_stop():
+                raise SearchTimeout()
+
+    def elapsed(self):
+        return time.perf_counter() - self.start_time
+
+    def start_iteration(self):
+        self.iteration_start = time.perf_counter()
+
+    def end_iteration(self):
+        self.iteration_times.append(time.perf_counter() - self.iteration_start)
+
+    def can_start_iteration(self):
+        """
+        Decide se iniziare una nuova iterazione: no se è già passata la scadenza
+        soft o se la stima del tempo necessario (ultima iterazione moltiplicata per
+        il rapporto di crescita tra le ultime due) supera la scadenza hard.
+        """
+        now = time.perf_counter()
+        if now >= self.soft_deadline:
+            return False
+        if len(self.iteration_times) < 2 or self.iteration_times[-2] <= 0:
+            return True
+        last = self.iteration_times[-1]
+        growth = max(1.0, last / self.iteration_times[-2])
+        return now + last * growth <= self.hard_deadline
+
+
+def percentile(values, fraction):
+    """
+    Percentile con interpolazione lineare di una lista non vuota.
+    """
+    ordered = sorted(values)
+    position = (len(ordered) - 1) * fraction
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+class LatencyStats:
+    """
+    Latenze per mossa (in secondi) e sforamento rispetto al time_limit richiesto.
+    """
+
+    def __init__(self):
+        self.latencies = []
+        self.overshoots = []
+
+    def record(self, elapsed, time_limit):
+        self.latencies.append(elapsed)
+        self.overshoots.append(elapsed - time_limit)
+
+    def reset(self):
+        self.latencies = []
+        self.overshoots = []
+
+    def summary(self):
+        if not self.latencies:
+            return {'moves': 0}
+        return {
+            'moves': len(self.latencies),
+            'p50': percentile(self.latencies, 0.50),
+            'p95': percentile(self.latencies, 0.95),
+            'max': max(self.latencies),
+            'max_overshoot': max(0.0, max(self.overshoots)),
+            'over_limit': sum(1 for overshoot in self.overshoots if overshoot > 0),
+        }
@@ -0,0 +1,112 @@
+"""
+Statistiche della ricerca ed eventi per profiler e logger.
+
+SearchStats raccoglie i contatori di una chiamata a find_best_move (con
+return_stats=True viene restituito insieme alla mossa). Gli eventi permettono
+invece di osservare la ricerca senza modificarne il codice:
+
+    def log_iteration(event):
+        print(event['depth'], event['move'], event['time'])
+
+    subscribe(ITERATION_COMPLETE, log_iteration)
+
+Le funzioni registrate vengono chiamate nel processo che esegue la ricerca,
+con un dizionario che descrive l'evento.
+"""
+
+# Eventi: fine di un'iterazione dell'approfondimento iterativo, fine della ricerca
+ITERATION_COMPLETE = 'iteration_complete'
+SEARCH_COMPLETE = 'search_complete'
+
+_listeners = {ITERATION_COMPLETE: [], SEARCH_COMPLETE: []}
+
+
+def subscribe(event, callback):
+    """
+    Registra callback(evento) per l'evento indicato.
+    """
+    if event not in _listeners:
+        raise ValueError(f"Evento sconosciuto: {event!r} (ammessi: {', '.join(_listeners)})")
+    _listeners[event].append(callback)
+
+
+def unsubscribe(event, callback):
+    if callback in _listeners.get(event, []):
+        _listeners[event].remove(callback)
+
+
+def emit(event, **data):
+    """
+    Notifica l'evento a tutte le funzioni registrate.
+    """
+    if _listeners[event]:
+        data['event'] = event
+        for callback in list(_listeners[event]):
+            callback(dict(data))
+
+
+class SearchStats:
+    """
+    Contatori di una ricerca:
+      - nodes_per_depth: nodi visitati da ogni iterazione (profondità -> nodi),
+        compresa l'eventuale iterazione interrotta,
+      - leaf_evaluations: valutazioni euristiche delle foglie,
+      - winning_move_calls: chiamate a winning_move per i casi terminali,
+      - cutoffs / first_move_cutoffs: tagli alpha-beta e quanti alla prima mossa,
+      - beam_truncated: mosse scartate dalla beam search,
+      - threat_cutoffs: nodi risolti dall'analisi delle minacce (vittoria
+        immediata o ogni mossa perdente, vedi Position.threat_moves),
+      - tt_hits: valori restituiti direttamente dalla tabella delle trasposizioni,
+      - depth_completed: ultima profondità completata,
+      - iteration_times: durata (s) di ogni iterazione completata,
+      - source: 'search', 'book', 'endgame' o 'cache' a seconda di chi ha scelto la mossa.
+    """
+
+    def __init__(self):
+        self.nodes_per_depth = {}
+        self.leaf_evaluations = 0
+        self.winning_move_calls = 0
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self.beam_truncated = 0
+        self.threat_cutoffs = 0
+        self.tt_hits = 0
+        self.depth_completed = 0
+        self.iteration_times = []
+        self.source = 'search'
+        self.total_time = 0.0
+
+    @property
+    def nodes(self):
+        return sum(self.nodes_per_depth.values())
+
+    def effective_branching_factor(self):
+        """
+        Media dei rapporti tra i nodi di iterazioni complete consecutive (None
+        con meno di due iterazioni complete).
+        """
+        counts = [self.nodes_per_depth[depth] for depth in sorted(self.nodes_per_depth)
+                  if depth <= self.depth_completed]
+        ratios = [current / previous for previous, current in zip(counts, counts[1:]) if previous > 0]
+        return sum(ratios) / len(ratios) if ratios else None
+
+    def as_dict(self):
+        return {
+            'source': self.source,
+            'depth_completed': self.depth_completed,
+            'nodes': self.nodes,
+            'nodes_per_depth': dict(self.nodes_per_depth),
+            'leaf_evaluations': self.leaf_evaluations,
+            'winning_move_calls': self.winning_move_calls,
+            'cutoffs': self.cutoffs,
+            'first_move_cutoffs': self.first_move_cutoffs,
+            'beam_truncated': self.beam_truncated,
+            'threat_cutoffs': self.threat_cutoffs,
+            'tt_hits': self.tt_hits,
+            'iteration_times': list(self.iteration_times),
+            'effective_branching_factor': self.effective_branching_factor(),
+            'total_time': self.total_time,
+        }
+
+    def __repr__(self):
+        return f"SearchStats({self.as_dict()})"
@@ -0,0 +1,184 @@
+"""
+Tabella delle trasposizioni con hashing di Zobrist.
+
+L'hash di una posizione è lo XOR di una chiave casuale a 64 bit per ogni
+pedina presente (pedina, riga, colonna) più una chiave per il turno: si
+aggiorna in modo incrementale con due XOR per ogni mossa. La ricerca mantiene
+anche l'hash della board riflessa e usa come chiave il minore dei due, così
+una posizione e la sua riflessa occupano una sola entry (canonical_hash).
+
+La tabella è limitata: ogni indice contiene un bucket con due slot,
+  - uno slot "depth-preferred", sostituito solo da ricerche almeno altrettanto
+    profonde (o dalla stessa posizione),
+  - uno slot "always-replace", sovrascritto a ogni store che non finisce nel
+    primo slot.
+"""
+import random
+
+from board import ROWS, COLS, PLAYER_PIECE, AI_PIECE
+from geometry import MAX_ROWS, MAX_COLS
+
+# Tipi di valore memorizzato
+EXACT = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+# Profondità assegnata agli stati terminali: il loro valore è valido a ogni
+# profondità (maggiore della profondità residua massima su qualunque griglia)
+TERMINAL_DEPTH = MAX_ROWS * MAX_COLS
+
+# Stima dell'occupazione in memoria di una entry (tupla di 5 interi + riferimento)
+ENTRY_BYTES = 128
+
+# Il seed è fisso: gli hash sono identici tra esecuzioni e processi diversi
+_rng = random.Random(0x0C4)
+
+ZOBRIST_KEYS = [[[0] * COLS for _ in range(ROWS)]]
+for _piece in (PLAYER_PIECE, AI_PIECE):
+    ZOBRIST_KEYS.append([[_rng.getrandbits(64) for _ in range(COLS)] for _ in range(ROWS)])
+
+# Chiave XOR-ata quando deve muovere il giocatore che massimizza (l'IA)
+ZOBRIST_MAX_TURN = _rng.getrandbits(64)
+
+# Chiavi delle celle fuori dalla griglia standard (fino a MAX_ROWS x MAX_COLS),
+# estratte dopo le altre: gli hash della griglia standard, usati anche come
+# chiavi del libro delle aperture, non cambiano
+for _piece in (PLAYER_PIECE, AI_PIECE):
+    _keys = ZOBRIST_KEYS[_piece]
+    for _row in _keys:
+        _row.extend(_rng.getrandbits(64) for _ in range(MAX_COLS - COLS))
+    _keys.extend([_rng.getrandbits(64) for _ in range(MAX_COLS)] for _ in range(MAX_ROWS - ROWS))
+ZOBRIST_KEYS[0] = [[0] * MAX_COLS for _ in range(MAX_ROWS)]
+
+# Chiave del giocatore alla radice della ricerca: i valori di negamax dipendono
+# da chi è alla radice (vedi minimax_ab_all_improvements.negamax), quindi le
+# ricerche per PLAYER_PIECE usano chiavi diverse; con l'IA alla radice la
+# chiave è 0 e gli hash restano quelli di sempre
+ZOBRIST_ROOT_KEYS = {AI_PIECE: 0, PLAYER_PIECE: _rng.getrandbits(64)}
+
+
+def compute_hash(board, maximizing_player, root_piece=AI_PIECE):
+    """
+    Calcola da zero l'hash di Zobrist della board (usato solo alla radice).
+    'maximizing_player' è True se deve muovere l'IA; 'root_piece' è il
+    giocatore alla radice della ricerca.
+    """
+    board_hash = ZOBRIST_MAX_TURN if maximizing_player else 0
+    board_hash ^= ZOBRIST_ROOT_KEYS[root_piece]
+    rows, cols = board.shape
+    for r in range(rows):
+        for c in range(cols):
+            piece = int(board[r][c])
+            if piece != 0:
+                board_hash ^= ZOBRIST_KEYS[piece][r][c]
+    return board_hash
+
+
+def mirror_hash(board, maximizing_player, root_piece=AI_PIECE):
+    """
+    Hash di Zobrist della board riflessa orizzontalmente.
+    """
+    return compute_hash(board[:, ::-1], maximizing_player, root_piece)
+
+
+def canonical_hash(board, maximizing_player):
+    """
+    Restituisce (chiave, riflessa): il minore tra l'hash della board e quello
+    della board riflessa, e True se è il secondo (le mosse associate alla
+    chiave vanno allora riflesse, vedi board.mirror_move).
+    """
+    board_hash = compute_hash(board, maximizing_player)
+    mirrored_hash = mirror_hash(board, maximizing_player)
+    return (mirrored_hash, True) if mirrored_hash < board_hash else (board_hash, False)
+
+
+def update_hash(board_hash, row, col, piece):
+    """
+    Restituisce l'hash della posizione ottenuta inserendo 'piece' in [row, col]
+    (il turno passa all'altro giocatore).
+    """
+    return board_hash ^ ZOBRIST_KEYS[piece][row][col] ^ ZOBRIST_MAX_TURN
+
+
+class TranspositionTable:
+    """
+    Tabella delle trasposizioni a dimensione fissa.
+
+    La dimensione si indica in numero di entry (size_entries) oppure in MB
+    (size_mb, convertiti con ENTRY_BYTES). Ogni entry è la tupla
+    (key, depth, score, flag, move), dove depth è la profondità residua della
+    ricerca che l'ha prodotta.
+    """
+
+    def __init__(self, size_entries=None, size_mb=64):
+        if size_entries is None:
+            size_entries = int(size_mb * 1024 * 1024) // ENTRY_BYTES
+        self.buckets = max(1, size_entries // 2)
+        self.depth_slots = [None] * self.buckets
+        self.always_slots = [None] * self.buckets
+        self.search_params = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.hits = 0
+        self.misses = 0
+        self.collisions = 0
+        self.stores = 0
+
+    def clear(self):
+        self.depth_slots = [None] * self.buckets
+        self.always_slots = [None] * self.buckets
+
+    def new_search(self, search_params):
+        """
+        Prepara la tabella per una nuova chiamata a find_best_move: i valori
+        dipendono da beam_width e pesi, quindi la tabella viene svuotata solo se
+        i parametri di ricerca sono cambiati. I contatori ripartono da zero.
+        """
+        if search_params != self.search_params:
+            self.clear()
+            self.search_params = search_params
+        self.reset_stats()
+
+    def probe(self, key):
+        """
+        Restituisce l'entry memorizzata per 'key', oppure None.
+        Un bucket occupato da altre posizioni conta come collisione.
+        """
+        index = key % self.buckets
+        entry = self.depth_slots[index]
+        if entry is not None and entry[0] == key:
+            self.hits += 1
+            return entry
+        other = self.always_slots[index]
+        if other is not None and other[0] == key:
+            self.hits += 1
+            return other
+        self.misses += 1
+        if entry is not None or other is not None:
+            self.collisions += 1
+        return None
+
+    def store(self, key, depth, score, flag, move):
+        index = key % self.buckets
+        entry = (key, depth, score, flag, move)
+        current = self.depth_slots[index]
+        self.stores += 1
+        if current is None or current[0] == key or depth >= current[1]:
+            # La entry spodestata dallo slot depth-preferred resta nello slot always-replace
+            if current is not None and current[0] != key:
+                self.always_slots[index] = current
+            self.depth_slots[index] = entry
+        else:
+            self.always_slots[index] = entry
+
+    def stats(self):
+        probes = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'collisions': self.collisions,
+            'stores': self.stores,
+            'hit_rate': self.hits / probes if probes else 0.0,
+            'entries': 2 * self.buckets,
+        }
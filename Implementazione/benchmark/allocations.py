@@ -0,0 +1,127 @@
+"""
+Allocazioni della ricerca: copia della board per nodo contro make/unmake.
+
+Per ogni posizione si misurano, su una visita a profondità fissa con lo stesso
+controllo dei nodi terminali di benchmark.bitboard_nps, e sulle ricerche di
+minimax_ab_improved e minimax_ab_all_improvements (pesi del livello 3):
+  - nodi visitati e nodi/secondo (misurati senza tracemalloc),
+  - picco di memoria allocata durante la ricerca (tracemalloc),
+  - array NumPy creati per nodo (copie e viste della board), contati
+    eseguendo la ricerca su una sottoclasse di np.ndarray.
+
+Da eseguire dalla cartella Implementazione:
+
+    python -m benchmark.allocations
+"""
+import time
+import tracemalloc
+
+import numpy as np
+
+import algorithms.minimax_ab_improved as minimax_ab_improved
+import algorithms.minimax_ab_all_improvements as serial
+from benchmark.bitboard_nps import array_perft
+from benchmark.suite import count_calls
+from bitboard import BitBoard
+from board import PLAYER_PIECE, AI_PIECE
+from difficulty import DIFFICULTY_LEVELS
+from position import Position
+
+POSITIONS = {
+    'vuota': "",
+    'apertura': "3323",
+    'mediogioco': "33243421",
+}
+
+PERFT_DEPTH = 4
+IMPROVED_DEPTH = 4
+ALL_IMPROVEMENTS_DEPTH = 6
+
+
+class CountedArray(np.ndarray):
+    """
+    Board che conta gli array NumPy derivati da essa (copie, viste, righe).
+    """
+    created = 0
+
+    def __array_finalize__(self, obj):
+        CountedArray.created += 1
+
+
+def position_perft(position, piece, depth):
+    if position.winning_move(PLAYER_PIECE) or position.winning_move(AI_PIECE):
+        return 1
+    valid_moves = position.get_valid_locations()
+    if depth == 0 or not valid_moves:
+        return 1
+    nodes = 1
+    other = PLAYER_PIECE if piece == AI_PIECE else AI_PIECE
+    for col in valid_moves:
+        position.play(col, piece)
+        nodes += position_perft(position, other, depth - 1)
+        position.undo_move()
+    return nodes
+
+
+def copy_perft(board, piece):
+    return array_perft(board, piece, PERFT_DEPTH)
+
+
+def make_unmake_perft(board, piece):
+    return position_perft(Position(board), piece, PERFT_DEPTH)
+
+
+def improved_search(board, piece):
+    params = DIFFICULTY_LEVELS[3]
+    _, nodes = count_calls(minimax_ab_improved, 'minimax_alpha_beta', lambda: minimax_ab_improved.find_best_move(
+        board, IMPROVED_DEPTH, params['heuristic_weights'], params['center_score_map']))
+    return nodes
+
+
+def all_improvements_search(board, piece):
+    params = DIFFICULTY_LEVELS[3]
+    serial.iterative_deepening_minimax(board, ALL_IMPROVEMENTS_DEPTH, params['beam_width'], params['heuristic_weights'],
+                                       float('inf'), params['center_score_map'])
+    return serial.get_search_info()['nodes']
+
+
+def measure(function, board, piece):
+    """
+    Restituisce (nodi, secondi, picco in byte, array NumPy per nodo). La tabella
+    delle trasposizioni viene svuotata prima di ogni ricerca, fuori dalle misure.
+    """
+    serial.transposition_table.clear()
+    start_time = time.perf_counter()
+    nodes = function(board.copy(), piece)
+    elapsed = time.perf_counter() - start_time
+
+    counted = board.copy().view(CountedArray)
+    serial.transposition_table.clear()
+    CountedArray.created = 0
+    tracemalloc.start()
+    function(counted, piece)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return nodes, elapsed, peak, CountedArray.created / nodes
+
+
+METHODS = [
+    (f"visita prof. {PERFT_DEPTH}, copia per nodo", copy_perft),
+    (f"visita prof. {PERFT_DEPTH}, make/unmake", make_unmake_perft),
+    (f"minimax_ab_improved prof. {IMPROVED_DEPTH}", improved_search),
+    (f"all_improvements prof. {ALL_IMPROVEMENTS_DEPTH}", all_improvements_search),
+]
+
+
+def main():
+    print(f"{'Posizione':<12}{'Ricerca':<36}{'Nodi':>9}{'Nodi/s':>10}{'Picco KB':>10}{'Array/nodo':>12}")
+    for name, moves in POSITIONS.items():
+        board = BitBoard.from_moves(moves, AI_PIECE if len(moves) % 2 == 0 else PLAYER_PIECE).to_board()
+        for label, function in METHODS:
+            nodes, elapsed, peak, arrays = measure(function, board, AI_PIECE)
+            print(f"{name:<12}{label:<36}{nodes:>9}{nodes / elapsed:>10.0f}{peak / 1024:>10.1f}{arrays:>12.2f}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Verifica e throughput della valutazione vettoriale board.score_positions.
+
+Controlla che i punteggi coincidano con score_position su board casuali per
+tutti i pesi dei livelli di difficoltà, poi misura le board valutate al secondo
+per dimensioni del batch da 1 a 100000, con la memoria occupata dal batch
+(board di BOARD_DTYPE, un byte per cella) e quella che occuperebbe con le
+vecchie board float64. Da eseguire dalla cartella Implementazione:
+
+    python -m benchmark.batch_eval
+"""
+import random
+import time
+
+import numpy as np
+
+from board import (
+    create_board, drop_piece, get_valid_locations, get_next_open_row,
+    score_position, score_positions, PLAYER_PIECE, AI_PIECE
+)
+from benchmark.evaluator_check import parameter_sets
+
+SEED = 2024
+SAMPLE_BOARDS = 2000
+BATCH_SIZES = [1, 10, 100, 1000, 10000, 100000]
+
+
+def random_boards(rng, count):
+    """
+    Genera 'count' board raggiungibili giocando partite casuali di lunghezza casuale.
+    """
+    boards = []
+    for _ in range(count):
+        board = create_board()
+        piece = rng.choice([PLAYER_PIECE, AI_PIECE])
+        for _ in range(rng.randint(0, 42)):
+            valid_moves = get_valid_locations(board)
+            if not valid_moves:
+                break
+            col = rng.choice(valid_moves)
+            drop_piece(board, get_next_open_row(board, col), col, piece)
+            piece = PLAYER_PIECE if piece == AI_PIECE else AI_PIECE
+        boards.append(board)
+    return np.array(boards)
+
+
+def check_equivalence(boards):
+    for weights, center_score_map in parameter_sets():
+        for piece in (PLAYER_PIECE, AI_PIECE):
+            batch_scores = score_positions(boards, piece, weights, center_score_map)
+            for board, batch_score in zip(boards, batch_scores):
+                expected = score_position(board, piece, weights, center_score_map)
+                if batch_score != expected:
+                    raise AssertionError(f"score_positions {batch_score} diverso da "
+                                         f"score_position {expected} (pedina {piece})\n{board}")
+    return len(boards)
+
+
+def main():
+    rng = random.Random(SEED)
+    boards = random_boards(rng, SAMPLE_BOARDS)
+    checked = check_equivalence(boards)
+    print(f"Equivalenza verificata su {checked} board per ogni insieme di pesi.\n")
+
+    weights, center_score_map = parameter_sets()[2]
+
+    loop_boards = boards[:1000]
+    start_time = time.perf_counter()
+    for board in loop_boards:
+        score_position(board, AI_PIECE, weights, center_score_map)
+    loop_rate = len(loop_boards) / (time.perf_counter() - start_time)
+    print(f"score_position (ciclo):   {loop_rate:12.0f} board/s\n")
+
+    print(f"{'Batch':>8}{'board/s':>14}{'Speedup':>10}{'KB':>10}{'KB float64':>12}")
+    for size in BATCH_SIZES:
+        stack = np.resize(boards, (size,) + boards.shape[1:])
+        repeats = max(1, 20000 // size)
+        start_time = time.perf_counter()
+        for _ in range(repeats):
+            score_positions(stack, AI_PIECE, weights, center_score_map)
+        rate = size * repeats / (time.perf_counter() - start_time)
+        float_kb = stack.size * np.dtype(np.float64).itemsize / 1024
+        print(f"{size:>8}{rate:>14.0f}{rate / loop_rate:>9.1f}x{stack.nbytes / 1024:>10.1f}{float_kb:>12.1f}")
+
+
+if __name__ == "__main__":
+    main()
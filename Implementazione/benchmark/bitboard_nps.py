@@ -0,0 +1,86 @@
+"""
+Confronto nodi/secondo tra il motore su matrice NumPy (board.py) e la bitboard.
+
+Entrambi i motori visitano lo stesso albero a profondità fissa, con lo stesso
+controllo dei nodi terminali usato da minimax_ab_all_improvements, e contano i
+nodi visitati. Da eseguire dalla cartella Implementazione:
+
+    python -m benchmark.bitboard_nps
+"""
+import time
+
+from bitboard import BitBoard
+from board import (
+    PLAYER_PIECE, AI_PIECE, winning_move, get_valid_locations,
+    get_next_open_row, drop_piece
+)
+
+POSITIONS = {
+    'vuota': "",
+    'apertura': "3323",
+    'mediogioco': "33243421",
+}
+
+DEPTH = 5
+
+
+def array_perft(board, piece, depth):
+    if winning_move(board, PLAYER_PIECE) or winning_move(board, AI_PIECE):
+        return 1
+    valid_moves = get_valid_locations(board)
+    if depth == 0 or not valid_moves:
+        return 1
+    nodes = 1
+    other = PLAYER_PIECE if piece == AI_PIECE else AI_PIECE
+    for col in valid_moves:
+        new_board = board.copy()
+        row = get_next_open_row(new_board, col)
+        drop_piece(new_board, row, col, piece)
+        nodes += array_perft(new_board, other, depth - 1)
+    return nodes
+
+
+def bitboard_perft(bitboard, piece, depth):
+    if bitboard.winning_move(PLAYER_PIECE) or bitboard.winning_move(AI_PIECE):
+        return 1
+    valid_moves = bitboard.get_valid_locations()
+    if depth == 0 or not valid_moves:
+        return 1
+    nodes = 1
+    other = PLAYER_PIECE if piece == AI_PIECE else AI_PIECE
+    for col in valid_moves:
+        bitboard.play(col, piece)
+        nodes += bitboard_perft(bitboard, other, depth - 1)
+        bitboard.undo_move()
+    return nodes
+
+
+def measure(function, position, piece, depth):
+    start_time = time.perf_counter()
+    nodes = function(position, piece, depth)
+    elapsed = time.perf_counter() - start_time
+    return nodes, elapsed
+
+
+def main():
+    print(f"Confronto nodi/secondo a profondità {DEPTH}\n")
+    print(f"{'Posizione':<12}{'Nodi':>10}{'NumPy n/s':>14}{'Bitboard n/s':>14}{'Speedup':>10}")
+
+    for name, moves in POSITIONS.items():
+        bitboard = BitBoard.from_moves(moves)
+        board = bitboard.to_board()
+        piece = PLAYER_PIECE if len(moves) % 2 == 0 else AI_PIECE
+
+        array_nodes, array_time = measure(array_perft, board, piece, DEPTH)
+        bit_nodes, bit_time = measure(bitboard_perft, bitboard, piece, DEPTH)
+        if array_nodes != bit_nodes:
+            raise AssertionError(f"{name}: i due motori hanno visitato alberi diversi "
+                                 f"({array_nodes} contro {bit_nodes} nodi)")
+
+        array_nps = array_nodes / array_time
+        bit_nps = bit_nodes / bit_time
+        print(f"{name:<12}{array_nodes:>10}{array_nps:>14.0f}{bit_nps:>14.0f}{bit_nps / array_nps:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
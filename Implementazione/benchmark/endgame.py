@@ -0,0 +1,165 @@
+"""
+Confronto tra il risolutore esatto di fine partita e la ricerca euristica.
+
+Le posizioni sono ottenute da partite in cui entrambi i giocatori vincono
+quando possono, bloccano le vittorie immediate dell'avversario e altrimenti
+scelgono una colonna a caso (pesata verso il centro), fermandosi a un dato
+numero di celle libere con l'IA al tratto. Per ogni numero di celle libere si
+misurano il tempo del risolutore e quello della ricerca euristica del livello 3,
+e quante volte la mossa euristica ottiene il valore ottimo. Prima delle misure
+esito e distanza del risolutore (describe_score) vengono confrontati con una
+ricerca esaustiva su posizioni quasi piene. Da eseguire dalla cartella
+Implementazione:
+
+    python -m benchmark.endgame
+"""
+import random
+import time
+
+from algorithms.endgame_solver import (
+    CELLS,
+    COLUMN_ORDER,
+    EndgameSolver,
+    clear_endgame_table,
+    solve_board,
+    winning_positions,
+)
+from algorithms.minimax_ab_all_improvements import find_best_move
+from bitboard import BitBoard, BOTTOM_MASK, BOARD_MASK, column_mask
+from board import PLAYER_PIECE, AI_PIECE
+from difficulty import DIFFICULTY_LEVELS
+
+SEED = 11
+POSITIONS_PER_COUNT = 10
+EMPTY_CELL_COUNTS = [10, 12, 14, 16, 18]
+
+# Posizioni per numero di celle libere nel confronto con la ricerca esaustiva
+CHECK_POSITIONS_PER_COUNT = 30
+CHECK_EMPTY_CELL_COUNTS = [1, 2, 3, 4, 5, 6, 7, 8]
+
+# Peso delle colonne nella scelta casuale: più alto al centro
+COLUMN_WEIGHTS = [len(COLUMN_ORDER) - COLUMN_ORDER.index(col) for col in range(len(COLUMN_ORDER))]
+
+
+def choose_move(rng, position, piece):
+    possible = (position.mask + BOTTOM_MASK) & BOARD_MASK
+    columns = position.get_valid_locations()
+    own_wins = winning_positions(position.pieces[piece], position.mask) & possible
+    opponent_wins = winning_positions(position.pieces[PLAYER_PIECE + AI_PIECE - piece], position.mask)
+    for threats in (own_wins, opponent_wins & possible):
+        for col in columns:
+            if threats & column_mask(col):
+                return col
+    safe = [col for col in columns if not (opponent_wins >> 1) & possible & column_mask(col)] or columns
+    return rng.choices(safe, [COLUMN_WEIGHTS[col] for col in safe])[0]
+
+
+def endgame_positions(rng, empty, count):
+    """
+    Restituisce 'count' posizioni con 'empty' celle libere, IA al tratto e
+    partita non ancora decisa.
+    """
+    positions = []
+    while len(positions) < count:
+        position = BitBoard()
+        piece = rng.choice([PLAYER_PIECE, AI_PIECE])
+        finished = False
+        while position.move_count() < CELLS - empty or piece != AI_PIECE:
+            col = choose_move(rng, position, piece)
+            position.play(col, piece)
+            if position.winning_move(piece) or position.is_full():
+                finished = True
+                break
+            piece = PLAYER_PIECE if piece == AI_PIECE else AI_PIECE
+        if not finished and position.move_count() == CELLS - empty:
+            positions.append(position)
+    return positions
+
+
+def move_score(position, col):
+    """
+    Valore esatto (per l'IA) della mossa 'col'.
+    """
+    current, mask, moves = position.pieces[AI_PIECE], position.mask, position.move_count()
+    move = ((mask + BOTTOM_MASK) & BOARD_MASK) & column_mask(col)
+    if winning_positions(current, mask) & move:
+        return (CELLS + 1 - moves) // 2
+    return -EndgameSolver().solve(current ^ mask, mask | move, moves + 1)
+
+
+def exhaustive_result(position, piece):
+    """
+    Esito esatto per 'piece' al tratto con una ricerca esaustiva: distanza in
+    semimosse fino alla pedina vincente, positiva se 'piece' vince, negativa se
+    perde, 0 per il pareggio. Chi vince sceglie la vittoria più veloce, chi
+    perde la sconfitta più lenta.
+    """
+    opponent = PLAYER_PIECE + AI_PIECE - piece
+    best = None
+    for col in position.get_valid_locations():
+        position.play(col, piece)
+        if position.winning_move(piece):
+            value = 1
+        elif position.is_full():
+            value = 0
+        else:
+            child = exhaustive_result(position, opponent)
+            value = -child + (1 if child < 0 else -1) if child else 0
+        position.undo_move()
+        # Ordine: vittorie più vicine, pareggio, sconfitte più lontane
+        rank = (2, -value) if value > 0 else (1, 0) if value == 0 else (0, -value)
+        if best is None or rank > best[0]:
+            best = (rank, value)
+    return best[1]
+
+
+def check_distances(rng):
+    """
+    Confronta esito e distanza del risolutore con la ricerca esaustiva;
+    restituisce il numero di posizioni controllate.
+    """
+    checked = 0
+    for empty in CHECK_EMPTY_CELL_COUNTS:
+        for position in endgame_positions(rng, empty, CHECK_POSITIONS_PER_COUNT):
+            clear_endgame_table()
+            result = solve_board(position.to_board())
+            expected = exhaustive_result(position, AI_PIECE)
+            outcome = 'win' if expected > 0 else 'loss' if expected < 0 else 'draw'
+            if (result['result'], result['distance']) != (outcome, abs(expected)):
+                raise AssertionError(f"esito {result['result']} a {result['distance']} semimosse invece di "
+                                     f"{outcome} a {abs(expected)} (punteggio {result['score']})\n"
+                                     f"{position.to_board()}")
+            checked += 1
+    return checked
+
+
+def main():
+    rng = random.Random(SEED)
+    print(f"Esito e distanza verificati su {check_distances(random.Random(SEED))} posizioni.\n")
+    params = DIFFICULTY_LEVELS[3]
+    print(f"{POSITIONS_PER_COUNT} posizioni per riga, ricerca euristica del livello 3 "
+          f"(time_limit {params['time_limit']} s)\n")
+    print(f"{'Celle libere':>13}{'Risolutore max':>16}{'medio':>9}{'Euristica medio':>17}{'Mosse ottime':>14}")
+    for empty in EMPTY_CELL_COUNTS:
+        solver_times = []
+        heuristic_times = []
+        optimal = 0
+        for position in endgame_positions(rng, empty, POSITIONS_PER_COUNT):
+            board = position.to_board()
+            clear_endgame_table()
+            start_time = time.perf_counter()
+            result = solve_board(board)
+            solver_times.append(time.perf_counter() - start_time)
+
+            start_time = time.perf_counter()
+            col = find_best_move(board.copy(), params['max_depth'], params['beam_width'], params['heuristic_weights'],
+                                 params['time_limit'], params['center_score_map'], endgame_threshold=0)
+            heuristic_times.append(time.perf_counter() - start_time)
+            optimal += move_score(position, col) == result['score']
+
+        print(f"{empty:>13}{max(solver_times):>14.3f} s{sum(solver_times) / len(solver_times):>7.3f} s"
+              f"{sum(heuristic_times) / len(heuristic_times):>15.3f} s{optimal:>11}/{POSITIONS_PER_COUNT}")
+
+
+if __name__ == "__main__":
+    main()
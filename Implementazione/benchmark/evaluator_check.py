@@ -0,0 +1,130 @@
+"""
+Verifica randomizzata dell'equivalenza tra IncrementalEvaluator e
+board.score_position, seguita da un confronto dei tempi.
+
+Per ogni insieme di pesi (livelli di DIFFICULTY_LEVELS e pesi ridotti da
+DecreaseParameters) vengono giocate partite casuali: dopo ogni inserimento e
+dopo ogni rimozione il punteggio incrementale deve coincidere con quello
+ricalcolato da zero, per entrambi i giocatori. Da eseguire dalla cartella
+Implementazione:
+
+    python -m benchmark.evaluator_check
+"""
+import random
+import time
+
+from board import (
+    create_board, drop_piece, get_valid_locations, get_next_open_row,
+    score_position, PLAYER_PIECE, AI_PIECE
+)
+from difficulty_test import DecreaseParameters
+from evaluator import IncrementalEvaluator
+from difficulty import DIFFICULTY_LEVELS
+
+GAMES_PER_CONFIG = 200
+SEED = 2024
+
+
+def parameter_sets():
+    """
+    Restituisce le coppie (pesi, center_score_map) usate dai livelli di difficoltà.
+    """
+    configs = [(params['heuristic_weights'], params['center_score_map'])
+               for params in DIFFICULTY_LEVELS.values()]
+    manager = DecreaseParameters(1)
+    for _ in range(8):
+        params = manager.update_parameters()
+        configs.append((dict(params['heuristic_weights']), list(params['center_score_map'])))
+    return configs
+
+
+def check_config(rng, weights, center_score_map):
+    checks = 0
+    for _ in range(GAMES_PER_CONFIG):
+        board = create_board()
+        evaluator = IncrementalEvaluator(board, weights, center_score_map)
+        played = []
+        piece = rng.choice([PLAYER_PIECE, AI_PIECE])
+        for _ in range(rng.randint(1, 42)):
+            valid_moves = get_valid_locations(board)
+            if not valid_moves:
+                break
+            col = rng.choice(valid_moves)
+            row = get_next_open_row(board, col)
+            drop_piece(board, row, col, piece)
+            evaluator.drop(row, col, piece)
+            played.append((row, col, piece))
+            piece = PLAYER_PIECE if piece == AI_PIECE else AI_PIECE
+            checks += compare(board, evaluator, weights, center_score_map)
+
+        # Una board costruita da zero deve dare lo stesso risultato
+        checks += compare(board, IncrementalEvaluator(board, weights, center_score_map),
+                          weights, center_score_map)
+
+        # Rimozione di alcune pedine in ordine inverso (come nell'unmake della ricerca)
+        for row, col, piece in reversed(played[-rng.randint(0, len(played)):]):
+            drop_piece(board, row, col, 0)
+            evaluator.remove(row, col, piece)
+            checks += compare(board, evaluator, weights, center_score_map)
+    return checks
+
+
+def compare(board, evaluator, weights, center_score_map):
+    for piece in (PLAYER_PIECE, AI_PIECE):
+        expected = score_position(board, piece, weights, center_score_map)
+        if evaluator.score(piece) != expected:
+            raise AssertionError(f"Punteggio incrementale {evaluator.score(piece)} diverso da "
+                                 f"score_position {expected} (pedina {piece})\n{board}")
+    return 2
+
+
+def benchmark(weights, center_score_map, samples=2000):
+    """
+    Confronta il costo di un figlio valutato con score_position (copia della board
+    e scansione completa) e con drop/score/remove dell'evaluator.
+    """
+    rng = random.Random(SEED)
+    board = create_board()
+    piece = PLAYER_PIECE
+    for _ in range(12):
+        col = rng.choice(get_valid_locations(board))
+        drop_piece(board, get_next_open_row(board, col), col, piece)
+        piece = PLAYER_PIECE if piece == AI_PIECE else AI_PIECE
+    evaluator = IncrementalEvaluator(board, weights, center_score_map)
+    moves = [(get_next_open_row(board, col), col) for col in get_valid_locations(board)]
+
+    start_time = time.perf_counter()
+    for i in range(samples):
+        row, col = moves[i % len(moves)]
+        child = board.copy()
+        drop_piece(child, row, col, AI_PIECE)
+        score_position(child, AI_PIECE, weights, center_score_map)
+    full_time = (time.perf_counter() - start_time) / samples
+
+    start_time = time.perf_counter()
+    for i in range(samples):
+        row, col = moves[i % len(moves)]
+        evaluator.drop(row, col, AI_PIECE)
+        evaluator.score(AI_PIECE)
+        evaluator.remove(row, col, AI_PIECE)
+    incremental_time = (time.perf_counter() - start_time) / samples
+
+    return full_time, incremental_time
+
+
+def main():
+    rng = random.Random(SEED)
+    total_checks = 0
+    for weights, center_score_map in parameter_sets():
+        total_checks += check_config(rng, weights, center_score_map)
+    print(f"Equivalenza verificata su {total_checks} confronti.")
+
+    params = DIFFICULTY_LEVELS[3]
+    full_time, incremental_time = benchmark(params['heuristic_weights'], params['center_score_map'])
+    print(f"score_position:        {full_time * 1e6:8.1f} µs per figlio")
+    print(f"IncrementalEvaluator:  {incremental_time * 1e6:8.1f} µs per figlio "
+          f"({full_time / incremental_time:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+"""
+Verifica e speedup dei kernel compilati (kernels.py) rispetto alle versioni Python.
+
+Con il backend Numba attivo controlla prima, su board casuali, che i kernel
+diano gli stessi risultati delle versioni Python (board.PYTHON_FUNCTIONS):
+winning_move sulla matrice e sulla memoryview di Position per entrambi i
+giocatori e score_position per tutti i pesi dei livelli.
+
+Poi misura, in un processo per backend (variabile CONNECT4_KERNELS), il tempo
+per chiamata di ogni funzione e le ricerche di minimax_ab_improved e
+minimax_ab_all_improvements sulle posizioni di apertura e mediogioco della
+suite: le ricerche devono scegliere la stessa mossa visitando gli stessi nodi.
+Da eseguire dalla cartella Implementazione:
+
+    python -m benchmark.kernels
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+
+import algorithms.minimax_ab_improved as minimax_ab_improved
+import algorithms.minimax_ab_all_improvements as minimax_ab_all_improvements
+import board
+import kernels
+from benchmark.batch_eval import random_boards
+from benchmark.evaluator_check import parameter_sets
+from benchmark.suite import count_calls, load_suite, position_board
+from board import PLAYER_PIECE, AI_PIECE, winning_move, score_position
+from difficulty import DIFFICULTY_LEVELS
+from position import Position
+
+SEED = 2024
+SAMPLE_BOARDS = 500
+TIMING_BOARDS = 200
+TIMING_REPEATS = 20
+IMPROVED_DEPTH = 4
+ALL_IMPROVEMENTS_DEPTH = 6
+SEARCH_CATEGORIES = ('opening', 'midgame')
+LEVEL = 3
+
+
+def check_equivalence(boards):
+    """
+    Confronta i kernel compilati con le versioni Python; restituisce il numero di confronti.
+    """
+    python = board.PYTHON_FUNCTIONS
+    checks = 0
+    for sample in boards:
+        position = Position(sample)
+        for piece in (PLAYER_PIECE, AI_PIECE):
+            expected = python['winning_move'](sample, piece)
+            if winning_move(sample, piece) != expected or position.winning_move(piece) != expected:
+                raise AssertionError(f"winning_move diverso (pedina {piece})\n{sample}")
+            checks += 2
+            for weights, center_score_map in parameter_sets():
+                expected = python['score_position'](sample, piece, weights, center_score_map)
+                if score_position(sample, piece, weights, center_score_map) != expected:
+                    raise AssertionError(f"score_position diverso (pedina {piece})\n{sample}")
+                checks += 1
+    return checks
+
+
+def time_per_call(function, arguments):
+    """
+    Tempo medio (µs) di una chiamata di function(*args) sugli argomenti indicati.
+    """
+    for args in arguments:
+        function(*args)
+    start_time = time.perf_counter()
+    for _ in range(TIMING_REPEATS):
+        for args in arguments:
+            function(*args)
+    return (time.perf_counter() - start_time) / (TIMING_REPEATS * len(arguments)) * 1e6
+
+
+def measure_functions(boards):
+    """
+    Restituisce il tempo per chiamata (µs) di ogni funzione compilata sulle board indicate.
+    """
+    params = DIFFICULTY_LEVELS[LEVEL]
+    weights, center_score_map = params['heuristic_weights'], params['center_score_map']
+    positions = [Position(sample) for sample in boards]
+    return {
+        'winning_move': time_per_call(winning_move, [(sample, AI_PIECE) for sample in boards]),
+        'Position.winning_move': time_per_call(Position.winning_move, [(position, AI_PIECE) for position in positions]),
+        'score_position': time_per_call(score_position, [(sample, AI_PIECE, weights, center_score_map)
+                                                         for sample in boards]),
+    }
+
+
+def measure_searches():
+    """
+    Restituisce, per ogni ricerca, (mosse, nodi, tempo in s) sulle posizioni della suite.
+    """
+    params = DIFFICULTY_LEVELS[LEVEL]
+    _, suite_positions = load_suite()
+    boards = [position_board(position['moves']) for position in suite_positions
+              if position['category'] in SEARCH_CATEGORIES]
+    searches = {}
+
+    moves, total_nodes, start_time = [], 0, time.perf_counter()
+    for sample in boards:
+        move, nodes = count_calls(minimax_ab_improved, 'minimax_alpha_beta', lambda: minimax_ab_improved.find_best_move(
+            sample.copy(), IMPROVED_DEPTH, params['heuristic_weights'], params['center_score_map']))
+        moves.append(move)
+        total_nodes += nodes
+    searches[f'minimax_ab_improved prof. {IMPROVED_DEPTH}'] = (moves, total_nodes, time.perf_counter() - start_time)
+
+    moves, total_nodes, start_time = [], 0, time.perf_counter()
+    for sample in boards:
+        minimax_ab_all_improvements.transposition_table.clear()
+        move, nodes = count_calls(minimax_ab_all_improvements, 'negamax', lambda: minimax_ab_all_improvements.iterative_deepening_minimax(
+            sample.copy(), ALL_IMPROVEMENTS_DEPTH, params['beam_width'], params['heuristic_weights'], float('inf'),
+            params['center_score_map']))
+        moves.append(move)
+        total_nodes += nodes
+    searches[f'all_improvements prof. {ALL_IMPROVEMENTS_DEPTH}'] = (moves, total_nodes, time.perf_counter() - start_time)
+    return searches
+
+
+def measure():
+    boards = random_boards(random.Random(SEED), TIMING_BOARDS)
+    return {'backend': kernels.BACKEND, 'functions': measure_functions(boards), 'searches': measure_searches()}
+
+
+def measure_backend(backend):
+    """
+    Esegue measure() in un processo con CONNECT4_KERNELS=backend.
+    """
+    environment = dict(os.environ, **{kernels.BACKEND_VARIABLE: backend})
+    output = subprocess.run([sys.executable, '-m', 'benchmark.kernels', '--measure'], env=environment,
+                            check=True, capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verifica e speedup dei kernel compilati.")
+    parser.add_argument('--measure', action='store_true', help="stampa in JSON le misure del backend corrente")
+    args = parser.parse_args()
+    if args.measure:
+        print(json.dumps(measure()))
+        return
+
+    if not kernels.ENABLED:
+        print(f"Backend {kernels.BACKEND}: Numba non disponibile (pip install numba), "
+              f"misure solo per le versioni Python.\n")
+        print(json.dumps(measure_backend('python'), indent=1))
+        return
+
+    rng = random.Random(SEED)
+    checks = check_equivalence(random_boards(rng, SAMPLE_BOARDS))
+    print(f"Equivalenza verificata su {checks} confronti.\n")
+
+    python, compiled = measure_backend('python'), measure_backend('numba')
+    print(f"{'Funzione':<30}{'Python':>12}{'Numba':>12}{'Speedup':>10}")
+    for name, python_time in python['functions'].items():
+        compiled_time = compiled['functions'][name]
+        print(f"{name:<30}{python_time:>9.2f} µs{compiled_time:>9.2f} µs{python_time / compiled_time:>9.1f}x")
+
+    print(f"\n{'Ricerca':<30}{'Nodi':>10}{'Python':>12}{'Numba':>12}{'Speedup':>10}")
+    for name, (python_moves, nodes, python_time) in python['searches'].items():
+        compiled_moves, compiled_nodes, compiled_time = compiled['searches'][name]
+        if python_moves != compiled_moves or nodes != compiled_nodes:
+            raise AssertionError(f"{name}: mosse o nodi diversi tra i backend "
+                                 f"({python_moves} {nodes} e {compiled_moves} {compiled_nodes})")
+        print(f"{name:<30}{nodes:>10}{python_time:>10.2f} s{compiled_time:>10.2f} s{python_time / compiled_time:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
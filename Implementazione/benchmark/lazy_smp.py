@@ -0,0 +1,70 @@
+"""
+Benchmark della ricerca Lazy SMP.
+
+Sulle posizioni di mediogioco di benchmark.parallel_search confronta, allo
+stesso time_limit del livello 3, la ricerca seriale con la ricerca Lazy SMP
+(lazy_smp=True) con 1, 2 e 4 worker:
+  - la profondità raggiunta (per Lazy SMP, quella del worker scelto),
+  - per ogni worker: profondità, nodi, hit rate della tabella condivisa, hit su
+    entry scritte da altri worker, sovrascritture di entry altrui e collisioni.
+
+Da eseguire dalla cartella Implementazione:
+
+    python -m benchmark.lazy_smp
+"""
+import algorithms.minimax_ab_all_improvements as serial
+from algorithms.lazy_smp import get_pool, get_worker_stats, shutdown_pools
+from algorithms.minimax_ab_all_improvements import find_best_move, get_search_info
+from benchmark.parallel_search import MIDGAME_POSITIONS, MAX_DEPTH
+from bitboard import BitBoard
+from difficulty import DIFFICULTY_LEVELS
+
+WORKER_COUNTS = [1, 2, 4]
+
+
+def run(board, params, lazy_smp, workers=1):
+    if not lazy_smp:
+        # Ogni misura seriale parte con la tabella delle trasposizioni vuota
+        serial.transposition_table.clear()
+    find_best_move(board.copy(), MAX_DEPTH, params['beam_width'], params['heuristic_weights'],
+                   params['time_limit'], params['center_score_map'], workers=workers, lazy_smp=lazy_smp)
+    return get_search_info()['depth']
+
+
+def main():
+    params = DIFFICULTY_LEVELS[3]
+    boards = [BitBoard.from_moves(moves).to_board() for moves in MIDGAME_POSITIONS]
+
+    print(f"Time limit {params['time_limit']} s, {len(boards)} posizioni\n")
+    depths = [run(board, params, False) for board in boards]
+    print(f"Seriale: profondità media {sum(depths) / len(depths):.2f}\n")
+
+    for workers in WORKER_COUNTS:
+        # Pool nuovo (tabella condivisa vuota) e avviato prima delle misure
+        shutdown_pools()
+        get_pool(workers)
+
+        depths = []
+        totals = [dict.fromkeys(('depth', 'nodes', 'hits', 'misses', 'shared_hits', 'foreign_overwrites',
+                                 'collisions'), 0) for _ in range(workers)]
+        for board in boards:
+            depths.append(run(board, params, True, workers))
+            for result in get_worker_stats():
+                for name in totals[result['helper']]:
+                    totals[result['helper']][name] += result[name]
+
+        print(f"Lazy SMP, {workers} worker: profondità media {sum(depths) / len(depths):.2f}")
+        print(f"{'Worker':>8}{'Prof. media':>13}{'Nodi':>10}{'Hit rate':>10}{'Hit altrui':>12}"
+              f"{'Sovrascr.':>11}{'Collisioni':>12}")
+        for helper, total in enumerate(totals):
+            probes = total['hits'] + total['misses']
+            print(f"{helper:>8}{total['depth'] / len(boards):>13.2f}{total['nodes']:>10}"
+                  f"{total['hits'] / probes if probes else 0.0:>10.1%}{total['shared_hits']:>12}"
+                  f"{total['foreign_overwrites']:>11}{total['collisions']:>12}")
+        print()
+
+    shutdown_pools()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+"""
+Confronto tra l'ordinamento delle mosse con l'euristica e quello con killer
+move e history table.
+
+Sulle posizioni di benchmark.pvs, per ogni profondità fissa, entrambi gli
+ordinamenti partono con la tabella delle trasposizioni vuota e si confrontano
+nodi visitati, tempo, frazione dei tagli avvenuti alla prima mossa e valore
+alla radice (che non deve cambiare: la beam contiene le stesse mosse). Da
+eseguire dalla cartella Implementazione:
+
+    python -m benchmark.move_ordering
+"""
+import time
+
+import algorithms.minimax_ab_all_improvements as serial
+from algorithms.minimax_ab_all_improvements import iterative_deepening_minimax, get_search_info, get_ordering_stats
+from benchmark.parallel_search import MIDGAME_POSITIONS
+from benchmark.pvs import OPENING_POSITIONS
+from bitboard import BitBoard
+from difficulty import DIFFICULTY_LEVELS
+
+DEPTHS = [5, 6, 7, 8]
+ORDERINGS = ['heuristic', 'history']
+
+
+def run(board, params, depth, move_ordering):
+    serial.transposition_table.clear()
+    start_time = time.perf_counter()
+    iterative_deepening_minimax(board.copy(), depth, params['beam_width'], params['heuristic_weights'],
+                                float('inf'), params['center_score_map'], move_ordering=move_ordering)
+    elapsed = time.perf_counter() - start_time
+    stats = get_ordering_stats()
+    return get_search_info(), stats['cutoffs'], stats['first_move_cutoffs'], elapsed
+
+
+def main():
+    params = DIFFICULTY_LEVELS[3]
+    boards = [BitBoard.from_moves(moves).to_board() for moves in OPENING_POSITIONS + MIDGAME_POSITIONS]
+
+    print(f"{len(boards)} posizioni, pesi del livello 3\n")
+    print(f"{'Prof.':>6}{'Ordinamento':>13}{'Nodi':>9}{'Tempo':>10}{'Tagli 1a mossa':>16}{'Valori uguali':>15}")
+    for depth in DEPTHS:
+        reference_values = None
+        for move_ordering in ORDERINGS:
+            nodes = cutoffs = first_move_cutoffs = 0
+            total_time = 0.0
+            values = []
+            for board in boards:
+                info, board_cutoffs, board_first, elapsed = run(board, params, depth, move_ordering)
+                nodes += info['nodes']
+                cutoffs += board_cutoffs
+                first_move_cutoffs += board_first
+                total_time += elapsed
+                values.append(info['value'])
+            if reference_values is None:
+                reference_values = values
+            same = sum(1 for value, reference in zip(values, reference_values) if value == reference)
+            print(f"{depth:>6}{move_ordering:>13}{nodes:>9}{total_time:>8.2f} s"
+                  f"{first_move_cutoffs / cutoffs if cutoffs else 0:>16.1%}{same:>11}/{len(boards)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark della ricerca parallela alla radice.
+
+Su un insieme fisso di posizioni di mediogioco misura, per 1, 2, 4 e 8 worker:
+  - la profondità raggiunta entro il time_limit del livello 3,
+  - il tempo necessario per completare una profondità fissa,
+  - l'accordo della mossa scelta con la ricerca seriale alla stessa profondità.
+
+Da eseguire dalla cartella Implementazione:
+
+    python -m benchmark.parallel_search
+"""
+import time
+
+import algorithms.minimax_ab_all_improvements as serial
+from algorithms.minimax_ab_all_improvements import find_best_move, get_search_info
+from algorithms.parallel_search import get_executor, shutdown_executors
+from bitboard import BitBoard
+from difficulty import DIFFICULTY_LEVELS
+
+# Posizioni di mediogioco (sequenze di colonne, inizia il giocatore), IA al tratto
+MIDGAME_POSITIONS = [
+    "33243421",
+    "3324152610",
+    "3322411045",
+    "2344325601",
+    "33332244",
+    "3412253661",
+]
+
+WORKER_COUNTS = [1, 2, 4, 8]
+FIXED_DEPTH = 7
+
+# Limite alla profondità dell'approfondimento iterativo nella misura a tempo
+MAX_DEPTH = 16
+
+
+def run(board, params, max_depth, time_limit, workers):
+    if workers == 1:
+        # Ogni misura seriale parte con la tabella delle trasposizioni vuota
+        serial.transposition_table.clear()
+    start_time = time.perf_counter()
+    col = find_best_move(board.copy(), max_depth, params['beam_width'], params['heuristic_weights'],
+                         time_limit, params['center_score_map'], workers=workers)
+    return col, get_search_info()['depth'], time.perf_counter() - start_time
+
+
+def main():
+    params = DIFFICULTY_LEVELS[3]
+    boards = [BitBoard.from_moves(moves).to_board() for moves in MIDGAME_POSITIONS]
+
+    # Mosse della ricerca seriale a profondità fissa, usate come riferimento
+    reference = [run(board, params, FIXED_DEPTH, 600, 1)[0] for board in boards]
+
+    print(f"Time limit {params['time_limit']} s, profondità fissa {FIXED_DEPTH}, "
+          f"{len(boards)} posizioni\n")
+    print(f"{'Worker':>7}{'Prof. media':>13}{'Tempo prof. fissa':>19}{'Accordo':>10}")
+    for workers in WORKER_COUNTS:
+        if workers > 1:
+            # Pool nuovo (tabelle vuote) e avviato prima delle misure
+            shutdown_executors()
+            get_executor(workers)
+            run(boards[0], params, 1, 600, workers)
+
+        fixed_time = 0
+        agreement = 0
+        for board, expected in zip(boards, reference):
+            col, _, elapsed = run(board, params, FIXED_DEPTH, 600, workers)
+            fixed_time += elapsed
+            agreement += col == expected
+
+        depths = [run(board, params, MAX_DEPTH, params['time_limit'], workers)[1] for board in boards]
+
+        print(f"{workers:>7}{sum(depths) / len(depths):>13.2f}{fixed_time:>17.2f} s"
+              f"{agreement:>7}/{len(boards)}")
+
+    shutdown_executors()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Confronto tra il driver alpha-beta e la Principal Variation Search con finestre
+di aspirazione.
+
+Sulle posizioni di mediogioco di benchmark.parallel_search, per ogni profondità
+fissa, entrambe le modalità partono con la tabella delle trasposizioni vuota e
+si confrontano nodi visitati, tempo, valore e mossa scelta. Da eseguire dalla
+cartella Implementazione:
+
+    python -m benchmark.pvs
+"""
+import time
+
+import algorithms.minimax_ab_all_improvements as serial
+from algorithms.minimax_ab_all_improvements import iterative_deepening_minimax, get_search_info, aspiration_stats
+from benchmark.parallel_search import MIDGAME_POSITIONS
+from bitboard import BitBoard
+from difficulty import DIFFICULTY_LEVELS
+
+DEPTHS = [5, 6, 7, 8]
+
+# Posizioni d'apertura aggiunte a quelle di mediogioco
+OPENING_POSITIONS = ["3", "33", "3342", "234"]
+
+
+def run(board, params, depth, search_mode):
+    serial.transposition_table.clear()
+    start_time = time.perf_counter()
+    col = iterative_deepening_minimax(board.copy(), depth, params['beam_width'], params['heuristic_weights'],
+                                      float('inf'), params['center_score_map'], search_mode=search_mode)
+    info = get_search_info()
+    return col, info['value'], info['nodes'], time.perf_counter() - start_time
+
+
+def main():
+    params = DIFFICULTY_LEVELS[3]
+    boards = [BitBoard.from_moves(moves).to_board() for moves in OPENING_POSITIONS + MIDGAME_POSITIONS]
+
+    print(f"{len(boards)} posizioni, pesi del livello 3\n")
+    print(f"{'Prof.':>6}{'Nodi alpha-beta':>17}{'Nodi PVS':>11}{'Riduzione':>11}"
+          f"{'Tempo AB':>10}{'Tempo PVS':>11}{'Valori uguali':>15}{'Mosse uguali':>14}{'Fallimenti asp.':>17}")
+    for depth in DEPTHS:
+        totals = {'alphabeta': [0, 0.0], 'pvs': [0, 0.0]}
+        same_value = 0
+        same_move = 0
+        failures = 0
+        for board in boards:
+            results = {}
+            for search_mode in ('alphabeta', 'pvs'):
+                col, value, nodes, elapsed = run(board, params, depth, search_mode)
+                results[search_mode] = (col, value)
+                totals[search_mode][0] += nodes
+                totals[search_mode][1] += elapsed
+            failures += aspiration_stats['fail_low'] + aspiration_stats['fail_high']
+            same_value += results['alphabeta'][1] == results['pvs'][1]
+            same_move += results['alphabeta'][0] == results['pvs'][0]
+
+        ab_nodes, ab_time = totals['alphabeta']
+        pvs_nodes, pvs_time = totals['pvs']
+        print(f"{depth:>6}{ab_nodes:>17}{pvs_nodes:>11}{1 - pvs_nodes / ab_nodes:>10.1%}"
+              f"{ab_time:>8.2f} s{pvs_time:>9.2f} s{same_value:>11}/{len(boards)}{same_move:>10}/{len(boards)}"
+              f"{failures:>17}")
+
+
+if __name__ == "__main__":
+    main()
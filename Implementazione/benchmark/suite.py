@@ -0,0 +1,324 @@
+"""
+Suite di benchmark riproducibile per i quattro moduli di ricerca.
+
+Le posizioni (apertura, mediogioco, tattiche, fine partita) sono nel file
+versionato benchmark/positions.txt. Per ogni modulo e ogni profondità fissa
+si misurano:
+  - nodi visitati (chiamate alla funzione ricorsiva della ricerca),
+  - tempo per raggiungere la profondità (per minimax_ab_all_improvements è il
+    tempo trascorso alla fine dell'iterazione, per minimax_ab_improved quello
+    di una ricerca diretta a quella profondità),
+  - nodi/secondo,
+  - accordo della mossa scelta con le mosse migliori della posizione oppure,
+    se non sono note, con la mossa di minimax_ab_all_improvements alla stessa
+    profondità,
+  - errori tattici: mosse che mancano una vittoria immediata o lasciano
+    all'avversario una vittoria immediata evitabile (vedi is_blunder).
+
+minimax e minimax_alpha_beta esplorano l'intero albero: vengono misurati solo
+sulle posizioni con al più FULL_TREE_EMPTY_CELLS celle libere. Tutti i moduli
+usano i pesi del livello 3 e la tabella delle trasposizioni viene svuotata
+prima di ogni posizione.
+
+I risultati vengono salvati in JSON; due file si confrontano con --compare
+(nodi e mosse diversi indicano un cambiamento nella ricerca, i tempi dipendono
+anche dalla macchina e dal backend dei kernel, vedi kernels.py e
+benchmark/kernels.py per lo speedup di ogni funzione). Da eseguire dalla cartella Implementazione:
+
+    python -m benchmark.suite --output benchmark_results.json
+    python -m benchmark.suite --compare vecchio.json nuovo.json
+"""
+import argparse
+import json
+import os
+import platform
+import time
+
+import algorithms.minimax as minimax
+import algorithms.minimax_alpha_beta as minimax_alpha_beta
+import algorithms.minimax_ab_improved as minimax_ab_improved
+import algorithms.minimax_ab_all_improvements as minimax_ab_all_improvements
+import kernels
+from algorithms.search_stats import SearchStats, subscribe, unsubscribe, ITERATION_COMPLETE
+from board import ROWS, COLS, AI_PIECE
+from engine import board_from_moves
+from difficulty import DIFFICULTY_LEVELS
+from position import Position
+
+SUITE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'positions.txt')
+
+CATEGORIES = ('opening', 'midgame', 'tactical', 'endgame')
+ALGORITHMS = ('minimax', 'minimax_alpha_beta', 'minimax_ab_improved', 'minimax_ab_all_improvements')
+
+DEPTHS = [2, 4, 6]
+LEVEL = 3
+
+# Celle libere massime per i moduli che esplorano l'intero albero
+FULL_TREE_EMPTY_CELLS = {'minimax': 10, 'minimax_alpha_beta': 14}
+
+
+def load_suite(path=SUITE_PATH):
+    """
+    Legge il file delle posizioni e restituisce (versione, posizioni), con ogni
+    posizione come dizionario (category, name, moves, best); 'best' è la lista
+    delle mosse migliori oppure None.
+    """
+    version = None
+    positions = []
+    with open(path, encoding='utf-8') as suite_file:
+        for line_number, line in enumerate(suite_file, 1):
+            fields = line.split('#', 1)[0].split()
+            if not fields:
+                continue
+            if fields[0] == 'version':
+                version = int(fields[1])
+                continue
+            if len(fields) != 4 or fields[0] not in CATEGORIES:
+                raise ValueError(f"{path}:{line_number}: riga non valida: {line.strip()!r}")
+            category, name, moves, best = fields
+            moves = '' if moves == '-' else moves
+            position = {'category': category, 'name': name, 'moves': moves,
+                        'best': None if best == '-' else [int(col) for col in best]}
+            position_board(moves)
+            positions.append(position)
+    if version is None:
+        raise ValueError(f"{path}: manca la riga 'version'")
+    names = [position['name'] for position in positions]
+    if len(set(names)) != len(names):
+        raise ValueError(f"{path}: nomi di posizione duplicati")
+    return version, positions
+
+
+def position_board(moves):
+    """
+    Board (board.py) ottenuta giocando 'moves' con l'IA al tratto alla fine
+    (vedi engine.board_from_moves).
+    """
+    return board_from_moves(moves)
+
+
+def is_blunder(board, move):
+    """
+    True se la mossa dell'IA manca una vittoria immediata oppure lascia
+    all'avversario una vittoria immediata che un'altra mossa avrebbe evitato
+    (analisi delle minacce di Position.threat_moves).
+    """
+    position = Position(board)
+    winning_col, safe_moves = position.threat_moves(AI_PIECE)
+    if winning_col is not None:
+        return not position.winning_move_at(position.play(move, AI_PIECE), move, AI_PIECE)
+    return bool(safe_moves) and move not in safe_moves
+
+
+def count_calls(module, name, call):
+    """
+    Esegue call() contando le chiamate a module.name, la funzione ricorsiva
+    della ricerca (che si richiama attraverso il nome globale del modulo).
+    Restituisce (risultato, chiamate).
+    """
+    original = getattr(module, name)
+    calls = 0
+
+    def counted(*args):
+        nonlocal calls
+        calls += 1
+        return original(*args)
+
+    setattr(module, name, counted)
+    try:
+        return call(), calls
+    finally:
+        setattr(module, name, original)
+
+
+def run_full_tree(module, function_name, board):
+    start_time = time.perf_counter()
+    move, nodes = count_calls(module, function_name, lambda: module.find_best_move(board.copy()))
+    return [(None, move, nodes, time.perf_counter() - start_time)]
+
+
+def run_improved(board, depths, params):
+    results = []
+    for depth in depths:
+        start_time = time.perf_counter()
+        move, nodes = count_calls(minimax_ab_improved, 'minimax_alpha_beta', lambda: minimax_ab_improved.find_best_move(
+            board.copy(), depth, params['heuristic_weights'], params['center_score_map']))
+        results.append((depth, move, nodes, time.perf_counter() - start_time))
+    return results
+
+
+def run_all_improvements(board, depths, params):
+    iterations = {}
+
+    def record(event):
+        iterations[event['depth']] = event
+
+    minimax_ab_all_improvements.transposition_table.clear()
+    subscribe(ITERATION_COMPLETE, record)
+    try:
+        minimax_ab_all_improvements.iterative_deepening_minimax(
+            board.copy(), max(depths), params['beam_width'], params['heuristic_weights'], float('inf'),
+            params['center_score_map'], stats=SearchStats())
+    finally:
+        unsubscribe(ITERATION_COMPLETE, record)
+
+    results = []
+    nodes = 0
+    for depth in sorted(iterations):
+        nodes += iterations[depth]['nodes']
+        if depth in depths:
+            results.append((depth, iterations[depth]['move'], nodes, iterations[depth]['elapsed']))
+    return results
+
+
+def run_algorithm(algorithm, board, depths, params):
+    """
+    Restituisce le misure (profondità, mossa, nodi, tempo) di un modulo su una
+    posizione; la profondità è None per i moduli che esplorano l'intero albero.
+    """
+    if algorithm == 'minimax':
+        return run_full_tree(minimax, 'pure_minimax', board)
+    if algorithm == 'minimax_alpha_beta':
+        return run_full_tree(minimax_alpha_beta, 'minimax_alpha_beta', board)
+    if algorithm == 'minimax_ab_improved':
+        return run_improved(board, depths, params)
+    return run_all_improvements(board, depths, params)
+
+
+def run_suite(algorithms, depths, path=SUITE_PATH, verbose=True):
+    version, positions = load_suite(path)
+    params = DIFFICULTY_LEVELS[LEVEL]
+    results = []
+    # Mosse di minimax_ab_all_improvements, riferimento per le posizioni senza mosse migliori note
+    reference = {}
+    ordered = sorted(algorithms, key=lambda algorithm: algorithm != 'minimax_ab_all_improvements')
+    if 'minimax_ab_all_improvements' not in ordered:
+        ordered.insert(0, 'minimax_ab_all_improvements')
+
+    for algorithm in ordered:
+        for position in positions:
+            empty = ROWS * COLS - len(position['moves'])
+            if empty > FULL_TREE_EMPTY_CELLS.get(algorithm, empty):
+                continue
+            board = position_board(position['moves'])
+            for depth, move, nodes, elapsed in run_algorithm(algorithm, board, depths, params):
+                if algorithm == 'minimax_ab_all_improvements':
+                    reference[position['name'], depth] = move
+                if algorithm not in algorithms:
+                    continue
+                expected = position['best'] or [reference.get((position['name'], depth))]
+                results.append({
+                    'algorithm': algorithm,
+                    'position': position['name'],
+                    'category': position['category'],
+                    'depth': depth,
+                    'move': move,
+                    'nodes': nodes,
+                    'time': elapsed,
+                    'nps': nodes / elapsed if elapsed > 0 else None,
+                    'agrees': move in expected,
+                    'blunder': is_blunder(board, move),
+                })
+            if verbose:
+                print(f"  {algorithm} {position['name']}", flush=True)
+
+    return {
+        'suite_version': version,
+        'level': LEVEL,
+        'depths': depths,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'kernels': kernels.BACKEND,
+        'results': results,
+    }
+
+
+def depth_label(depth):
+    return 'completa' if depth is None else str(depth)
+
+
+def print_summary(report):
+    print(f"\nSuite versione {report['suite_version']}, pesi del livello {report['level']}, "
+          f"kernel {report['kernels']}\n")
+    print(f"{'Modulo':<30}{'Prof.':>9}{'Posizioni':>11}{'Nodi':>11}{'Tempo':>11}{'Nodi/s':>10}{'Accordo':>10}"
+          f"{'Errori':>8}")
+    groups = {}
+    for result in report['results']:
+        groups.setdefault((result['algorithm'], result['depth']), []).append(result)
+    for (algorithm, depth), results in groups.items():
+        nodes = sum(result['nodes'] for result in results)
+        elapsed = sum(result['time'] for result in results)
+        agreement = sum(result['agrees'] for result in results)
+        blunders = sum(result.get('blunder', False) for result in results)
+        print(f"{algorithm:<30}{depth_label(depth):>9}{len(results):>11}{nodes:>11}{elapsed:>9.2f} s"
+              f"{nodes / elapsed if elapsed else 0:>10.0f}{agreement:>6}/{len(results)}{blunders:>8}")
+
+
+def compare(old_path, new_path):
+    """
+    Confronta due file di risultati: riporta le misure con mossa o nodi diversi,
+    i nodi totali, il rapporto tra i tempi totali e gli errori tattici di ogni
+    modulo (ricalcolati sulle posizioni della suite, anche per i file salvati
+    prima che venissero registrati).
+    """
+    with open(old_path, encoding='utf-8') as old_file, open(new_path, encoding='utf-8') as new_file:
+        old, new = json.load(old_file), json.load(new_file)
+    if old['suite_version'] != new['suite_version']:
+        print(f"Attenzione: versioni della suite diverse ({old['suite_version']} e {new['suite_version']})")
+    if old.get('kernels', 'python') != new.get('kernels', 'python'):
+        print(f"Backend dei kernel diversi ({old.get('kernels', 'python')} e {new.get('kernels', 'python')}): "
+              f"i tempi includono lo speedup dei kernel compilati")
+
+    def key(result):
+        return result['algorithm'], result['position'], result['depth']
+
+    boards = {position['name']: position_board(position['moves']) for position in load_suite()[1]}
+    old_results = {key(result): result for result in old['results']}
+    changed = 0
+    totals = {}
+    for result in new['results']:
+        previous = old_results.get(key(result))
+        if previous is None:
+            continue
+        algorithm_totals = totals.setdefault(result['algorithm'], [0.0, 0.0, 0, 0, 0, 0])
+        algorithm_totals[0] += previous['time']
+        algorithm_totals[1] += result['time']
+        algorithm_totals[2] += previous['nodes']
+        algorithm_totals[3] += result['nodes']
+        if result['position'] in boards:
+            algorithm_totals[4] += is_blunder(boards[result['position']], previous['move'])
+            algorithm_totals[5] += is_blunder(boards[result['position']], result['move'])
+        if previous['move'] != result['move'] or previous['nodes'] != result['nodes']:
+            changed += 1
+            algorithm, position, depth = key(result)
+            print(f"{algorithm:<30}{position:<10}{depth_label(depth):>9}  mossa {previous['move']} -> {result['move']}"
+                  f"  nodi {previous['nodes']} -> {result['nodes']}")
+    print(f"\n{changed} misure con mossa o nodi diversi\n")
+    print(f"{'Modulo':<30}{'Tempo vecchio':>15}{'Tempo nuovo':>13}{'Rapporto':>10}{'Nodi':>21}{'Errori':>10}")
+    for algorithm, (old_time, new_time, old_nodes, new_nodes, old_blunders, new_blunders) in totals.items():
+        print(f"{algorithm:<30}{old_time:>13.2f} s{new_time:>11.2f} s{new_time / old_time if old_time else 0:>10.2f}"
+              f"{old_nodes:>10} -> {new_nodes:<8}{old_blunders:>4} -> {new_blunders}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dei moduli di ricerca su una suite fissa di posizioni.")
+    parser.add_argument('--algorithms', nargs='+', choices=ALGORITHMS, default=list(ALGORITHMS))
+    parser.add_argument('--depths', nargs='+', type=int, default=DEPTHS)
+    parser.add_argument('--suite', default=SUITE_PATH, help="file delle posizioni")
+    parser.add_argument('--output', default='benchmark_results.json', help="file JSON dei risultati")
+    parser.add_argument('--compare', nargs=2, metavar=('VECCHIO', 'NUOVO'), help="confronta due file di risultati")
+    args = parser.parse_args()
+
+    if args.compare:
+        compare(*args.compare)
+        return
+
+    report = run_suite(args.algorithms, sorted(args.depths), args.suite)
+    with open(args.output, 'w', encoding='utf-8') as output_file:
+        json.dump(report, output_file, indent=1)
+    print_summary(report)
+    print(f"\nRisultati salvati in {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,282 @@
+"""
+Rappresentazione bitboard della griglia di gioco.
+
+Ogni colonna occupa ROWS + 1 bit consecutivi (il bit in più è una sentinella
+sempre a 0 che separa le colonne), numerati dal basso verso l'alto:
+
+     6 13 20 27 34 41 48   <- sentinelle
+     5 12 19 26 33 40 47
+     4 11 18 25 32 39 46
+     3 10 17 24 31 38 45
+     2  9 16 23 30 37 44
+     1  8 15 22 29 36 43
+     0  7 14 21 28 35 42
+
+Una posizione è descritta da due interi (uno per giocatore) più l'altezza di
+ogni colonna: inserire/rimuovere una pedina costa O(1) e il controllo del
+'4 in fila' si riduce a quattro shift con maschera.
+
+Le costanti e le funzioni di modulo descrivono la griglia standard; una
+BitBoard può usare un'altra geometria (vedi geometry.py), con lo stesso
+layout di rows + 1 bit per colonna.
+"""
+from board import ROWS, COLS, PLAYER_PIECE, AI_PIECE, STANDARD_GEOMETRY, board_geometry, create_board, drop_piece
+
+HEIGHT = ROWS + 1
+
+# Bit della cella più bassa di ogni colonna e di tutte le celle giocabili
+BOTTOM_MASK = sum(1 << (c * HEIGHT) for c in range(COLS))
+BOARD_MASK = BOTTOM_MASK * ((1 << ROWS) - 1)
+
+# Shift delle quattro direzioni: verticale, orizzontale, le due diagonali
+DIRECTIONS = (1, HEIGHT, HEIGHT - 1, HEIGHT + 1)
+
+
+def column_mask(col):
+    """
+    Restituisce la maschera delle celle giocabili della colonna.
+    """
+    return ((1 << ROWS) - 1) << (col * HEIGHT)
+
+
+def cell_bit(row, col):
+    """
+    Restituisce il bit della cella [row, col] (riga 0 in alto, come in board.py).
+    """
+    return 1 << (col * HEIGHT + ROWS - 1 - row)
+
+
+def has_four(bits):
+    """
+    Ritorna True se l'insieme di pedine 'bits' contiene un '4 in fila'.
+    """
+    for shift in DIRECTIONS:
+        pairs = bits & (bits >> shift)
+        if pairs & (pairs >> (2 * shift)):
+            return True
+    return False
+
+
+class BitBoard:
+    """
+    Posizione di gioco compatta con make/unmake in tempo costante.
+
+    'pieces' è indicizzata dal valore della pedina (PLAYER_PIECE, AI_PIECE),
+    'heights' contiene il numero di pedine presenti in ogni colonna e
+    'moves' lo storico delle colonne giocate, usato da undo_move.
+    'geometry' è la geometria della griglia (di default quella standard).
+    """
+
+    def __init__(self, geometry=None):
+        self.geometry = geometry or STANDARD_GEOMETRY
+        self.pieces = [0, 0, 0]
+        self.mask = 0
+        self.heights = bytearray(self.geometry.cols)
+        self.moves = []
+
+    def copy(self):
+        other = BitBoard(self.geometry)
+        other.pieces = self.pieces[:]
+        other.mask = self.mask
+        other.heights = self.heights[:]
+        other.moves = self.moves[:]
+        return other
+
+    def can_play(self, col):
+        """
+        Controlla se la colonna non è piena.
+        """
+        return self.heights[col] < self.geometry.rows
+
+    def next_open_row(self, col):
+        """
+        Restituisce la riga (in coordinate board.py) in cui cadrebbe la pedina.
+        """
+        return self.geometry.rows - 1 - self.heights[col]
+
+    def play(self, col, piece):
+        """
+        Inserisce la pedina nella colonna e restituisce la riga occupata
+        (in coordinate board.py).
+        """
+        height = self.heights[col]
+        bit = 1 << (col * self.geometry.height + height)
+        self.pieces[piece] |= bit
+        self.mask |= bit
+        self.heights[col] = height + 1
+        self.moves.append((col, piece))
+        return self.geometry.rows - 1 - height
+
+    def undo_move(self):
+        """
+        Annulla l'ultima mossa giocata e ne restituisce la colonna.
+        """
+        col, piece = self.moves.pop()
+        height = self.heights[col] - 1
+        bit = 1 << (col * self.geometry.height + height)
+        self.pieces[piece] ^= bit
+        self.mask ^= bit
+        self.heights[col] = height
+        return col
+
+    def valid_moves_mask(self):
+        """
+        Restituisce una maschera con il bit della prossima cella libera di ogni
+        colonna non piena.
+        """
+        return (self.mask + self.geometry.bottom_mask) & self.geometry.board_mask
+
+    def get_valid_locations(self):
+        """
+        Restituisce le colonne valide, come board.get_valid_locations.
+        """
+        rows = self.geometry.rows
+        return [col for col in range(self.geometry.cols) if self.heights[col] < rows]
+
+    def threat_moves(self, piece):
+        """
+        Analisi delle minacce per il giocatore al tratto 'piece', sulle celle
+        vincenti di entrambi i giocatori (geometry.threat_cells). Restituisce
+        (vincente, mosse):
+          - se 'piece' vince subito, (colonna vincente, [colonna vincente]),
+          - altrimenti (None, colonne che non perdono alla mossa successiva):
+            solo il blocco se l'avversario ha una cella vincente giocabile,
+            senza le colonne in cui la pedina darebbe all'avversario la cella
+            vincente subito sopra. La lista è vuota se ogni mossa perde (ad
+            esempio con due celle vincenti giocabili dell'avversario).
+        """
+        geometry = self.geometry
+        mask = self.mask
+        playable = (mask + geometry.bottom_mask) & geometry.board_mask
+        wins = geometry.threat_cells(self.pieces[piece], mask) & playable
+        if wins:
+            col = geometry.columns(wins)[0]
+            return col, [col]
+        opponent_wins = geometry.threat_cells(self.pieces[PLAYER_PIECE if piece == AI_PIECE else AI_PIECE], mask)
+        forced = opponent_wins & playable
+        if forced:
+            if forced & (forced - 1):
+                return None, []
+            playable = forced
+        return None, geometry.columns(playable & ~(opponent_wins >> 1))
+
+    def winning_move(self, piece):
+        """
+        Verifica se il giocatore ha fatto '4 in fila' ('connect' in fila per
+        geometrie diverse da quella standard).
+        """
+        if self.geometry is STANDARD_GEOMETRY:
+            return has_four(self.pieces[piece])
+        return self.geometry.has_connect(self.pieces[piece])
+
+    def is_full(self):
+        """
+        Ritorna True se non ci sono più mosse valide (pareggio se nessuno ha vinto).
+        """
+        return self.mask == self.geometry.board_mask
+
+    def key(self):
+        """
+        Chiave intera univoca della posizione (le pedine dell'IA sommate alla
+        maschera delle celle occupate).
+        """
+        return self.pieces[AI_PIECE] + self.mask
+
+    def mirror(self):
+        """
+        Restituisce la posizione riflessa orizzontalmente (stesso storico, con
+        le colonne riflesse).
+        """
+        geometry = self.geometry
+        other = BitBoard(geometry)
+        column = (1 << geometry.height) - 1
+        last = geometry.cols - 1
+        for col in range(geometry.cols):
+            shift = (last - col - col) * geometry.height
+            for piece in (PLAYER_PIECE, AI_PIECE):
+                bits = self.pieces[piece] & (column << (col * geometry.height))
+                other.pieces[piece] |= bits << shift if shift >= 0 else bits >> -shift
+        other.mask = other.pieces[PLAYER_PIECE] | other.pieces[AI_PIECE]
+        other.heights = self.heights[::-1]
+        other.moves = [(last - col, piece) for col, piece in self.moves]
+        return other
+
+    def canonical_key(self):
+        """
+        Restituisce (chiave, riflessa): la minore tra key() e la chiave della
+        posizione riflessa, e True se è quest'ultima.
+        """
+        key = self.key()
+        mirrored_key = self.mirror().key()
+        return (mirrored_key, True) if mirrored_key < key else (key, False)
+
+    def move_count(self):
+        """
+        Restituisce il numero di pedine presenti sulla griglia.
+        """
+        return bin(self.mask).count('1')
+
+    def to_board(self):
+        """
+        Converte la posizione nella matrice NumPy usata da board.py e dalla GUI.
+        """
+        geometry = self.geometry
+        board = create_board(None if geometry is STANDARD_GEOMETRY else geometry)
+        for col in range(geometry.cols):
+            for height in range(self.heights[col]):
+                bit = 1 << (col * geometry.height + height)
+                piece = PLAYER_PIECE if self.pieces[PLAYER_PIECE] & bit else AI_PIECE
+                drop_piece(board, geometry.rows - 1 - height, col, piece)
+        return board
+
+    @classmethod
+    def from_board(cls, board, geometry=None):
+        """
+        Costruisce la bitboard a partire da una matrice NumPy di board.py
+        (con la geometria ricavata dalla forma della board, se non indicata).
+        Lo storico delle mosse non è ricostruibile: undo_move è disponibile
+        solo per le mosse giocate dopo la conversione.
+        """
+        geometry = board_geometry(board, geometry)
+        bitboard = cls(geometry)
+        for col in range(geometry.cols):
+            for row in range(geometry.rows - 1, -1, -1):
+                piece = int(board[row][col])
+                if piece == 0:
+                    break
+                bit = 1 << (col * geometry.height + geometry.rows - 1 - row)
+                bitboard.pieces[piece] |= bit
+                bitboard.mask |= bit
+                bitboard.heights[col] += 1
+        return bitboard
+
+    @classmethod
+    def from_moves(cls, moves, first_piece=PLAYER_PIECE, geometry=None):
+        """
+        Costruisce la posizione da una stringa di colonne (es. "3344"),
+        alternando i giocatori a partire da 'first_piece'.
+        """
+        bitboard = cls(geometry)
+        piece = first_piece
+        for char in moves:
+            col = int(char)
+            if not bitboard.can_play(col):
+                raise ValueError(f"Colonna {col} piena nella sequenza '{moves}'")
+            bitboard.play(col, piece)
+            piece = PLAYER_PIECE if piece == AI_PIECE else AI_PIECE
+        return bitboard
+
+
+def create_bitboard(geometry=None):
+    """
+    Crea una bitboard vuota (equivalente di board.create_board).
+    """
+    return BitBoard(geometry)
+
+
+def board_to_bitboard(board):
+    return BitBoard.from_board(board)
+
+
+def bitboard_to_board(bitboard):
+    return bitboard.to_board()
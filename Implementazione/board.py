@@ -1,8 +1,12 @@
 import numpy as np
 
-# Costanti di base per la gestione della board
+import kernels
+from geometry import get_geometry
+
+# Costanti di base per la gestione della board (griglia standard)
 ROWS = 6
 COLS = 7
+CONNECT = 4
 
 PLAYER_TURN = 0
 AI_TURN = 1
@@ -10,13 +14,59 @@ AI_TURN = 1
 PLAYER_PIECE = 1
 AI_PIECE = 2
 
+# Tipo delle celle della board: un byte per cella (0, PLAYER_PIECE, AI_PIECE)
+BOARD_DTYPE = np.int8
+
+
+# Griglia standard e tabelle precalcolate (finestre, layout della bitboard, ...)
+STANDARD_GEOMETRY = get_geometry(ROWS, COLS, CONNECT)
+STANDARD_SHAPE = (ROWS, COLS)
+
+# Finestre di 4 celle della griglia standard (69), come tuple di (row, col)
+WINDOWS = STANDARD_GEOMETRY.windows
+
+# Per ogni cella, gli indici delle finestre (al massimo 16) che la contengono
+CELL_WINDOWS = STANDARD_GEOMETRY.cell_windows
+
+# Le stesse finestre come indici nella board appiattita: tuple per i cicli
+# Python (WINDOW_CELLS) e array di forma (69, 4) per le operazioni vettoriali
+WINDOW_CELLS = STANDARD_GEOMETRY.window_cells
+WINDOW_INDICES = STANDARD_GEOMETRY.window_indices
+
+# Colonna di ogni cella della board appiattita
+CELL_COLUMNS = STANDARD_GEOMETRY.cell_columns
+
+# Numero massimo di board valutate insieme da score_positions (limita la memoria)
+BATCH_CHUNK = 65536
+
+# Tabelle dei punteggi per score_position: (piece, pesi, connect) -> table_by_code
+_window_tables = {}
+
+# Codici delle celle per lunghezza delle finestre (vedi cell_codes)
+_cell_codes = {}
 
-def create_board():
+
+def board_geometry(board, geometry=None):
+    """
+    Restituisce 'geometry' se indicata, altrimenti la geometria ricavata dalla
+    forma della board con CONNECT pedine da allineare.
+    """
+    if geometry is not None:
+        return geometry
+    shape = board.shape
+    if shape == STANDARD_SHAPE:
+        return STANDARD_GEOMETRY
+    return get_geometry(shape[0], shape[1], CONNECT)
+
+
+def create_board(geometry=None):
     """
-    Crea una matrice 6x7 (row x col) inizializzata a 0.
+    Crea una matrice 6x7 (row x col) di BOARD_DTYPE inizializzata a 0, oppure
+    con le dimensioni di 'geometry'.
     """
-    board = np.zeros((ROWS, COLS))
-    return board
+    if geometry is None:
+        return np.zeros((ROWS, COLS), dtype=BOARD_DTYPE)
+    return np.zeros((geometry.rows, geometry.cols), dtype=BOARD_DTYPE)
 
 
 def drop_piece(board, row, col, piece):
@@ -38,123 +88,318 @@ def get_next_open_row(board, col):
     Restituisce l'indice della prima riga libera (dall'alto verso il basso)
     nella colonna.
     """
-    for r in range(ROWS - 1, -1, -1):
+    for r in range(len(board) - 1, -1, -1):
         if board[r][col] == 0:
             return r
 
 
-def winning_move(board, piece):
+def winning_move(board, piece, geometry=None):
     """
-    Verifica se il giocatore ha fatto '4 in fila'.
+    Verifica se il giocatore ha fatto '4 in fila' ('connect' in fila per
+    geometrie diverse da quella standard).
     Ritorna True se esiste una combinazione vincente.
     """
-    # Controllo orizzontale
-    for c in range(COLS - 3):
-        for r in range(ROWS):
-            if (board[r][c] == piece and board[r][c + 1] == piece and
-                    board[r][c + 2] == piece and board[r][c + 3] == piece):
-                return True
+    geometry = board_geometry(board, geometry)
+    return winning_cells(board.ravel().tolist(), piece, geometry)
 
-    # Controllo verticale
-    for c in range(COLS):
-        for r in range(ROWS - 3):
-            if (board[r][c] == piece and board[r + 1][c] == piece and
-                    board[r + 2][c] == piece and board[r + 3][c] == piece):
-                return True
 
-    # Controllo diagonale positiva
-    for c in range(COLS - 3):
-        for r in range(3, ROWS):
-            if (board[r][c] == piece and board[r - 1][c + 1] == piece and
-                    board[r - 2][c + 2] == piece and board[r - 3][c + 3] == piece):
+def winning_cells(cells, piece, geometry):
+    """
+    Come winning_move, sulle celle della board appiattita ('cells', lista di
+    rows * cols valori, oppure memoryview come Position.cells) invece che
+    sulla matrice.
+    """
+    if geometry.connect == 4:
+        for a, b, c, d in geometry.window_cells:
+            if cells[a] == piece and cells[b] == piece and cells[c] == piece and cells[d] == piece:
                 return True
+        return False
+    return any(_full_window(cells, window, piece) for window in geometry.window_cells)
+
 
-    # Controllo diagonale negativa
-    for c in range(3, COLS):
-        for r in range(3, ROWS):
-            if (board[r][c] == piece and board[r - 1][c - 1] == piece and
-                    board[r - 2][c - 2] == piece and board[r - 3][c - 3] == piece):
+def winning_move_at(board, row, col, piece, geometry=None):
+    """
+    Verifica se la pedina di 'piece' appena inserita in [row, col] ha fatto
+    '4 in fila', controllando solo le finestre che passano per quella cella.
+    Se prima della mossa nessuno aveva vinto equivale a winning_move(board, piece).
+    """
+    geometry = board_geometry(board, geometry)
+    return winning_cells_at(board.ravel().tolist(), row, col, piece, geometry)
+
+
+def winning_cells_at(cells, row, col, piece, geometry):
+    """
+    Come winning_move_at, sulle celle della board appiattita ('cells', lista
+    di rows * cols valori, oppure memoryview come Position.cells) invece che
+    sulla matrice.
+    """
+    window_cells = geometry.window_cells
+    if geometry.connect == 4:
+        for index in geometry.cell_windows[row][col]:
+            a, b, c, d = window_cells[index]
+            if cells[a] == piece and cells[b] == piece and cells[c] == piece and cells[d] == piece:
                 return True
+        return False
+    return any(_full_window(cells, window_cells[index], piece) for index in geometry.cell_windows[row][col])
+
 
-    return False
+def _full_window(cells, window, piece):
+    for index in window:
+        if cells[index] != piece:
+            return False
+    return True
 
 
 def get_valid_locations(board):
     """
     Restituisce le colonne valide in cui è possibile inserire un pezzo.
     """
-    valid_locations = []
-    for col in range(COLS):
-        if is_valid_location(board, col):
-            valid_locations.append(col)
-    return valid_locations
+    top_row = board[0].tolist()
+    return [col for col in range(len(top_row)) if top_row[col] == 0]
 
 
-def is_terminal_node(board):
+def is_terminal_node(board, geometry=None):
     """
     Ritorna True se la board è in uno stato terminale (vittoria giocatore/AI o pareggio).
     """
-    return (winning_move(board, PLAYER_PIECE) or
-            winning_move(board, AI_PIECE) or
+    return (winning_move(board, PLAYER_PIECE, geometry) or
+            winning_move(board, AI_PIECE, geometry) or
             len(get_valid_locations(board)) == 0)
 
 
+# =======================================================================
+# Simmetria destra-sinistra
+# =======================================================================
+# Una posizione e la sua riflessa hanno lo stesso valore, con le mosse riflesse
+# (la colonna c diventa cols - 1 - c): tabella delle trasposizioni, libro delle
+# aperture e cache delle analisi memorizzano solo la forma canonica.
+
+def mirror_board(board):
+    """
+    Restituisce la board riflessa orizzontalmente.
+    """
+    return board[:, ::-1].copy()
+
+
+def mirror_move(col, cols=COLS):
+    """
+    Colonna corrispondente a 'col' nella board riflessa.
+    """
+    return cols - 1 - col
+
+
+def is_symmetric(board):
+    """
+    Ritorna True se la board coincide con la sua riflessa.
+    """
+    return np.array_equal(board, board[:, ::-1])
+
+
+def unique_moves(board, moves):
+    """
+    Se la board è simmetrica, toglie da 'moves' le mosse riflesse di mosse già
+    presenti (hanno lo stesso valore), mantenendo l'ordine; altrimenti
+    restituisce 'moves'.
+    """
+    if not is_symmetric(board):
+        return moves
+    cols = board.shape[1]
+    kept = []
+    for col in moves:
+        if mirror_move(col, cols) not in kept:
+            kept.append(col)
+    return kept
+
+
+def swap_colors(board):
+    """
+    Restituisce la board con i colori scambiati (PLAYER_PIECE <-> AI_PIECE):
+    la posizione vista dall'altro giocatore.
+    """
+    swapped = board.copy()
+    swapped[board == PLAYER_PIECE] = AI_PIECE
+    swapped[board == AI_PIECE] = PLAYER_PIECE
+    return swapped
+
+
 # =======================================================================
 # Funzioni di valutazione (euristiche)
 # =======================================================================
 
 def evaluate_window(window, piece, weights):
+    """
+    Punteggio di una finestra di n celle (n = 4 nella griglia standard): n
+    pedine valgono la vittoria, n - 1 (o n - 2) con le altre celle libere una
+    minaccia, le stesse configurazioni dell'avversario una penalità.
+    """
     opponent_piece = PLAYER_PIECE if piece == AI_PIECE else AI_PIECE
+    size = len(window)
     score = 0
 
-    if window.count(piece) == 4:
+    if window.count(piece) == size:
         score += weights['win']
-    elif window.count(piece) == 3 and window.count(0) == 1:
+    elif window.count(piece) == size - 1 and window.count(0) == 1:
         score += weights['three_in_a_row']
-    elif window.count(piece) == 2 and window.count(0) == 2:
+    elif window.count(piece) == size - 2 and window.count(0) == 2:
         score += weights['two_in_a_row']
 
-    if window.count(opponent_piece) == 3 and window.count(0) == 1:
+    if window.count(opponent_piece) == size - 1 and window.count(0) == 1:
         score -= weights['block_opponent_win']
-    elif window.count(opponent_piece) == 2 and window.count(0) == 2:
+    elif window.count(opponent_piece) == size - 2 and window.count(0) == 2:
         score -= weights['block_opponent_three']
 
     return score
 
 
+def build_window_table(piece, weights, connect=CONNECT):
+    """
+    Precalcola il punteggio di una finestra di 'connect' celle (dal punto di
+    vista di 'piece') in funzione del numero di pedine del giocatore e dell'IA
+    che contiene: table[player_count][ai_count]. I valori sono ottenuti da
+    evaluate_window, quindi coincidono per costruzione con quelli di score_position.
+    """
+    table = [[0] * (connect + 1) for _ in range(connect + 1)]
+    for player_count in range(connect + 1):
+        for ai_count in range(connect + 1 - player_count):
+            window = [PLAYER_PIECE] * player_count + [AI_PIECE] * ai_count
+            window += [0] * (connect - len(window))
+            table[player_count][ai_count] = evaluate_window(window, piece, weights)
+    return table
+
+
+def window_table_by_code(piece, weights, connect=CONNECT):
+    """
+    Tabella di build_window_table indicizzata dal codice di una finestra
+    (player_count + (connect + 1) * ai_count, vedi cell_codes), calcolata una
+    volta per pedina, pesi e lunghezza delle finestre.
+    """
+    key = (piece, tuple(sorted(weights.items())), connect)
+    table_by_code = _window_tables.get(key)
+    if table_by_code is None:
+        table = build_window_table(piece, weights, connect)
+        table_by_code = [0] * (connect + 1) ** 2
+        for player_count in range(connect + 1):
+            for ai_count in range(connect + 1 - player_count):
+                table_by_code[player_count + (connect + 1) * ai_count] = table[player_count][ai_count]
+        _window_tables[key] = table_by_code
+    return table_by_code
+
+
+def cell_codes(connect=CONNECT):
+    """
+    Codice di una cella per pedina (0, PLAYER_PIECE, AI_PIECE): la somma dei
+    codici di una finestra vale player_count + (connect + 1) * ai_count.
+    """
+    codes = _cell_codes.get(connect)
+    if codes is None:
+        codes = _cell_codes[connect] = {0: 0, PLAYER_PIECE: 1, AI_PIECE: connect + 1}
+    return codes
 
-def score_position(board, piece, weights, center_score_map):
-    score = 0
 
-    for c in range(COLS):
-        col_array = [int(i) for i in board[:, c]]
-        count_in_col = col_array.count(piece)
-        score += count_in_col * center_score_map[c]
-
-    # Finestre orizzontali
-    for r in range(ROWS):
-        row_array = [int(i) for i in list(board[r, :])]
-        for c in range(COLS - 3):
-            window = row_array[c:c + 4]
-            score += evaluate_window(window, piece, weights)
-
-    # Finestre verticali
-    for c in range(COLS):
-        col_array = [int(i) for i in list(board[:, c])]
-        for r in range(ROWS - 3):
-            window = col_array[r:r + 4]
-            score += evaluate_window(window, piece, weights)
-
-    # Finestre diagonali
-    for r in range(ROWS - 3):
-        for c in range(COLS - 3):
-            # Diagonale "in giù a destra"
-            window = [board[r + i][c + i] for i in range(4)]
-            score += evaluate_window(window, piece, weights)
-        for c in range(3, COLS):
-            # Diagonale "in giù a sinistra"
-            window = [board[r + i][c - i] for i in range(4)]
-            score += evaluate_window(window, piece, weights)
+def score_position(board, piece, weights, center_score_map, geometry=None):
+    """
+    Valutazione euristica della board dal punto di vista di 'piece': somma dei
+    punteggi di evaluate_window su tutte le finestre (69 nella griglia
+    standard) più il contributo delle pedine di 'piece' nelle colonne centrali.
+    """
+    geometry = board_geometry(board, geometry)
+    table_by_code = window_table_by_code(piece, weights, geometry.connect)
+    cells = board.ravel().tolist()
+    code_by_piece = cell_codes(geometry.connect)
+    codes = [code_by_piece[cell] for cell in cells]
 
+    score = 0
+    cell_columns = geometry.cell_columns
+    for index, cell in enumerate(cells):
+        if cell == piece:
+            score += center_score_map[cell_columns[index]]
+    if geometry.connect == 4:
+        for a, b, c, d in geometry.window_cells:
+            score += table_by_code[codes[a] + codes[b] + codes[c] + codes[d]]
+    else:
+        for window in geometry.window_cells:
+            code = 0
+            for index in window:
+                code += codes[index]
+            score += table_by_code[code]
     return score
 
+
+def score_positions(boards, piece, weights, center_score_map, geometry=None):
+    """
+    Versione vettoriale di score_position: riceve una pila di board di forma
+    (N, rows, cols) e restituisce un array di N punteggi (int64), identici a
+    quelli di score_position, senza cicli Python sulle finestre.
+    """
+    boards = np.asarray(boards)
+    if geometry is None:
+        geometry = get_geometry(boards.shape[-2], boards.shape[-1], CONNECT)
+    boards = boards.reshape(-1, geometry.cells)
+    table_by_code = np.asarray(window_table_by_code(piece, weights, geometry.connect), dtype=np.int64)
+    center_by_cell = np.tile(np.asarray(center_score_map, dtype=np.int64), geometry.rows)
+    # La somma dei codici di una finestra deve stare nel tipo usato
+    code_type = np.int8 if len(table_by_code) <= 127 else np.int16
+    code_by_piece = cell_codes(geometry.connect)
+    codes_by_piece = np.asarray([code_by_piece[piece] for piece in (0, PLAYER_PIECE, AI_PIECE)], dtype=code_type)
+
+    scores = np.empty(len(boards), dtype=np.int64)
+    for start in range(0, len(boards), BATCH_CHUNK):
+        chunk = boards[start:start + BATCH_CHUNK].astype(np.int8, copy=False)
+        codes = codes_by_piece[chunk]
+        window_codes = codes[:, geometry.window_indices].sum(axis=2, dtype=code_type)
+        scores[start:start + BATCH_CHUNK] = (table_by_code[window_codes].sum(axis=1) +
+                                             (chunk == piece) @ center_by_cell)
+    return scores
+
+
+# =======================================================================
+# Kernel compilati
+# =======================================================================
+# Con il backend Numba (vedi kernels.py) le funzioni seguenti sostituiscono,
+# all'importazione, le versioni Python definite sopra; queste restano in
+# PYTHON_FUNCTIONS per il confronto dei risultati (benchmark/kernels.py).
+
+PYTHON_FUNCTIONS = {
+    'winning_move': winning_move,
+    'winning_cells': winning_cells,
+    'score_position': score_position,
+}
+
+# Tabelle di score_position come array per i kernel, indicizzate da
+# (piece, id dei pesi, id della mappa delle colonne, geometria): ogni voce
+# conserva una copia di pesi e mappa, confrontata ad ogni uso (ordinare i pesi
+# come in window_table_by_code costerebbe più del kernel)
+_kernel_tables = {}
+
+
+def kernel_score_tables(piece, weights, center_score_map, geometry):
+    """
+    Restituisce (table_by_code, codes_by_piece, center_by_cell) per
+    kernels.score_cells, calcolate una volta per pedina, pesi, mappa delle
+    colonne e geometria.
+    """
+    key = (piece, id(weights), id(center_score_map), geometry.key)
+    entry = _kernel_tables.get(key)
+    if entry is None or entry[0] != weights or entry[1] != tuple(center_score_map):
+        code_by_piece = cell_codes(geometry.connect)
+        tables = (
+            np.asarray(window_table_by_code(piece, weights, geometry.connect), dtype=np.int64),
+            np.asarray([code_by_piece[cell] for cell in (0, PLAYER_PIECE, AI_PIECE)], dtype=np.intp),
+            np.tile(np.asarray(center_score_map, dtype=np.int64), geometry.rows),
+        )
+        entry = _kernel_tables[key] = (dict(weights), tuple(center_score_map), tables)
+    return entry[2]
+
+
+if kernels.ENABLED:
+    def winning_move(board, piece, geometry=None):
+        return kernels.winning_cells(board.reshape(-1), piece, board_geometry(board, geometry).window_indices)
+
+    def winning_cells(cells, piece, geometry):
+        return kernels.winning_cells(cells, piece, geometry.window_indices)
+
+    def score_position(board, piece, weights, center_score_map, geometry=None):
+        geometry = board_geometry(board, geometry)
+        table_by_code, codes_by_piece, center_by_cell = kernel_score_tables(piece, weights, center_score_map, geometry)
+        return kernels.score_cells(board.reshape(-1), piece, geometry.window_indices,
+                                   table_by_code, codes_by_piece, center_by_cell)
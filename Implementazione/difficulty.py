@@ -0,0 +1,63 @@
+"""
+Parametri della ricerca per ogni livello di difficoltà.
+
+Modulo separato da utils.py (che importa pygame) per poter usare i livelli
+anche senza interfaccia grafica (engine.py, server.py, difficulty_test.py, benchmark).
+"""
+
+DIFFICULTY_LEVELS = {
+    1: {
+        'max_depth': 5,
+        'beam_width': 4,
+        'heuristic_weights': {
+            'win': 10000,
+            'three_in_a_row': 100,
+            'two_in_a_row': 50,
+            'block_opponent_win': 100,
+            'block_opponent_three': 45
+        },
+        'time_limit': 1.0,
+        'center_score_map': [3, 4, 5, 5, 5, 4, 3],
+        'workers': 1,
+        'use_book': False,
+        'endgame_threshold': 0,
+        'use_cache': True,
+        'lazy_smp': False
+    },
+    2: {
+        'max_depth': 5,
+        'beam_width': 4,
+        'heuristic_weights': {
+            'win': 10000,
+            'three_in_a_row': 100,
+            'two_in_a_row': 50,
+            'block_opponent_win': 100,
+            'block_opponent_three': 45
+        },
+        'time_limit': 1.0,
+        'center_score_map': [3, 4, 5, 5, 5, 4, 3],
+        'workers': 1,
+        'use_book': False,
+        'endgame_threshold': 16,
+        'use_cache': True,
+        'lazy_smp': False
+    },
+    3: {
+        'max_depth': 7,
+        'beam_width': 6,
+        'heuristic_weights': {
+            'win': 10000,
+            'three_in_a_row': 200,
+            'two_in_a_row': 100,
+            'block_opponent_win': 210,
+            'block_opponent_three': 100
+        },
+        'time_limit': 1.2,
+        'center_score_map': [6, 8, 10, 14, 10, 8, 6],
+        'workers': 1,
+        'use_book': True,
+        'endgame_threshold': 16,
+        'use_cache': True,
+        'lazy_smp': False
+    }
+}
\ No newline at end of file
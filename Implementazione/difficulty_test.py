@@ -1,13 +1,15 @@
 import random
+import sys
 import time
 from copy import deepcopy
 
-from algorithms.minimax_ab_all_improvements import find_best_move
+from algorithms.minimax_ab_all_improvements import find_best_move, get_latency_stats, latency_stats
+from algorithms.analysis_cache import get_cache_stats
 from board import (
     create_board, drop_piece, is_valid_location, get_next_open_row,
     winning_move, PLAYER_PIECE, AI_PIECE, ROWS, COLS
 )
-from utils import DIFFICULTY_LEVELS
+from difficulty import DIFFICULTY_LEVELS
 
 class DecreaseParameters:
     def __init__(self, difficulty):
@@ -25,7 +27,8 @@ class DecreaseParameters:
                     'block_opponent_three': 45
                 },
                 'time_limit': 1.0,
-                'center_score_map': [3, 4, 5, 5, 5, 4, 3]
+                'center_score_map': [3, 4, 5, 5, 5, 4, 3],
+                'use_cache': True
             }
         }
         self.difficulty_params = self.DIFFICULTY_LEVELS[self.difficulty]
@@ -79,11 +82,19 @@ def print_board(board):
     print(' ' + ' '.join([str(i) for i in range(COLS)]))
 
 
-def play_game(ai1_level, ai2_level, verbose=False):
-
+def play_game(ai1_level, ai2_level, verbose=False, rng=None, move_log=None, use_cache=None):
+    """
+    Gioca una partita tra due IA. 'rng' (di default il modulo random) decide chi
+    inizia e la prima mossa casuale; se 'move_log' è una lista, per ogni mossa vi
+    viene aggiunta la tupla (giocatore, colonna, tempo di risposta, mossa cercata).
+    'use_cache', se non è None, sostituisce l'opzione use_cache dei livelli: le
+    misure (tournament.py, main) la disattivano, perché con la cache persistente
+    delle analisi le mosse dipenderebbero dalle esecuzioni precedenti.
+    """
+    rng = rng or random
     board = create_board()
     game_over = False
-    turn = random.choice([1, 2])
+    turn = rng.choice([1, 2])
     start_player = "AI1" if turn == 1 else "AI2"
 
     if verbose:
@@ -106,8 +117,9 @@ def play_game(ai1_level, ai2_level, verbose=False):
         if turn == 1:
             # AI1 gioca
             start_time = time.time()
+            searched = not first_move
             if first_move:
-                col = random.choice([c for c in range(COLS) if is_valid_location(board, c)])
+                col = rng.choice([c for c in range(COLS) if is_valid_location(board, c)])
                 if verbose:
                     print(f"AI1 (Livello {ai1_level}) effettua una mossa casuale nella colonna {col}.")
                 first_move = False
@@ -116,10 +128,19 @@ def play_game(ai1_level, ai2_level, verbose=False):
                     ai1_params = decrease_manager_ai1.update_parameters()
                 col = find_best_move(deepcopy(board), ai1_params['max_depth'], ai1_params['beam_width'],
                                      ai1_params['heuristic_weights'], ai1_params['time_limit'],
-                                     ai1_params['center_score_map'])
+                                     ai1_params['center_score_map'], workers=ai1_params.get('workers', 1),
+                                     use_book=ai1_params.get('use_book', False),
+                                     endgame_threshold=ai1_params.get('endgame_threshold', 0),
+                                     search_mode=ai1_params.get('search_mode', 'alphabeta'),
+                                     move_ordering=ai1_params.get('move_ordering', 'heuristic'),
+                                     use_cache=ai1_params.get('use_cache', False) if use_cache is None else use_cache,
+                                     lazy_smp=ai1_params.get('lazy_smp', False),
+                                     piece=PLAYER_PIECE)
                 if verbose:
                     print(f"AI1 (Livello {ai1_level}) ha scelto la colonna {col}.")
             move_time = time.time() - start_time
+            if move_log is not None:
+                move_log.append(("AI1", col, move_time, searched))
             ai1_total_time += move_time
             ai1_move_count += 1
             if verbose:
@@ -142,8 +163,9 @@ def play_game(ai1_level, ai2_level, verbose=False):
         else:
             # AI2 gioca
             start_time = time.time()
+            searched = not first_move
             if first_move:
-                col = random.choice([c for c in range(COLS) if is_valid_location(board, c)])
+                col = rng.choice([c for c in range(COLS) if is_valid_location(board, c)])
                 if verbose:
                     print(f"AI2 (Livello {ai2_level}) effettua una mossa casuale nella colonna {col}.")
                 first_move = False
@@ -152,10 +174,18 @@ def play_game(ai1_level, ai2_level, verbose=False):
                     ai2_params = decrease_manager_ai2.update_parameters()
                 col = find_best_move(deepcopy(board), ai2_params['max_depth'], ai2_params['beam_width'],
                                      ai2_params['heuristic_weights'], ai2_params['time_limit'],
-                                     ai2_params['center_score_map'])
+                                     ai2_params['center_score_map'], workers=ai2_params.get('workers', 1),
+                                     use_book=ai2_params.get('use_book', False),
+                                     endgame_threshold=ai2_params.get('endgame_threshold', 0),
+                                     search_mode=ai2_params.get('search_mode', 'alphabeta'),
+                                     move_ordering=ai2_params.get('move_ordering', 'heuristic'),
+                                     use_cache=ai2_params.get('use_cache', False) if use_cache is None else use_cache,
+                                     lazy_smp=ai2_params.get('lazy_smp', False))
                 if verbose:
                     print(f"AI2 (Livello {ai2_level}) ha scelto la colonna {col}.")
             move_time = time.time() - start_time
+            if move_log is not None:
+                move_log.append(("AI2", col, move_time, searched))
             ai2_total_time += move_time
             ai2_move_count += 1
             if verbose:
@@ -185,6 +215,8 @@ def play_game(ai1_level, ai2_level, verbose=False):
 
 def main():
     print("Modulo di Test per Sfidare Due AI di Forza 4")
+    # Con l'opzione --cache le IA usano la cache persistente delle analisi
+    use_cache = "--cache" in sys.argv
 
     while True:
         try:
@@ -211,11 +243,13 @@ def main():
     total_winning_moves = 0
     total_losing_moves = 0
 
+    latency_stats.reset()
+
     print("\nInizio del Test...\n")
 
     for match in range(1, num_matches + 1):
         print(f"--- Partita {match} ---")
-        result, t1, t2, m1, m2, final_board = play_game(ai1_level, ai2_level, verbose=True)
+        result, t1, t2, m1, m2, final_board = play_game(ai1_level, ai2_level, verbose=True, use_cache=use_cache)
         if result == "AI1":
             ai1_wins += 1
             total_winning_moves += m1
@@ -253,6 +287,18 @@ def main():
     print(f"Tempo Medio di Risposta AI1: {avg_ai1_time:.4f} secondi per mossa")
     print(f"Tempo Medio di Risposta AI2: {avg_ai2_time:.4f} secondi per mossa\n")
 
+    latency = get_latency_stats()
+    if latency['moves'] > 0:
+        print(f"Latenza per Mossa: p50 {latency['p50']:.4f} s, p95 {latency['p95']:.4f} s, "
+              f"massimo {latency['max']:.4f} s")
+        print(f"Sforamento Massimo del Limite di Tempo: {latency['max_overshoot']:.4f} s "
+              f"({latency['over_limit']} mosse oltre il limite)\n")
+
+    cache = get_cache_stats()
+    if cache['lookups'] > 0:
+        print(f"Cache delle Analisi: {cache['hits']}/{cache['lookups']} mosse dalla cache "
+              f"({cache['hit_rate']:.1%}), {cache['entries']} posizioni memorizzate\n")
+
     if total_wins > 0:
         print(f"Mosse Medie per Vincere: {avg_winning_moves:.2f}")
     else:
@@ -0,0 +1,207 @@
+"""
+Motore senza interfaccia grafica con un protocollo a righe su stdin/stdout.
+
+Comandi (uno per riga):
+  position [<mosse>]               colonne (0-6) giocate dall'inizio della
+                                   partita; senza mosse (o con "-") la board
+                                   vuota. Il motore è sempre al tratto: con un
+                                   numero pari di mosse ha iniziato il motore,
+                                   con un numero dispari l'avversario
+  level <n>                        livello di DIFFICULTY_LEVELS (default 3)
+  go [movetime <ms>] [depth <n>]   cerca la mossa migliore per la posizione
+  stop                             interrompe la ricerca in corso
+  isready                          risponde readyok
+  quit                             termina
+
+Risposte:
+  info depth <d> score <v> nodes <n> time <ms> move <c>   ad ogni iterazione completata
+  bestmove <c>                                            al termine della ricerca
+  readyok
+  error <messaggio>
+
+Il modulo non importa pygame e può girare senza display:
+
+    python engine.py
+
+server.py espone lo stesso protocollo su un socket TCP o Unix per molte
+partite contemporaneamente.
+"""
+import sys
+import threading
+
+from algorithms.minimax_ab_all_improvements import find_best_move
+from algorithms.search_stats import subscribe, unsubscribe, ITERATION_COMPLETE
+from bitboard import BitBoard
+from board import COLS, PLAYER_PIECE, AI_PIECE
+from difficulty import DIFFICULTY_LEVELS
+
+DEFAULT_LEVEL = 3
+
+
+def board_from_moves(moves):
+    """
+    Board (board.py) ottenuta giocando 'moves' con il motore (AI_PIECE) al
+    tratto alla fine. Solleva ValueError se la sequenza non è valida o se la
+    partita è già terminata.
+    """
+    if moves == '-':
+        moves = ''
+    if any(not char.isdigit() or int(char) >= COLS for char in moves):
+        raise ValueError(f"mosse non valide: '{moves}'")
+    first_piece = AI_PIECE if len(moves) % 2 == 0 else PLAYER_PIECE
+    bitboard = BitBoard.from_moves(moves, first_piece)
+    if bitboard.winning_move(PLAYER_PIECE) or bitboard.winning_move(AI_PIECE) or bitboard.is_full():
+        raise ValueError(f"la posizione '{moves}' è già terminata")
+    return bitboard.to_board()
+
+
+def parse_level(args):
+    if len(args) != 1 or not args[0].isdigit() or int(args[0]) not in DIFFICULTY_LEVELS:
+        raise ValueError(f"livello non valido (ammessi: {', '.join(map(str, DIFFICULTY_LEVELS))})")
+    return int(args[0])
+
+
+def parse_go(args):
+    """
+    Restituisce (movetime in secondi oppure None, profondità oppure None) dagli
+    argomenti di 'go'.
+    """
+    options = {}
+    if len(args) % 2:
+        raise ValueError("argomenti di go non validi")
+    for name, value in zip(args[::2], args[1::2]):
+        if name not in ('movetime', 'depth') or not value.isdigit() or int(value) <= 0:
+            raise ValueError(f"argomento di go non valido: {name} {value}")
+        options[name] = int(value)
+    movetime = options.get('movetime')
+    return (movetime / 1000 if movetime is not None else None), options.get('depth')
+
+
+def search_params(level, movetime=None, depth=None, max_movetime=None):
+    """
+    Parametri del livello con il limite di tempo e la profondità di 'go';
+    max_movetime (in secondi) limita il tempo di ogni ricerca.
+    """
+    params = dict(DIFFICULTY_LEVELS[level])
+    if movetime is not None:
+        params['time_limit'] = movetime
+    if depth is not None:
+        params['max_depth'] = depth
+    if max_movetime is not None:
+        params['time_limit'] = min(params['time_limit'], max_movetime)
+    return params
+
+
+def run_search(board, params, should_stop=None, on_iteration=None):
+    """
+    Esegue find_best_move con i parametri indicati; on_iteration(evento) viene
+    chiamata ad ogni iterazione completata. Restituisce (colonna, SearchStats).
+    """
+    if on_iteration is not None:
+        subscribe(ITERATION_COMPLETE, on_iteration)
+    try:
+        return find_best_move(board, params['max_depth'], params['beam_width'], params['heuristic_weights'],
+                              params['time_limit'], params['center_score_map'], should_stop=should_stop,
+                              workers=params.get('workers', 1), use_book=params.get('use_book', False),
+                              endgame_threshold=params.get('endgame_threshold', 0),
+                              search_mode=params.get('search_mode', 'alphabeta'),
+                              move_ordering=params.get('move_ordering', 'heuristic'),
+                              use_cache=params.get('use_cache', False),
+                              lazy_smp=params.get('lazy_smp', False), return_stats=True)
+    finally:
+        if on_iteration is not None:
+            unsubscribe(ITERATION_COMPLETE, on_iteration)
+
+
+def format_info(event):
+    return (f"info depth {event['depth']} score {event['value']} nodes {event['nodes']} "
+            f"time {round(event['elapsed'] * 1000)} move {event['move']}")
+
+
+class Engine:
+    """
+    Stato di una sessione del protocollo: posizione, livello e ricerca in corso
+    (eseguita in un thread, così 'stop' viene letto mentre il motore pensa).
+    'write' riceve ogni riga di risposta.
+    """
+
+    def __init__(self, write):
+        self.write = write
+        self.board = board_from_moves('')
+        self.level = DEFAULT_LEVEL
+        self.search_thread = None
+        self.stop_event = threading.Event()
+
+    def searching(self):
+        return self.search_thread is not None and self.search_thread.is_alive()
+
+    def handle(self, line):
+        """
+        Esegue un comando; restituisce False dopo 'quit'.
+        """
+        fields = line.split()
+        if not fields:
+            return True
+        command, args = fields[0], fields[1:]
+        try:
+            if command == 'quit':
+                self.stop()
+                return False
+            if command == 'isready':
+                self.write('readyok')
+            elif command == 'stop':
+                self.stop()
+            elif self.searching():
+                raise ValueError("ricerca in corso")
+            elif command == 'position':
+                self.board = board_from_moves(''.join(args))
+            elif command == 'level':
+                self.level = parse_level(args)
+            elif command == 'go':
+                self.go(*parse_go(args))
+            else:
+                raise ValueError(f"comando sconosciuto: {command}")
+        except ValueError as e:
+            self.write(f"error {e}")
+        return True
+
+    def go(self, movetime, depth):
+        params = search_params(self.level, movetime, depth)
+        self.stop_event.clear()
+
+        def search():
+            # Ogni 'go' termina con una sola riga bestmove oppure error, come in server.py
+            try:
+                best_col, _ = run_search(self.board.copy(), params, self.stop_event.is_set,
+                                         lambda event: self.write(format_info(event)))
+            except Exception as e:
+                self.write(f"error ricerca fallita: {e}")
+                return
+            self.write(f"bestmove {best_col}")
+
+        self.search_thread = threading.Thread(target=search, daemon=True)
+        self.search_thread.start()
+
+    def stop(self):
+        if self.searching():
+            self.stop_event.set()
+            self.search_thread.join()
+
+
+def main():
+    lock = threading.Lock()
+
+    def write(line):
+        with lock:
+            sys.stdout.write(line + '\n')
+            sys.stdout.flush()
+
+    engine = Engine(write)
+    for line in sys.stdin:
+        if not engine.handle(line):
+            break
+    engine.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Valutazione euristica incrementale.
+
+Equivale a board.score_position, ma invece di riesaminare ad ogni chiamata le
+69 finestre della griglia mantiene, per ogni finestra, il numero di pedine di
+ciascun giocatore e il punteggio totale dal punto di vista di entrambi.
+Inserire o rimuovere una pedina aggiorna solo le finestre (al massimo 16) che
+passano per quella cella.
+"""
+from board import (
+    PLAYER_PIECE,
+    AI_PIECE,
+    board_geometry,
+    build_window_table,
+)
+
+
+class IncrementalEvaluator:
+    """
+    Mantiene il valore di score_position(board, piece, ...) per entrambi i
+    giocatori mentre le pedine vengono inserite (drop) e rimosse (remove).
+    'geometry' è la geometria della griglia (di default ricavata dalla board,
+    vedi board.board_geometry).
+    """
+
+    def __init__(self, board, heuristic_weights, center_score_map, geometry=None):
+        geometry = board_geometry(board, geometry)
+        self.center_score_map = center_score_map
+        self.cell_windows = geometry.cell_windows
+        self.player_table = build_window_table(PLAYER_PIECE, heuristic_weights, geometry.connect)
+        self.ai_table = build_window_table(AI_PIECE, heuristic_weights, geometry.connect)
+        self.player_counts = [0] * len(geometry.windows)
+        self.ai_counts = [0] * len(geometry.windows)
+        # Punteggi indicizzati per pedina: scores[PLAYER_PIECE], scores[AI_PIECE]
+        # (una finestra vuota vale 0 per qualunque peso)
+        self.scores = [0, 0, 0]
+        for r in range(geometry.rows):
+            for c in range(geometry.cols):
+                piece = int(board[r][c])
+                if piece != 0:
+                    self.drop(r, c, piece)
+
+    def score(self, piece):
+        """
+        Restituisce score_position(board, piece, ...) per la board corrente.
+        """
+        return self.scores[piece]
+
+    def drop(self, row, col, piece):
+        self._update(row, col, piece, 1)
+
+    def remove(self, row, col, piece):
+        self._update(row, col, piece, -1)
+
+    def _update(self, row, col, piece, delta):
+        player_table = self.player_table
+        ai_table = self.ai_table
+        player_counts = self.player_counts
+        ai_counts = self.ai_counts
+        player_score = self.scores[PLAYER_PIECE]
+        ai_score = self.scores[AI_PIECE]
+
+        for index in self.cell_windows[row][col]:
+            p = player_counts[index]
+            a = ai_counts[index]
+            player_score -= player_table[p][a]
+            ai_score -= ai_table[p][a]
+            if piece == PLAYER_PIECE:
+                p += delta
+                player_counts[index] = p
+            else:
+                a += delta
+                ai_counts[index] = a
+            player_score += player_table[p][a]
+            ai_score += ai_table[p][a]
+
+        # Contributo delle colonne centrali: conta solo le pedine di 'piece'
+        if piece == PLAYER_PIECE:
+            player_score += delta * self.center_score_map[col]
+        else:
+            ai_score += delta * self.center_score_map[col]
+
+        self.scores[PLAYER_PIECE] = player_score
+        self.scores[AI_PIECE] = ai_score
@@ -0,0 +1,168 @@
+"""
+Geometria della griglia: numero di righe, di colonne e di pedine da allineare.
+
+Tutte le tabelle che dipendono dalla griglia (finestre di 'connect' celle,
+mappa cella -> finestre, ordine delle colonne dal centro, layout della
+bitboard) vengono calcolate una sola volta per geometria e riusate:
+get_geometry restituisce sempre lo stesso oggetto per gli stessi parametri.
+
+La griglia standard (6x7, 4 in fila) è board.STANDARD_GEOMETRY; board.py,
+evaluator.py e bitboard.py ricavano la geometria dalla forma della board
+quando non viene indicata (con 'connect' pari a 4).
+"""
+import numpy as np
+
+# Dimensioni massime della griglia (le chiavi di Zobrist e la profondità dei
+# valori terminali nella tabella delle trasposizioni sono dimensionate su queste)
+MAX_ROWS = 12
+MAX_COLS = 12
+
+_geometries = {}
+
+
+class BoardGeometry:
+    """
+    Tabelle precalcolate di una griglia rows x cols in cui vince chi allinea
+    'connect' pedine:
+      - windows: finestre di 'connect' celle allineate, come tuple di (row, col),
+      - window_cells: le stesse come indici nella board appiattita,
+      - window_indices: array NumPy di forma (len(windows), connect),
+      - cell_windows[row][col]: indici delle finestre che contengono la cella,
+      - cell_columns: colonna di ogni cella della board appiattita,
+      - center_order: colonne dal centro verso i bordi,
+      - height, bottom_mask, board_mask, directions, column_masks: layout
+        della bitboard (rows + 1 bit per colonna, vedi bitboard.py).
+    """
+
+    def __init__(self, rows, cols, connect):
+        if not (1 <= rows <= MAX_ROWS and 1 <= cols <= MAX_COLS):
+            raise ValueError(f"Griglia {rows}x{cols} non valida (massimo {MAX_ROWS}x{MAX_COLS})")
+        if not 2 <= connect <= max(rows, cols):
+            raise ValueError(f"connect={connect} non valido per una griglia {rows}x{cols}")
+        self.rows = rows
+        self.cols = cols
+        self.connect = connect
+        self.cells = rows * cols
+        self.key = (rows, cols, connect)
+
+        self.windows = self._build_windows()
+        self.window_cells = [tuple(r * cols + c for r, c in window) for window in self.windows]
+        self.window_indices = np.array(self.window_cells, dtype=np.intp).reshape(-1, connect)
+        self.cell_windows = [[[] for _ in range(cols)] for _ in range(rows)]
+        for index, window in enumerate(self.windows):
+            for r, c in window:
+                self.cell_windows[r][c].append(index)
+        self.cell_columns = [index % cols for index in range(self.cells)]
+        self.center_order = sorted(range(cols), key=lambda col: abs((cols - 1) / 2 - col))
+
+        self.height = rows + 1
+        self.bottom_mask = sum(1 << (c * self.height) for c in range(cols))
+        self.board_mask = self.bottom_mask * ((1 << rows) - 1)
+        # Shift delle quattro direzioni: verticale, orizzontale, le due diagonali
+        self.directions = (1, self.height, self.height - 1, self.height + 1)
+        self.column_masks = [self.column_mask(col) for col in range(cols)]
+
+    def _build_windows(self):
+        rows, cols, n = self.rows, self.cols, self.connect
+        windows = []
+        for r in range(rows):
+            for c in range(cols - n + 1):
+                windows.append(tuple((r, c + i) for i in range(n)))
+        for c in range(cols):
+            for r in range(rows - n + 1):
+                windows.append(tuple((r + i, c) for i in range(n)))
+        for r in range(rows - n + 1):
+            for c in range(cols - n + 1):
+                windows.append(tuple((r + i, c + i) for i in range(n)))
+            for c in range(n - 1, cols):
+                windows.append(tuple((r + i, c - i) for i in range(n)))
+        return windows
+
+    def center_score_map(self, base_map):
+        """
+        Adatta una mappa dei moltiplicatori delle colonne (es. quella a 7
+        colonne di DIFFICULTY_LEVELS) al numero di colonne della griglia,
+        ricampionandola in modo simmetrico.
+        """
+        if len(base_map) == self.cols:
+            return list(base_map)
+        if self.cols == 1:
+            return [base_map[len(base_map) // 2]]
+        scale = (len(base_map) - 1) / (self.cols - 1)
+        half = [base_map[round(col * scale)] for col in range((self.cols + 1) // 2)]
+        return half + half[:self.cols // 2][::-1]
+
+    def column_mask(self, col):
+        """
+        Maschera delle celle giocabili della colonna nella bitboard.
+        """
+        return ((1 << self.rows) - 1) << (col * self.height)
+
+    def cell_bit(self, row, col):
+        """
+        Bit della cella [row, col] (riga 0 in alto, come in board.py).
+        """
+        return 1 << (col * self.height + self.rows - 1 - row)
+
+    def has_connect(self, bits):
+        """
+        Ritorna True se l'insieme di pedine 'bits' contiene 'connect' pedine in fila.
+        """
+        for shift in self.directions:
+            run = bits
+            for _ in range(self.connect - 1):
+                run &= run >> shift
+                if not run:
+                    break
+            if run:
+                return True
+        return False
+
+    def threat_cells(self, bits, mask):
+        """
+        Celle libere (tra quelle di 'mask', le celle occupate) che
+        completerebbero 'connect' in fila per le pedine 'bits', giocabili o no.
+        """
+        if self.connect == 4:
+            # Formula a shift per il '4 in fila' (anche endgame_solver.winning_positions)
+            result = (bits << 1) & (bits << 2) & (bits << 3)
+            for shift in self.directions[1:]:
+                pairs = (bits << shift) & (bits << 2 * shift)
+                result |= pairs & (bits << 3 * shift)
+                result |= pairs & (bits >> shift)
+                pairs = (bits >> shift) & (bits >> 2 * shift)
+                result |= pairs & (bits << shift)
+                result |= pairs & (bits >> 3 * shift)
+            return result & (self.board_mask ^ mask)
+        result = 0
+        for shift in self.directions:
+            # La cella vuota è la gap-esima della finestra
+            for gap in range(self.connect):
+                run = -1
+                for offset in range(-gap, self.connect - gap):
+                    if offset > 0:
+                        run &= bits >> offset * shift
+                    elif offset < 0:
+                        run &= bits << -offset * shift
+                result |= run
+        return result & (self.board_mask ^ mask)
+
+    def columns(self, cells):
+        """
+        Colonne che contengono almeno una delle celle 'cells' della bitboard.
+        """
+        return [col for col in range(self.cols) if cells & self.column_masks[col]]
+
+    def __repr__(self):
+        return f"BoardGeometry(rows={self.rows}, cols={self.cols}, connect={self.connect})"
+
+
+def get_geometry(rows, cols, connect):
+    """
+    Restituisce la geometria indicata, creandone le tabelle alla prima richiesta.
+    """
+    key = (rows, cols, connect)
+    geometry = _geometries.get(key)
+    if geometry is None:
+        geometry = _geometries[key] = BoardGeometry(rows, cols, connect)
+    return geometry
@@ -0,0 +1,81 @@
+"""
+Kernel compilati per le funzioni più frequenti della ricerca.
+
+Con Numba installato (pip install numba) le funzioni che scorrono tutte le
+finestre della griglia, il controllo della vittoria (board.winning_move,
+board.winning_cells) e la valutazione (board.score_position), vengono
+compilate al primo uso; senza Numba restano le versioni Python di board.py,
+che danno risultati identici (vedi benchmark/kernels.py).
+
+Le funzioni che toccano al più 16 finestre per nodo (board.winning_cells_at,
+evaluator.IncrementalEvaluator) restano in Python: il costo di una chiamata
+a un kernel Numba supera quello del ciclo Python.
+
+Il backend viene scelto all'importazione; la variabile d'ambiente
+CONNECT4_KERNELS lo forza:
+  - 'auto' (default): Numba se disponibile, altrimenti Python,
+  - 'python': sempre le versioni Python,
+  - 'numba': Numba, con ImportError se non è installato.
+
+I kernel lavorano sulle celle della board appiattita (array NumPy o
+memoryview, come Position.cells) e sulle finestre geometry.window_indices.
+"""
+import os
+
+BACKEND_VARIABLE = 'CONNECT4_KERNELS'
+BACKENDS = ('auto', 'python', 'numba')
+
+
+def _load_numba():
+    requested = os.environ.get(BACKEND_VARIABLE, 'auto')
+    if requested not in BACKENDS:
+        raise ValueError(f"{BACKEND_VARIABLE}={requested!r} non valido (ammessi: {', '.join(BACKENDS)})")
+    if requested == 'python':
+        return None
+    try:
+        import numba
+    except ImportError:
+        if requested == 'numba':
+            raise
+        return None
+    return numba
+
+
+numba = _load_numba()
+
+# Backend in uso: 'numba' oppure 'python'
+BACKEND = 'python' if numba is None else 'numba'
+ENABLED = numba is not None
+
+
+if ENABLED:
+    @numba.njit(cache=True)
+    def winning_cells(cells, piece, windows):
+        """
+        True se una delle finestre 'windows' contiene solo pedine di 'piece'.
+        """
+        for window in range(windows.shape[0]):
+            for index in range(windows.shape[1]):
+                if cells[windows[window, index]] != piece:
+                    break
+            else:
+                return True
+        return False
+
+    @numba.njit(cache=True)
+    def score_cells(cells, piece, windows, table_by_code, codes_by_piece, center_by_cell):
+        """
+        Punteggio di board.score_position: tabella per codice di ogni finestra
+        più il contributo delle colonne per le pedine di 'piece'.
+        """
+        score = 0
+        for cell in range(cells.shape[0]):
+            if cells[cell] == piece:
+                score += center_by_cell[cell]
+        for window in range(windows.shape[0]):
+            code = 0
+            for index in range(windows.shape[1]):
+                code += codes_by_piece[int(cells[windows[window, index]])]
+            score += table_by_code[code]
+        return score
+
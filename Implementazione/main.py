@@ -1,9 +1,41 @@
+import sys
+
 import pygame
 
+from ai_worker import AIWorker
+
 SCALE = 0.65
 WINDOW_WIDTH = int(1300 * SCALE)
 WINDOW_HEIGHT = int(1000 * SCALE)
 
+
+class FrameStats:
+    """
+    Durata dei frame del ciclo principale, separando i frame in cui l'IA sta
+    pensando. Un frame è considerato perso se dura più di 1.5 volte il budget
+    (1000 / FPS millisecondi). L'animazione di caduta (GameGui.animate_drop) ha
+    un proprio ciclo a 60 FPS, quindi il frame principale che la contiene
+    risulta lungo anche se l'animazione è fluida.
+    """
+
+    def __init__(self, fps):
+        self.budget_ms = 1000 / fps
+        self.frames = {True: 0, False: 0}
+        self.dropped = {True: 0, False: 0}
+        self.max_ms = {True: 0, False: 0}
+
+    def record(self, frame_ms, ai_thinking):
+        self.frames[ai_thinking] += 1
+        if frame_ms > 1.5 * self.budget_ms:
+            self.dropped[ai_thinking] += 1
+        self.max_ms[ai_thinking] = max(self.max_ms[ai_thinking], frame_ms)
+
+    def print_summary(self):
+        for ai_thinking, label in ((True, "Turno IA"), (False, "Altri frame")):
+            print(f"{label}: {self.frames[ai_thinking]} frame, {self.dropped[ai_thinking]} persi, "
+                  f"massimo {self.max_ms[ai_thinking]} ms (budget {self.budget_ms:.1f} ms)")
+
+
 class Window:
     FPS = 60
 
@@ -12,24 +44,44 @@ class Window:
         self.screen = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
         pygame.display.set_caption("Connect4IA")
         self.clock = pygame.time.Clock()
+        self.ai_worker = AIWorker()
+        # Con l'opzione --frame-stats il riepilogo dei frame viene stampato all'uscita
+        self.frame_stats = FrameStats(self.FPS) if "--frame-stats" in sys.argv else None
         from states.home import HomeState
         self.current_state = HomeState(self)
 
     def run(self):
         running = True
         while running:
-            self.clock.tick(self.FPS)
+            frame_ms = self.clock.tick(self.FPS)
+            if self.frame_stats is not None:
+                self.frame_stats.record(frame_ms, self.current_state.is_ai_thinking())
             self.current_state.handle_events()
             self.current_state.update()
             self.current_state.render(self.screen)
             pygame.display.flip()
 
+    def restart_ai_worker(self):
+        """
+        Sostituisce il processo worker dell'IA, ad esempio dopo che è terminato
+        in modo anomalo (BrokenProcessPool).
+        """
+        self.ai_worker.shutdown(wait=True)
+        self.ai_worker = AIWorker()
+
     def change_state(self, new_state):
         self.current_state = new_state
 
     def get_scale(self):
         return self.scale
 
+    def quit(self):
+        self.ai_worker.shutdown()
+        if self.frame_stats is not None:
+            self.frame_stats.print_summary()
+        pygame.quit()
+        sys.exit()
+
 def main():
     pygame.init()
     window = Window()
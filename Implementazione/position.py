@@ -0,0 +1,107 @@
+"""
+Posizione modificabile sul posto, per le ricerche con make/unmake.
+
+Invece di copiare la board per ogni figlio, la ricerca inserisce la pedina
+nella stessa posizione (play) e la rimuove al ritorno (undo_move): nessuna
+board viene allocata per nodo.
+
+Le celle stanno in un unico buffer di int8 (un byte per cella) letto in due
+modi, senza copie:
+  - 'cells', la board appiattita come memoryview di interi, su cui lavorano
+    play/undo_move e il controllo della vittoria,
+  - 'board', la matrice di board.py sullo stesso buffer, usata da
+    score_position, dagli hash di Zobrist, dalla GUI e da print_board.
+Accanto alle celle la posizione tiene la BitBoard (bitboard.py) con le stesse
+pedine: le sue altezze delle colonne (un bytearray) danno la riga libera in
+O(1) invece di scorrere la colonna (get_next_open_row), e threat_moves lavora
+sulle sue bitboard.
+"""
+import numpy as np
+
+from bitboard import BitBoard
+from board import BOARD_DTYPE, board_geometry, winning_cells, winning_cells_at
+
+
+class Position:
+    """
+    Board modificabile con make/unmake in tempo costante.
+
+    'board' è una copia della board ricevuta (la board del chiamante non viene
+    modificata) e condivide il buffer con 'cells'; 'bitboard' è la BitBoard
+    della stessa posizione, con lo storico delle mosse usato da undo_move, e
+    'heights' le sue altezze delle colonne. 'geometry' è la geometria della
+    griglia (di default ricavata dalla board, vedi board.board_geometry).
+    """
+
+    __slots__ = ('geometry', 'board', 'cells', 'bitboard', 'heights', 'count')
+
+    def __init__(self, board, geometry=None):
+        self.geometry = board_geometry(board, geometry)
+        # subok: mantiene le sottoclassi di ndarray (vedi benchmark/allocations.py)
+        self.board = np.array(board, dtype=BOARD_DTYPE, order='C', subok=True)
+        self.cells = memoryview(self.board).cast('b')
+        self.bitboard = BitBoard.from_board(self.board, self.geometry)
+        self.heights = self.bitboard.heights
+        self.count = sum(self.heights)
+
+    def can_play(self, col):
+        """
+        Controlla se la colonna non è piena.
+        """
+        return self.heights[col] < self.geometry.rows
+
+    def next_open_row(self, col):
+        """
+        Restituisce la riga (in coordinate board.py) in cui cadrebbe la pedina.
+        """
+        return self.geometry.rows - 1 - self.heights[col]
+
+    def get_valid_locations(self):
+        """
+        Restituisce le colonne valide, come board.get_valid_locations.
+        """
+        rows = self.geometry.rows
+        heights = self.heights
+        return [col for col in range(self.geometry.cols) if heights[col] < rows]
+
+    def is_full(self):
+        """
+        Ritorna True se la griglia è piena (pareggio, se nessuno ha vinto).
+        """
+        return self.count == self.geometry.cells
+
+    def play(self, col, piece):
+        """
+        Inserisce la pedina nella colonna e restituisce la riga occupata.
+        """
+        row = self.bitboard.play(col, piece)
+        self.cells[row * self.geometry.cols + col] = piece
+        self.count += 1
+        return row
+
+    def undo_move(self):
+        """
+        Annulla l'ultima mossa giocata e ne restituisce la colonna.
+        """
+        col = self.bitboard.undo_move()
+        self.cells[(self.geometry.rows - 1 - self.heights[col]) * self.geometry.cols + col] = 0
+        self.count -= 1
+        return col
+
+    def winning_move_at(self, row, col, piece):
+        """
+        Come board.winning_move_at, per la pedina appena inserita in [row, col].
+        """
+        return winning_cells_at(self.cells, row, col, piece, self.geometry)
+
+    def winning_move(self, piece):
+        """
+        Come board.winning_move, su tutte le finestre della griglia.
+        """
+        return winning_cells(self.cells, piece, self.geometry)
+
+    def threat_moves(self, piece):
+        """
+        Mosse dopo l'analisi delle minacce, come BitBoard.threat_moves.
+        """
+        return self.bitboard.threat_moves(piece)
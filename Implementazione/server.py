@@ -0,0 +1,314 @@
+"""
+Server asyncio del motore per molte partite contemporaneamente.
+
+Ogni connessione (TCP o socket Unix) è una partita e parla il protocollo a
+righe di engine.py. Le ricerche di tutte le partite vengono eseguite su un
+pool limitato di processi (find_best_move è CPU-bound): al più 'workers'
+ricerche alla volta, le altre attendono in coda. Con più di 'max_pending'
+richieste in coda il server risponde subito "error busy" (backpressure);
+inoltre ogni connessione non legge nuovi comandi finché le risposte
+precedenti non sono state inviate.
+
+Il tempo di ogni ricerca è limitato da 'max_movetime'; se un worker non
+risponde entro il limite più MOVETIME_GRACE secondi la ricerca viene
+interrotta come con 'stop'. Le righe info arrivano dai worker mentre la
+ricerca procede.
+
+Da eseguire dalla cartella Implementazione, ad esempio:
+
+    python server.py --port 4004 --workers 4
+    python server.py --unix /tmp/connect4.sock
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from engine import DEFAULT_LEVEL, board_from_moves, parse_go, parse_level, search_params, run_search, format_info
+
+DEFAULT_PORT = 4004
+DEFAULT_MAX_PENDING = 64
+DEFAULT_MAX_MOVETIME = 10.0
+MOVETIME_GRACE = 1.0
+
+# Stato dei processi worker (impostato da _init_worker)
+_stop_tokens = None
+_info_queue = None
+
+
+def _init_worker(stop_tokens, info_queue):
+    global _stop_tokens, _info_queue
+    # Ctrl+C arriva a tutto il gruppo di processi: lo gestisce solo il server
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    _stop_tokens = stop_tokens
+    _info_queue = info_queue
+
+
+def _warm_up():
+    return None
+
+
+def _search(board, params, slot, token):
+    """
+    Esegue la ricerca nel processo worker. La ricerca si interrompe quando il
+    token dello slot cambia; le righe info vengono inviate al server durante la
+    ricerca e restituite anche insieme alla mossa, così nessuna va persa.
+    """
+    lines = []
+
+    def on_iteration(event):
+        line = format_info(event)
+        lines.append(line)
+        _info_queue.put((slot, token, line))
+
+    best_col, _ = run_search(board, params, lambda: _stop_tokens[slot] != token, on_iteration)
+    return best_col, lines
+
+
+class SearchRequest:
+
+    def __init__(self, board, params):
+        self.board = board
+        self.params = params
+        self.slot = None
+        self.token = None
+        self.stopped = False
+        self.sent = 0
+
+
+class Session:
+    """
+    Una partita: posizione, livello e ricerca in corso di una connessione.
+    """
+
+    def __init__(self, server, writer):
+        self.server = server
+        self.writer = writer
+        self.board = board_from_moves('')
+        self.level = DEFAULT_LEVEL
+        self.request = None
+        self.task = None
+
+    def write(self, line):
+        if not self.writer.is_closing():
+            self.writer.write((line + '\n').encode())
+
+    async def handle(self, line):
+        """
+        Esegue un comando; restituisce False dopo 'quit'.
+        """
+        fields = line.split()
+        if not fields:
+            return True
+        command, args = fields[0], fields[1:]
+        try:
+            if command == 'quit':
+                return False
+            if command == 'isready':
+                self.write('readyok')
+            elif command == 'stop':
+                self.stop()
+            elif self.request is not None:
+                raise ValueError("ricerca in corso")
+            elif command == 'position':
+                self.board = board_from_moves(''.join(args))
+            elif command == 'level':
+                self.level = parse_level(args)
+            elif command == 'go':
+                movetime, depth = parse_go(args)
+                self.go(search_params(self.level, movetime, depth, self.server.max_movetime))
+            else:
+                raise ValueError(f"comando sconosciuto: {command}")
+        except ValueError as e:
+            self.write(f"error {e}")
+        return True
+
+    def go(self, params):
+        request = SearchRequest(self.board.copy(), params)
+        search = self.server.search(request, self)
+        self.request = request
+        self.task = asyncio.ensure_future(self.run(request, search))
+
+    async def run(self, request, search):
+        try:
+            best_col, lines = await search
+            for line in lines[request.sent:]:
+                self.write(line)
+            self.write(f"bestmove {best_col}")
+        except Exception as e:
+            self.write(f"error ricerca fallita: {e}")
+        finally:
+            self.request = None
+        await self.drain()
+
+    def info(self, request, line):
+        if request is self.request:
+            request.sent += 1
+            self.write(line)
+
+    def stop(self):
+        if self.request is not None:
+            self.server.stop(self.request)
+
+    async def drain(self):
+        try:
+            await self.writer.drain()
+        except ConnectionError:
+            pass
+
+    async def close(self):
+        self.stop()
+        if self.task is not None:
+            await asyncio.gather(self.task, return_exceptions=True)
+
+
+class EngineServer:
+    """
+    Multiplexa le ricerche delle sessioni sul pool di processi. Ogni ricerca
+    occupa uno slot (uno per worker) a cui corrisponde un token nell'array
+    condiviso: incrementarlo interrompe la ricerca in quel worker.
+    """
+
+    def __init__(self, workers=None, max_pending=DEFAULT_MAX_PENDING, max_movetime=DEFAULT_MAX_MOVETIME):
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending
+        self.max_movetime = max_movetime
+        self.pending = 0
+        # 'spawn' come in ai_worker.py: i worker non ereditano lo stato del server
+        context = multiprocessing.get_context('spawn')
+        self.stop_tokens = context.Array('i', self.workers)
+        self.info_queue = context.Queue()
+        self.executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context, initializer=_init_worker,
+                                            initargs=(self.stop_tokens, self.info_queue))
+        for _ in range(self.workers):
+            self.executor.submit(_warm_up)
+        self.slots = None
+        self.owners = {}
+        self.loop = None
+        self.info_thread = None
+
+    def start(self):
+        self.loop = asyncio.get_running_loop()
+        self.slots = asyncio.Queue()
+        for slot in range(self.workers):
+            self.slots.put_nowait(slot)
+        self.info_thread = threading.Thread(target=self.forward_info, daemon=True)
+        self.info_thread.start()
+
+    def forward_info(self):
+        """
+        Thread che inoltra le righe info dei worker alla sessione che ha
+        richiesto la ricerca (quelle di ricerche già terminate vengono scartate).
+        """
+        while True:
+            item = self.info_queue.get()
+            if item is None:
+                return
+            self.loop.call_soon_threadsafe(self.dispatch_info, *item)
+
+    def dispatch_info(self, slot, token, line):
+        owner = self.owners.get(slot)
+        if owner is not None and owner[0].token == token:
+            owner[1].info(owner[0], line)
+
+    def search(self, request, session):
+        """
+        Mette in coda la ricerca e restituisce la coroutine che attende uno slot
+        libero, la esegue nel pool e restituisce (colonna, righe info). Con
+        max_pending ricerche già in coda solleva ValueError("busy").
+        """
+        if self.pending >= self.max_pending:
+            raise ValueError("busy")
+        self.pending += 1
+        return self.run_search(request, session)
+
+    async def run_search(self, request, session):
+        try:
+            slot = await self.slots.get()
+        finally:
+            self.pending -= 1
+        try:
+            with self.stop_tokens.get_lock():
+                request.slot = slot
+                request.token = self.stop_tokens[slot]
+                if request.stopped:
+                    self.stop_tokens[slot] += 1
+            self.owners[slot] = (request, session)
+            future = self.loop.run_in_executor(self.executor, _search, request.board, request.params,
+                                               slot, request.token)
+            try:
+                return await asyncio.wait_for(asyncio.shield(future),
+                                              request.params['time_limit'] + MOVETIME_GRACE)
+            except asyncio.TimeoutError:
+                self.stop(request)
+                return await future
+        finally:
+            self.owners.pop(slot, None)
+            self.slots.put_nowait(slot)
+
+    def stop(self, request):
+        with self.stop_tokens.get_lock():
+            request.stopped = True
+            if request.slot is not None and self.stop_tokens[request.slot] == request.token:
+                self.stop_tokens[request.slot] += 1
+
+    async def handle_client(self, reader, writer):
+        session = Session(self, writer)
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                if not await session.handle(line.decode(errors='replace')):
+                    break
+                await session.drain()
+        except ConnectionError:
+            pass
+        finally:
+            await session.close()
+            writer.close()
+
+    def shutdown(self):
+        self.info_queue.put(None)
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+
+async def serve(args):
+    server = EngineServer(args.workers, args.max_pending, args.max_movetime)
+    server.start()
+    if args.unix:
+        listener = await asyncio.start_unix_server(server.handle_client, path=args.unix)
+        address = args.unix
+    else:
+        listener = await asyncio.start_server(server.handle_client, args.host, args.port)
+        address = f"{args.host}:{args.port}"
+    print(f"Motore in ascolto su {address} con {server.workers} worker", flush=True)
+    try:
+        async with listener:
+            await listener.serve_forever()
+    finally:
+        server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Server del motore di Forza 4 (protocollo di engine.py).")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    parser.add_argument('--unix', help="percorso del socket Unix (al posto di host e porta)")
+    parser.add_argument('--workers', type=int, default=None, help="processi di ricerca (default: numero di CPU)")
+    parser.add_argument('--max-pending', type=int, default=DEFAULT_MAX_PENDING,
+                        help="ricerche in coda oltre le quali il server risponde 'error busy'")
+    parser.add_argument('--max-movetime', type=float, default=DEFAULT_MAX_MOVETIME,
+                        help="tempo massimo di ogni ricerca in secondi")
+    args = parser.parse_args()
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,8 @@
-import pygame
-import sys
+import random
 import time
+from concurrent.futures.process import BrokenProcessPool
 
-from algorithms.minimax_ab_all_improvements import find_best_move
+import pygame
 
 from board import (
     create_board, drop_piece, is_valid_location, get_next_open_row,
@@ -17,6 +17,9 @@ from utils import (
     DIFFICULTY_LEVELS
 )
 
+# Attesa minima (in secondi) prima che la mossa dell'IA venga giocata
+AI_MIN_DELAY = 0.4
+
 # ===============================================================================
 # Classe che gestisce lo stato di Gioco
 # ===============================================================================
@@ -38,12 +41,14 @@ class GameState:
         self.game_gui = GameGui(self.window, player_name, self)
         self.xpos = 0
         self.test_easy = 0
+        # Ricerca della mossa dell'IA in corso nel processo worker (Future)
+        self.ai_request = None
+        self.ai_request_start = 0
 
     def handle_events(self):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                pygame.quit()
-                sys.exit()
+                self.window.quit()
 
             if self.not_over:
                 if event.type == pygame.MOUSEMOTION:
@@ -76,30 +81,46 @@ class GameState:
                     if self.game_gui.play_again_rect.collidepoint(mouse_pos):
                         self.reset_game()
                     elif self.game_gui.quit_rect.collidepoint(mouse_pos):
+                        self.cancel_ai_request()
                         from states.home import HomeState
                         self.window.change_state(HomeState(self.window))
 
     def update(self):
         if self.turn == AI_TURN and not self.game_over and self.not_over:
-            pygame.time.wait(400)
-
-            if self.difficulty == 1:
-                self.ai_manager.update_parameters()
-                difficulty_params = self.ai_manager.difficulty_params
+            if self.ai_request is None:
+                if self.difficulty == 1:
+                    self.ai_manager.update_parameters()
+                    difficulty_params = self.ai_manager.difficulty_params
+                else:
+                    difficulty_params = DIFFICULTY_LEVELS[self.difficulty]
+
+                # La mossa migliore viene calcolata nel processo worker: il ciclo
+                # principale continua a disegnare mentre l'IA pensa
+                try:
+                    self.ai_request = self.window.ai_worker.submit(self.board, difficulty_params)
+                except BrokenProcessPool as error:
+                    # Il processo worker è terminato tra due mosse: viene riavviato
+                    print(f"Worker dell'IA non disponibile: {error!r}. Worker riavviato.")
+                    self.window.restart_ai_worker()
+                    self.ai_request = self.window.ai_worker.submit(self.board, difficulty_params)
+                self.ai_request_start = time.time()
+                return
+
+            if not self.ai_request.done() or time.time() - self.ai_request_start < AI_MIN_DELAY:
+                return
+
+            error = self.ai_request.exception()
+            if error is None:
+                col = self.ai_request.result()
             else:
-                difficulty_params = DIFFICULTY_LEVELS[self.difficulty]
-
-            max_depth = difficulty_params['max_depth']
-            beam_width = difficulty_params['beam_width']
-            heuristic_weights = difficulty_params['heuristic_weights']
-            time_limit = difficulty_params['time_limit']
-            center_score_map = difficulty_params['center_score_map']
-
-            # Calcola la mossa migliore
-            start_time = time.time()
-            col = find_best_move(self.board, max_depth, beam_width, heuristic_weights, time_limit, center_score_map)
-            end_time = time.time()
-            #print(f"Tempo di calcolo IA: {end_time - start_time} secondi")
+                # Un errore della ricerca (anche la terminazione del processo worker,
+                # BrokenProcessPool) non deve chiudere il gioco: il worker viene
+                # riavviato e l'IA gioca una colonna valida a caso
+                print(f"Ricerca dell'IA fallita: {error!r}. Worker riavviato, mossa casuale.")
+                self.window.restart_ai_worker()
+                col = random.choice([c for c in range(COLS) if is_valid_location(self.board, c)])
+            self.ai_request = None
+            #print(f"Tempo di calcolo IA: {time.time() - self.ai_request_start} secondi")
 
             if col is not None and is_valid_location(self.board, col):
                 row = get_next_open_row(self.board, col)
@@ -115,6 +136,17 @@ class GameState:
     def render(self, screen):
         self.game_gui.render(screen)
 
+    def is_ai_thinking(self):
+        return self.ai_request is not None
+
+    def cancel_ai_request(self):
+        """
+        Interrompe la ricerca dell'IA in corso e ne scarta il risultato.
+        """
+        if self.ai_request is not None:
+            self.window.ai_worker.cancel()
+            self.ai_request = None
+
     def end_game(self, winner):
         self.game_over = True
         if winner == "User":
@@ -125,6 +157,7 @@ class GameState:
         pygame.display.update()
 
     def reset_game(self):
+        self.cancel_ai_request()
         self.board = create_board()
         self.turn = PLAYER_TURN
         self.game_over = False
@@ -288,6 +321,14 @@ class GameGui:
             pygame.display.update()
             clock.tick(60)
 
+    def draw_thinking(self):
+        screen_width, screen_height = self.screen.get_size()
+        thinking_position = scale_position(1132.9, 421.9, screen_width, screen_height)
+        # Puntini animati: il ciclo principale continua a girare durante la ricerca
+        dots = "." * ((pygame.time.get_ticks() // 400) % 4)
+        thinking_render = self.text_font.render(f"Thinking{dots}", True, (0, 0, 0))
+        self.screen.blit(thinking_render, thinking_position)
+
     def render(self, screen):
         if self.game_state.not_over:
             self.draw_background()
@@ -295,6 +336,8 @@ class GameGui:
             self.draw_board_layer()
             if self.game_state.turn != AI_TURN:
                 self.draw_active_piece(self.game_state.xpos)
+            elif self.game_state.is_ai_thinking():
+                self.draw_thinking()
         else:
             self.draw_background()
             self.draw_pieces(self.game_state.board)
@@ -324,7 +367,8 @@ class DecreaseParameters:
                     'block_opponent_three': 45
                 },
                 'time_limit': 1.0,
-                'center_score_map': [3, 4, 5, 5, 5, 4, 3]
+                'center_score_map': [3, 4, 5, 5, 5, 4, 3],
+                'use_cache': True
             }
         }
         self.difficulty_params = self.DIFFICULTY_LEVELS[self.difficulty]
@@ -21,8 +21,7 @@ class HomeState:
 
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
-                pygame.quit()
-                exit()
+                self.window.quit()
             elif event.type == pygame.MOUSEBUTTONDOWN:
                 self.home_gui.handle_click(event.pos)
             elif event.type in (pygame.KEYDOWN, pygame.KEYUP):
@@ -31,6 +30,9 @@ class HomeState:
     def update(self):
         pass
 
+    def is_ai_thinking(self):
+        return False
+
     def render(self, screen):
         self.home_gui.show_home()
 
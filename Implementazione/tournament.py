@@ -0,0 +1,173 @@
+"""
+Torneo non interattivo tra due livelli di IA.
+
+Le partite vengono giocate in parallelo su un pool di processi con la stessa
+logica di difficulty_test.play_game (prima mossa casuale, DecreaseParameters per
+il livello 1). Ogni partita usa un generatore casuale con seme seed + indice, così
+le condizioni iniziali sono riproducibili. I risultati vengono scritti su un file
+JSONL (una riga per partita) man mano che le partite terminano; al termine
+vengono stampati tassi di vittoria e pareggio con intervallo di confidenza di
+Wilson e i percentili della latenza per mossa.
+
+La cache persistente delle analisi è disattivata di default: con --cache le
+mosse già salvate (anche da esecuzioni precedenti) vengono lette dal database
+invece di essere cercate, e le latenze misurano la cache invece della ricerca.
+Nel riepilogo vengono allora riportati hit, salvataggi ed errori della cache
+(un salvataggio fallisce se il database resta bloccato da un altro processo).
+
+Da eseguire dalla cartella Implementazione, ad esempio:
+
+    python tournament.py --ai1 2 --ai2 3 --games 1000 --workers 8 --seed 42
+"""
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from statistics import NormalDist
+
+from algorithms.analysis_cache import get_cache_stats
+from algorithms.search_clock import percentile
+from difficulty_test import play_game
+
+
+CACHE_COUNTERS = ('lookups', 'hits', 'stores', 'errors')
+
+
+def play_tournament_game(index, ai1_level, ai2_level, seed, use_cache=False):
+    """
+    Gioca la partita 'index' e restituisce il record da scrivere nel file JSONL.
+    """
+    move_log = []
+    cache_before = get_cache_stats()
+    result, t1, t2, m1, m2, _ = play_game(ai1_level, ai2_level, rng=random.Random(seed + index), move_log=move_log,
+                                          use_cache=use_cache)
+    cache_after = get_cache_stats()
+    return {
+        'game': index,
+        'seed': seed + index,
+        'result': result,
+        'starter': move_log[0][0],
+        'moves': [col for _, col, _, _ in move_log],
+        'ai1_moves': m1,
+        'ai2_moves': m2,
+        'ai1_time': t1,
+        'ai2_time': t2,
+        # Tempi delle sole mosse cercate (la prima mossa casuale è esclusa)
+        'ai1_latencies': [elapsed for player, _, elapsed, searched in move_log if player == "AI1" and searched],
+        'ai2_latencies': [elapsed for player, _, elapsed, searched in move_log if player == "AI2" and searched],
+        # Contatori della cache delle analisi durante la partita
+        'cache': {name: cache_after[name] - cache_before[name] for name in CACHE_COUNTERS},
+    }
+
+
+def wilson_interval(successes, total, confidence=0.95):
+    """
+    Intervallo di confidenza di Wilson per una proporzione.
+    """
+    if total == 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    p = successes / total
+    denominator = 1 + z * z / total
+    center = (p + z * z / (2 * total)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / total + z * z / (4 * total * total)) / denominator
+    return max(0.0, center - margin), min(1.0, center + margin)
+
+
+def summarize(records, confidence=0.95):
+    """
+    Aggrega i record delle partite: conteggi e tassi con intervallo di Wilson per
+    vittorie di AI1, vittorie di AI2 e pareggi, percentili della latenza per mossa.
+    """
+    games = len(records)
+    summary = {'games': games}
+    for outcome, label in (("AI1", 'ai1_wins'), ("AI2", 'ai2_wins'), ("Draw", 'draws')):
+        count = sum(1 for record in records if record['result'] == outcome)
+        low, high = wilson_interval(count, games, confidence)
+        summary[label] = {'count': count, 'rate': count / games if games else 0.0, 'low': low, 'high': high}
+
+    for player in ('ai1', 'ai2'):
+        latencies = [elapsed for record in records for elapsed in record[f'{player}_latencies']]
+        if latencies:
+            summary[f'{player}_latency'] = {
+                'moves': len(latencies),
+                'p50': percentile(latencies, 0.50),
+                'p95': percentile(latencies, 0.95),
+                'p99': percentile(latencies, 0.99),
+                'max': max(latencies),
+            }
+        else:
+            summary[f'{player}_latency'] = {'moves': 0}
+    summary['cache'] = {name: sum(record['cache'][name] for record in records) for name in CACHE_COUNTERS}
+    return summary
+
+
+def print_summary(summary, ai1_level, ai2_level, confidence):
+    print(f"\nPartite: {summary['games']}")
+    for label, name in (('ai1_wins', f"Vittorie AI1 (Livello {ai1_level})"),
+                        ('ai2_wins', f"Vittorie AI2 (Livello {ai2_level})"),
+                        ('draws', "Pareggi")):
+        entry = summary[label]
+        print(f"{name}: {entry['count']} ({entry['rate']:.1%}, IC {confidence:.0%} "
+              f"{entry['low']:.1%} - {entry['high']:.1%})")
+    for player in ('ai1', 'ai2'):
+        latency = summary[f'{player}_latency']
+        if latency['moves'] > 0:
+            print(f"Latenza {player.upper()}: p50 {latency['p50']:.4f} s, p95 {latency['p95']:.4f} s, "
+                  f"p99 {latency['p99']:.4f} s, massimo {latency['max']:.4f} s ({latency['moves']} mosse)")
+    cache = summary['cache']
+    if cache['lookups'] > 0:
+        print(f"Cache delle analisi: {cache['hits']}/{cache['lookups']} mosse dalla cache, "
+              f"{cache['stores']} salvate, {cache['errors']} errori")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Torneo in parallelo tra due livelli di IA di Forza 4.")
+    parser.add_argument('--ai1', type=int, choices=[1, 2, 3], required=True, help="livello della AI1")
+    parser.add_argument('--ai2', type=int, choices=[1, 2, 3], required=True, help="livello della AI2")
+    parser.add_argument('--games', type=int, default=100, help="numero di partite")
+    parser.add_argument('--seed', type=int, default=0, help="seme della partita 0 (la partita i usa seed + i)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="partite giocate in parallelo")
+    parser.add_argument('--output', default="tournament.jsonl", help="file JSONL dei risultati per partita")
+    parser.add_argument('--confidence', type=float, default=0.95, help="livello di confidenza degli intervalli")
+    parser.add_argument('--cache', action=argparse.BooleanOptionalAction, default=False,
+                        help="usa la cache persistente delle analisi (default: no, per misure riproducibili)")
+    args = parser.parse_args(argv)
+    if args.games <= 0 or args.workers <= 0:
+        parser.error("--games e --workers devono essere positivi")
+    if not 0 < args.confidence < 1:
+        parser.error("--confidence deve essere compreso tra 0 e 1")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    records = []
+    start_time = time.perf_counter()
+
+    # Ogni processo ha la propria tabella delle trasposizioni, come una partita seriale
+    context = multiprocessing.get_context('spawn')
+    with open(args.output, 'w') as output, \
+            ProcessPoolExecutor(max_workers=args.workers, mp_context=context) as executor:
+        futures = [executor.submit(play_tournament_game, index, args.ai1, args.ai2, args.seed, args.cache)
+                   for index in range(args.games)]
+        for future in as_completed(futures):
+            record = future.result()
+            records.append(record)
+            output.write(json.dumps(record) + "\n")
+            output.flush()
+            print(f"Partite completate: {len(records)}/{args.games}", end="\r", flush=True)
+
+    records.sort(key=lambda record: record['game'])
+    summary = summarize(records, args.confidence)
+    print_summary(summary, args.ai1, args.ai2, args.confidence)
+    print(f"Tempo totale: {time.perf_counter() - start_time:.1f} s, risultati in {args.output}")
+    return summary
+
+
+if __name__ == "__main__":
+    main()